@@ -93,7 +93,7 @@ class ActionPlan(models.Model):
         super().save(*args, **kwargs)
 
     @classmethod
-    def get_history(cls, barrier_id):
+    def get_history(cls, barrier_id, since=None):
         qs = cls.history.filter(barrier__id=barrier_id)
         fields = (
             "strategic_context",
@@ -105,6 +105,7 @@ class ActionPlan(models.Model):
             model="action_plan",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
 
 
@@ -136,7 +137,7 @@ class ActionPlanMilestone(models.Model):
     history = HistoricalRecords()
 
     @classmethod
-    def get_history(cls, barrier_id):
+    def get_history(cls, barrier_id, since=None):
         qs = cls.history.filter(action_plan__barrier_id=barrier_id)
         fields = ("objective",)
         return get_model_history(
@@ -144,6 +145,7 @@ class ActionPlanMilestone(models.Model):
             model="action_plan_milestone",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
 
 
@@ -187,7 +189,7 @@ class ActionPlanTask(models.Model):
     history = HistoricalRecords()
 
     @classmethod
-    def get_history(cls, barrier_id):
+    def get_history(cls, barrier_id, since=None):
         qs = cls.history.filter(milestone__action_plan__barrier_id=barrier_id)
         fields = (
             ["assigned_to__first_name", "assigned_to__last_name"],
@@ -202,6 +204,7 @@ class ActionPlanTask(models.Model):
             model="action_plan_task",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
 
     class Meta:
@@ -118,7 +118,7 @@ class EconomicAssessment(
         super().save(*args, **kwargs)
 
     @classmethod
-    def get_history(cls, barrier_id: str, fields: Optional[List] = None):
+    def get_history(cls, barrier_id: str, fields: Optional[List] = None, since=None):
         qs = cls.history.filter(barrier__id=barrier_id)
         default_fields = (
             "approved",
@@ -139,6 +139,7 @@ class EconomicAssessment(
             model="economic_assessment",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
 
 
@@ -217,7 +218,7 @@ class EconomicImpactAssessment(ArchivableMixin, BarrierRelatedMixin, BaseModel):
         super().save(*args, **kwargs)
 
     @classmethod
-    def get_history(cls, barrier_id: str, fields: Optional[List] = None):
+    def get_history(cls, barrier_id: str, fields: Optional[List] = None, since=None):
         qs = cls.history.filter(economic_assessment__barrier_id=barrier_id)
         default_fields = (
             "archived",
@@ -232,6 +233,7 @@ class EconomicImpactAssessment(ArchivableMixin, BarrierRelatedMixin, BaseModel):
             model="economic_impact_assessment",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
 
 
@@ -268,7 +270,7 @@ class ResolvabilityAssessment(
         super().save(*args, **kwargs)
 
     @classmethod
-    def get_history(cls, barrier_id: str, fields: Optional[List] = None):
+    def get_history(cls, barrier_id: str, fields: Optional[List] = None, since=None):
         qs = cls.history.filter(barrier_id=barrier_id)
         default_fields = (
             "approved",
@@ -285,6 +287,7 @@ class ResolvabilityAssessment(
             model="resolvability_assessment",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
 
 
@@ -322,7 +325,7 @@ class StrategicAssessment(
         super().save(*args, **kwargs)
 
     @classmethod
-    def get_history(cls, barrier_id: str, fields: Optional[List] = None):
+    def get_history(cls, barrier_id: str, fields: Optional[List] = None, since=None):
         qs = cls.history.filter(barrier_id=barrier_id)
         default_fields = (
             "approved",
@@ -344,6 +347,7 @@ class StrategicAssessment(
             model="strategic_assessment",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
 
 
@@ -363,7 +367,7 @@ class PreliminaryAssessment(BarrierRelatedMixin, BaseModel):
         ordering = ("-created_on",)
 
     @classmethod
-    def get_history(cls, barrier_id: str, fields: Optional[List] = None):
+    def get_history(cls, barrier_id: str, fields: Optional[List] = None, since=None):
         qs = cls.history.filter(barrier__id=barrier_id)
 
         if not fields:
@@ -374,4 +378,5 @@ class PreliminaryAssessment(BarrierRelatedMixin, BaseModel):
             model="preliminary_assessment",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
@@ -1,8 +1,9 @@
 import logging
-from typing import List
+from typing import Dict, Iterator, List
 
 from django.conf import settings
 from django.db.models import Prefetch, QuerySet
+from django.db.models.expressions import RawSQL
 from django.utils.timezone import now
 from notifications_python_client import NotificationsAPIClient
 
@@ -23,13 +24,19 @@ from api.barriers.models import (
     ProgrammeFundProgressUpdate,
 )
 from api.collaboration.models import TeamMember
-from api.core.utils import serializer_to_csv_bytes
+from api.core.utils import S3MultipartUpload, stream_csv_bytes
 from api.documents.utils import get_bucket_name, get_s3_client_for_bucket
 from api.user.constants import USER_ACTIVITY_EVENT_TYPES
 from api.user.models import UserActvitiyLog
 
 logger = logging.getLogger(__name__)
 
+# Barriers fetched, with their prefetches, and serialized at a time
+CSV_DOWNLOAD_CHUNK_SIZE = 500
+# Longer id lists are sent as a single array rather than one parameter per id
+CSV_DOWNLOAD_UNNEST_THRESHOLD = 1000
+CSV_DOWNLOAD_ORDERING = ("-reported_on", "id")
+
 
 def get_s3_client_and_bucket_name():
     bucket_id = "default"
@@ -65,9 +72,17 @@ def create_barrier_download(user, filters: dict, barrier_ids: List) -> BarrierDo
     return barrier_download
 
 
+def filter_by_ids(queryset: QuerySet, barrier_ids: List[str]) -> QuerySet:
+    if len(barrier_ids) > CSV_DOWNLOAD_UNNEST_THRESHOLD:
+        ids = [str(barrier_id) for barrier_id in barrier_ids]
+        return queryset.filter(id__in=RawSQL("SELECT unnest(%s::uuid[])", (ids,)))
+    return queryset.filter(id__in=barrier_ids)
+
+
 def get_queryset(barrier_ids: List[str]) -> QuerySet:
     return (
-        Barrier.objects.filter(id__in=barrier_ids)
+        filter_by_ids(Barrier.objects.all(), barrier_ids)
+        .order_by(*CSV_DOWNLOAD_ORDERING)
         .select_related(
             "created_by",
         )
@@ -149,6 +164,29 @@ def get_queryset(barrier_ids: List[str]) -> QuerySet:
     )
 
 
+def get_barrier_chunks(
+    barrier_ids: List[str], chunk_size: int = CSV_DOWNLOAD_CHUNK_SIZE
+) -> Iterator[List[Barrier]]:
+    """
+    The barriers in download order, in chunks fetched with their own prefetches
+    so only one chunk's related objects are held in memory at a time.
+    """
+    ordered_ids = list(
+        filter_by_ids(Barrier.objects.all(), barrier_ids)
+        .order_by(*CSV_DOWNLOAD_ORDERING)
+        .values_list("id", flat=True)
+    )
+    for start in range(0, len(ordered_ids), chunk_size):
+        yield list(get_queryset(ordered_ids[start : start + chunk_size]))
+
+
+def get_csv_rows(
+    barrier_ids: List[str], chunk_size: int = CSV_DOWNLOAD_CHUNK_SIZE
+) -> Iterator[Dict]:
+    for barriers in get_barrier_chunks(barrier_ids, chunk_size):
+        yield from CsvDownloadSerializer(barriers, many=True).data
+
+
 def generate_barrier_download_file(
     barrier_download_id: str,
     barrier_ids: List[str],
@@ -163,11 +201,16 @@ def generate_barrier_download_file(
 
     barrier_download.processing()
 
-    qs = get_queryset(barrier_ids)
-    serializer = CsvDownloadSerializer(qs, many=True)
+    s3_client, bucket = get_s3_client_and_bucket_name()
 
     try:
-        csv_bytes = serializer_to_csv_bytes(serializer, BARRIER_FIELD_TO_COLUMN_TITLE)
+        # Upload the file in parts as it is written, so only a part
+        # is held in memory at a time
+        with S3MultipartUpload(s3_client, bucket, barrier_download.filename) as upload:
+            for chunk in stream_csv_bytes(
+                get_csv_rows(barrier_ids), BARRIER_FIELD_TO_COLUMN_TITLE
+            ):
+                upload.write(chunk)
     except Exception:
         # Check for generic exceptions when creating csv file
         # Async task so no need to handle gracefully
@@ -176,11 +219,6 @@ def generate_barrier_download_file(
         barrier_download.fail()
         raise
 
-    s3_client, bucket = get_s3_client_and_bucket_name()
-
-    # Upload file
-    s3_client.put_object(Bucket=bucket, Body=csv_bytes, Key=barrier_download.filename)
-
     barrier_download.complete()
 
     # Save the download event in the database
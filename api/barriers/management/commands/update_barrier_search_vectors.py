@@ -0,0 +1,46 @@
+import logging
+
+from django.core.management import BaseCommand
+
+from api.barriers.models import Barrier
+from api.barriers.search import BARRIER_SEARCH_VECTOR, flatten_company_names
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored search columns of barriers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of barriers updated per query",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        barriers = Barrier.objects.only(
+            "id", "companies", "related_organisations"
+        ).order_by("id")
+
+        batch, updated = [], 0
+        for barrier in barriers.iterator(chunk_size=batch_size):
+            barrier.company_names = flatten_company_names(
+                barrier.companies, barrier.related_organisations
+            )
+            batch.append(barrier)
+            if len(batch) == batch_size:
+                updated += self.update(batch)
+                batch = []
+        if batch:
+            updated += self.update(batch)
+
+        logger.info(f"Updated search columns of {updated} barriers")
+
+    def update(self, batch):
+        Barrier.objects.bulk_update(batch, ["company_names"])
+        return Barrier.objects.filter(id__in=[barrier.id for barrier in batch]).update(
+            search_vector=BARRIER_SEARCH_VECTOR
+        )
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.21
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+BACKFILL_COMPANY_NAMES = """
+UPDATE barriers_barrier barrier
+SET company_names = coalesce(
+    (
+        SELECT string_agg(lower(organisation ->> 'name'), E'\\n')
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof(barrier.companies) = 'array'
+                THEN barrier.companies ELSE '[]'::jsonb END
+            || CASE WHEN jsonb_typeof(barrier.related_organisations) = 'array'
+                THEN barrier.related_organisations ELSE '[]'::jsonb END
+        ) AS organisation
+        WHERE jsonb_typeof(organisation) = 'object'
+    ),
+    ''
+)
+"""
+
+BACKFILL_SEARCH_VECTOR = """
+UPDATE barriers_barrier
+SET search_vector = to_tsvector(
+    coalesce(summary, '') || ' ' || coalesce(export_description, '')
+)
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("barriers", "0174_estimated_resolution_date_data_migration"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="barrier",
+            name="company_names",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="barrier",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="barrier",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="barrier_search_vector_gin"
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_COMPANY_NAMES, migrations.RunSQL.noop),
+        migrations.RunSQL(BACKFILL_SEARCH_VECTOR, migrations.RunSQL.noop),
+    ]
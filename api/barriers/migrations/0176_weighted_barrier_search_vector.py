@@ -0,0 +1,25 @@
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def weight_search_vectors(apps, schema_editor):
+    Barrier = apps.get_model("barriers", "Barrier")
+    Barrier.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A")
+            + SearchVector("code", weight="A")
+            + SearchVector("company_names", weight="B")
+            + SearchVector("summary", weight="B")
+            + SearchVector("export_description", weight="C")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("barriers", "0175_barrier_search_vector_company_names"),
+    ]
+
+    operations = [
+        migrations.RunPython(weight_search_vectors, migrations.RunPython.noop),
+    ]
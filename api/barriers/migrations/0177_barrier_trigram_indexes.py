@@ -0,0 +1,44 @@
+# Generated by Django 4.2.21
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("barriers", "0176_weighted_barrier_search_vector"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="barrier",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("title"),
+                    name="gin_trgm_ops",
+                ),
+                name="barrier_title_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="barrier",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("code"),
+                    name="gin_trgm_ops",
+                ),
+                name="barrier_code_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="barrier",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["company_names"],
+                name="barrier_company_names_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
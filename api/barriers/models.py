@@ -9,12 +9,13 @@ import django_filters
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.fields import ArrayField
-from django.contrib.postgres.search import SearchVector
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.cache import cache
 from django.core.validators import int_list_validator
 from django.db import models
-from django.db.models import CASCADE, Case, CharField, Q, QuerySet, Value, When
-from django.db.models.functions import Cast
+from django.db.models import CASCADE, CharField, Q, QuerySet
+from django.db.models.functions import Cast, Upper
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django_filters.widgets import BooleanWidget
@@ -24,6 +25,16 @@ from simple_history.models import HistoricalRecords
 
 from api.barriers import validators
 from api.barriers.report_stages import REPORT_CONDITIONS, report_stage_status
+from api.barriers.search import (
+    BARRIER_SEARCH_VECTOR,
+    BARRIER_SEARCH_VECTOR_FIELDS,
+    filter_by_ranking,
+    flatten_company_names,
+    lexical_ranking,
+    lexical_search,
+    order_by_rank,
+    reciprocal_rank_fusion,
+)
 from api.barriers.utils import random_barrier_reference
 from api.collaboration import models as collaboration_models
 from api.commodities.models import Commodity
@@ -256,7 +267,7 @@ class BarrierProgressUpdate(FullyArchivableMixin, BaseModel):
     history = HistoricalRecords()
 
     @classmethod
-    def get_history(cls, barrier_id):
+    def get_history(cls, barrier_id, since=None):
         qs = cls.history.filter(barrier__id=barrier_id)
         fields = (["status", "update", "next_steps"],)
 
@@ -265,6 +276,7 @@ class BarrierProgressUpdate(FullyArchivableMixin, BaseModel):
             model="progress_update",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
 
     class Meta:
@@ -342,7 +354,7 @@ class EstimatedResolutionDateRequest(models.Model):
         self.save()
 
     @classmethod
-    def get_history(cls, barrier_id):
+    def get_history(cls, barrier_id, since=None):
         qs = cls.history.filter(barrier__id=barrier_id).exclude(
             status=cls.STATUSES.CLOSED
         )
@@ -362,6 +374,7 @@ class EstimatedResolutionDateRequest(models.Model):
             fields=fields,
             track_first_item=True,
             primary_key="id",
+            since=since,
         )
 
 
@@ -394,7 +407,7 @@ class ProgrammeFundProgressUpdate(FullyArchivableMixin, BaseModel):
         verbose_name_plural = "Programme Fund Barrier Progress Updates"
 
     @classmethod
-    def get_history(cls, barrier_id):
+    def get_history(cls, barrier_id, since=None):
         qs = cls.history.filter(barrier__id=barrier_id)
         fields = ("milestones_and_deliverables", "expenditure")
 
@@ -403,6 +416,7 @@ class ProgrammeFundProgressUpdate(FullyArchivableMixin, BaseModel):
             model="programme_fund_progress_update",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
 
 
@@ -482,6 +496,9 @@ class Barrier(FullyArchivableMixin, BaseModel):
     main_sector = models.UUIDField(blank=True, null=True)
     companies = models.JSONField(blank=True, null=True)
     related_organisations = models.JSONField(blank=True, null=True)
+    # Denormalised for dashboard search, see api.barriers.search
+    company_names = models.TextField(blank=True, default="", editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
     product = models.CharField(max_length=MAX_LENGTH, blank=True)
     source = models.CharField(choices=BARRIER_SOURCE, max_length=25, blank=True)
     other_source = models.CharField(max_length=MAX_LENGTH, blank=True)
@@ -612,7 +629,10 @@ class Barrier(FullyArchivableMixin, BaseModel):
         help_text="Organisations that are related to the barrier",
     )
 
-    history = HistoricalRecords(bases=[BarrierHistoricalModel])
+    history = HistoricalRecords(
+        bases=[BarrierHistoricalModel],
+        excluded_fields=["company_names", "search_vector"],
+    )
 
     tags = models.ManyToManyField(metadata_models.BarrierTag, blank=True)
 
@@ -657,6 +677,23 @@ class Barrier(FullyArchivableMixin, BaseModel):
                 "Can change barrier public eligibility",
             ),
         ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="barrier_search_vector_gin"),
+            # Trigram indexes answer the icontains/contains lookups of text_search
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="barrier_title_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("code"), name="gin_trgm_ops"),
+                name="barrier_code_trgm",
+            ),
+            GinIndex(
+                fields=["company_names"],
+                name="barrier_company_names_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
     @classmethod
     def get_history(
@@ -665,6 +702,7 @@ class Barrier(FullyArchivableMixin, BaseModel):
         enrich=False,
         fields: Optional[List] = None,
         track_first_item: bool = False,
+        since=None,
     ):
         qs = cls.history.filter(id=barrier_id, draft=False)
         default_fields = (
@@ -727,7 +765,11 @@ class Barrier(FullyArchivableMixin, BaseModel):
 
         # Get all fields required - raw changes no enrichment
         return get_model_history(
-            qs, model="barrier", fields=fields, track_first_item=track_first_item
+            qs,
+            model="barrier",
+            fields=fields,
+            track_first_item=track_first_item,
+            since=since,
         )
 
     def get_active_erd_request(self):
@@ -943,8 +985,24 @@ class Barrier(FullyArchivableMixin, BaseModel):
         if self.caused_by_trading_bloc is not None and not self.country_trading_bloc:
             self.caused_by_trading_bloc = None
 
+        self.company_names = flatten_company_names(
+            self.companies, self.related_organisations
+        )
+        if update_fields is not None and {
+            "companies",
+            "related_organisations",
+        }.intersection(update_fields):
+            update_fields = {*update_fields, "company_names"}
+
         super().save(force_insert, force_update, using, update_fields)
 
+        if update_fields is None or BARRIER_SEARCH_VECTOR_FIELDS.intersection(
+            update_fields
+        ):
+            Barrier.objects.filter(pk=self.pk).update(
+                search_vector=BARRIER_SEARCH_VECTOR
+            )
+
         # Ensure that a PublicBarrier for this Barrier exists
         # Update its non-editable fields to match any updated values
         public_barrier, _ = PublicBarrier.public_barriers.get_or_create_for_barrier(
@@ -1235,7 +1293,7 @@ class PublicBarrier(FullyArchivableMixin, BaseModel):
     history = HistoricalRecords(bases=[PublicBarrierHistoricalModel])
 
     @classmethod
-    def get_history(cls, barrier_id):
+    def get_history(cls, barrier_id, since=None):
 
         qs = cls.history.filter(barrier__id=barrier_id)
 
@@ -1259,7 +1317,7 @@ class PublicBarrier(FullyArchivableMixin, BaseModel):
         )
 
         # Get all fields required - raw changes no enrichment
-        return get_model_history(qs, model="public_barrier", fields=fields)
+        return get_model_history(qs, model="public_barrier", fields=fields, since=since)
 
 
 class BarrierUserHit(models.Model):
@@ -1655,44 +1713,30 @@ class BarrierFilterSet(django_filters.FilterSet):
         """
         custom text search against multiple fields
             full value of code
-            full text search on summary
-            partial search on title
+            full text search on summary and export description
+            partial search on title and company/organisation names
+        ranked by relevance when ordering by it
         """
+        qs = lexical_search(queryset, value)
+        if self.is_relevance_ordered(queryset):
+            qs = order_by_rank(qs)
+        return qs
 
-        MAX_DEPTH_COUNT = 20
-
-        # Assuming the name field can appear in any of the nested dicts inside companies/related_organisations
-        company_queries = []
-        for i in range(MAX_DEPTH_COUNT):
-            company_queries.append(Q(**{f"companies__{i}__name__icontains": value}))
-            company_queries.append(
-                Q(**{f"related_organisations__{i}__name__icontains": value})
-            )
-
-        combined_company_related_organisation_query = Q()
-        for query in company_queries:
-            combined_company_related_organisation_query |= query
-
-        return queryset.annotate(
-            search=SearchVector("summary", "export_description"),
-        ).filter(
-            Q(code__icontains=value)
-            | Q(search=value)
-            | Q(title__icontains=value)
-            | Q(public_barrier__id__iexact=value.lstrip("PID-").upper())
-            | Q(combined_company_related_organisation_query)
-        )
+    def is_relevance_ordered(self, queryset):
+        # BarrierList leaves the ordering to the search filters when sorting by relevance
+        ordering_value = queryset.query.annotations.get("ordering_value")
+        return getattr(ordering_value, "value", None) == "query_calculated"
 
     def vector_search(self, queryset, name, value):
         """
-        full text search on multiple fields
+        hybrid search combining text_search with related barriers
         Args:
             queryset the queryset to filter
             name the name of the filter
             value the value of the filter
 
         Returns:
-            _type_: the resust is a queryset with a free text search applied to the barrier model
+            _type_: the lexical and semantic matches, fused into one ranking
         """
 
         from api.related_barriers import manager as handler_manager
@@ -1702,13 +1746,13 @@ class BarrierFilterSet(django_filters.FilterSet):
         # Filter out results with low similarity score
         SIMILARITY_THRESHOLD = 0.4
 
-        barrier_scores = related_barriers.get_similar_barriers_searched(
+        barrier_ids, scores = related_barriers.query_search_term(
             search_term=value,
             similarity_threshold=SIMILARITY_THRESHOLD,
             quantity=SIMILAR_BARRIERS_LIMIT,
-        )
+        ) or ([], [])
 
-        if not barrier_scores:
+        if not len(barrier_ids):
             # If no similar barriers are found, return the queryset with the text search applied
             # we do this to compensate for the fact that the related barriers handler may not have
             # emededings and barrier ids to return
@@ -1716,24 +1760,16 @@ class BarrierFilterSet(django_filters.FilterSet):
             # or when the related barriers handler is not running
             return self.text_search(queryset, name, value)
 
-        # For dashboard search, combine the functionality of text_search and related barriers
-        # and prioritise direct text_search matches by setting similarity score to 1.0
-        barrier_ids = [b[0] for b in barrier_scores]
-        related_barrier_qs = queryset.filter(id__in=barrier_ids)
-        text_search_qs = self.text_search(queryset, name, value)
-        text_search_ids = [str(b) for b in text_search_qs.values_list("id", flat=True)]
-        barrier_scores = [(k, v) for k, v in barrier_scores if k not in text_search_ids]
-
-        qs = (text_search_qs | related_barrier_qs).annotate(
+        # For dashboard search, fuse the text_search ranking with the related
+        # barriers ranking so barriers found by both come first
+        lexical_ids = lexical_ranking(queryset, value, SIMILAR_BARRIERS_LIMIT)
+        ranking = reciprocal_rank_fusion([lexical_ids, [str(b) for b in barrier_ids]])
+        qs = filter_by_ranking(queryset, ranking[:SIMILAR_BARRIERS_LIMIT]).annotate(
             barrier_id=Cast("id", output_field=CharField()),
-            similarity=Case(
-                *[When(id=k, then=Value(v.item())) for k, v in barrier_scores],
-                default=Value(1.0),
-            ),
         )
 
-        if getattr(queryset[0], "ordering_value", "") == "query_calculated":
-            qs = qs.order_by("-similarity")
+        if self.is_relevance_ordered(queryset):
+            qs = qs.order_by("ranking_position")
 
         return qs
 
@@ -2108,7 +2144,7 @@ class BarrierTopPrioritySummary(models.Model):
     history = HistoricalRecords()
 
     @classmethod
-    def get_history(cls, barrier_id):
+    def get_history(cls, barrier_id, since=None):
         qs = cls.history.filter(barrier__id=barrier_id)
         fields = ("top_priority_summary_text",)
 
@@ -2117,6 +2153,7 @@ class BarrierTopPrioritySummary(models.Model):
             model="barrier_top_priority_summary",  # TODO: Update frontend, legacy history marked this as barrier item
             fields=fields,
             track_first_item=True,
+            since=since,
         )
 
 
@@ -2147,7 +2184,7 @@ class BarrierNextStepItem(BaseModel):
         verbose_name_plural = "Barrier Next Step Items"
 
     @classmethod
-    def get_history(cls, barrier_id):
+    def get_history(cls, barrier_id, since=None):
         qs = cls.history.filter(barrier__id=barrier_id)
         fields = ("status", "next_step_item")
 
@@ -2155,4 +2192,5 @@ class BarrierNextStepItem(BaseModel):
             qs,
             model="barrier",
             fields=fields,
+            since=since,
         )
@@ -0,0 +1,227 @@
+"""
+Hybrid dashboard search: lexical matches ranked by postgres full text search
+are fused with the related barriers vector matches by reciprocal rank fusion.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import Expression, F, FloatField, IntegerField, Q, QuerySet
+from django.db.models.sql.constants import INNER
+
+# Constant from the original RRF paper, dampens the weight of the top ranks
+RRF_K = 60
+
+# Kept in sync with the backfill in barriers migration 0176
+BARRIER_SEARCH_VECTOR = (
+    SearchVector("title", weight="A")
+    + SearchVector("code", weight="A")
+    + SearchVector("company_names", weight="B")
+    + SearchVector("summary", weight="B")
+    + SearchVector("export_description", weight="C")
+)
+# Saves that update none of these leave the search vector as it is
+BARRIER_SEARCH_VECTOR_FIELDS = frozenset(
+    {"title", "code", "company_names", "summary", "export_description"}
+)
+
+
+def flatten_company_names(*organisations: Optional[List[dict]]) -> str:
+    """
+    Lower-cased names of the companies/organisations stored as JSON on a
+    barrier, one per line, so they can be matched with a single lookup.
+    """
+    return "\n".join(
+        str(organisation["name"]).lower()
+        for organisation_list in organisations
+        for organisation in organisation_list or []
+        if isinstance(organisation, dict) and organisation.get("name") is not None
+    )
+
+
+def lexical_filter(value: str) -> Q:
+    """
+    Every condition is answered by an index on the barrier table (trigram
+    indexes for the partial matches, see Barrier.Meta), so postgres can
+    combine them with a BitmapOr rather than scanning each row.
+    """
+    from api.barriers.models import PublicBarrier
+
+    # Resolved up front: a join to public barriers inside the OR would force
+    # a sequential scan of barriers
+    public_barrier_ids = PublicBarrier.objects.filter(
+        id__iexact=value.lstrip("PID-").upper()
+    ).values_list("barrier_id", flat=True)
+
+    return (
+        Q(code__icontains=value)
+        | Q(search_vector=SearchQuery(value))
+        | Q(title__icontains=value)
+        | Q(id__in=list(public_barrier_ids))
+        | Q(company_names__contains=value.lower())
+    )
+
+
+def lexical_search(queryset: QuerySet, value: str) -> QuerySet:
+    """
+    Barriers in `queryset` matching `value`, annotated with their full text
+    `search_rank` (null for matches on the partial lookups alone).
+    """
+    return queryset.filter(lexical_filter(value)).annotate(
+        search_rank=SearchRank(F("search_vector"), SearchQuery(value))
+    )
+
+
+def order_by_rank(queryset: QuerySet) -> QuerySet:
+    return queryset.order_by(F("search_rank").desc(nulls_last=True), "-reported_on")
+
+
+def lexical_ranking(queryset: QuerySet, value: str, limit: int) -> List[str]:
+    """
+    Ids of the barriers in `queryset` matching `value`, best match first.
+    """
+    return [
+        str(barrier_id)
+        for barrier_id in order_by_rank(lexical_search(queryset, value)).values_list(
+            "id", flat=True
+        )[:limit]
+    ]
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[str]], k: int = RRF_K
+) -> List[Tuple[str, float]]:
+    """
+    Merge rankings of ids into one, scoring each id by the sum of
+    1 / (k + rank) over the rankings it appears in.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class RankingJoin:
+    """
+    INNER JOIN of a ranking, passed as one array per column and unnested
+    WITH ORDINALITY, on the row's id. The arrays are bound once however many
+    of the ranking's columns are selected.
+
+    Provides the attributes and methods Query.alias_map expects of a join,
+    see django.db.models.sql.datastructures.Join.
+    """
+
+    table_name = "ranked"
+    join_field = None
+    filtered_relation = None
+    nullable = False
+
+    def __init__(
+        self,
+        ids: List[str],
+        scores: List[float],
+        parent_alias: str,
+        table_alias: Optional[str] = None,
+        join_type: str = INNER,
+    ):
+        self.ids = ids
+        self.scores = scores
+        self.parent_alias = parent_alias
+        self.table_alias = table_alias
+        self.join_type = join_type
+
+    def as_sql(self, compiler, connection):
+        qn = compiler.quote_name_unless_alias
+        qn2 = connection.ops.quote_name
+        ranked = qn(self.table_alias)
+        sql = (
+            f"{self.join_type} unnest(%s::uuid[], %s::float[]) WITH ORDINALITY"
+            f" AS {ranked}({qn2('id')}, {qn2('score')}, {qn2('position')})"
+            f" ON ({ranked}.{qn2('id')} = {qn(self.parent_alias)}.{qn2('id')})"
+        )
+        return sql, [self.ids, self.scores]
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(
+            self.ids,
+            self.scores,
+            change_map.get(self.parent_alias, self.parent_alias),
+            change_map.get(self.table_alias, self.table_alias),
+            self.join_type,
+        )
+
+    @property
+    def identity(self):
+        return (
+            self.__class__,
+            self.parent_alias,
+            tuple(self.ids),
+            tuple(self.scores),
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, RankingJoin):
+            return NotImplemented
+        return self.identity == other.identity
+
+    def __hash__(self):
+        return hash(self.identity)
+
+    def equals(self, other):
+        return self == other
+
+    def demote(self):
+        return self.relabeled_clone({})
+
+    def promote(self):
+        # The ranking restricts the rows, it is never outer joined
+        return self.relabeled_clone({})
+
+
+class RankingColumn(Expression):
+    """
+    A column of the joined ranking: "score" or "position".
+    """
+
+    def __init__(self, alias: str, column: str, output_field=None):
+        self.alias = alias
+        self.column = column
+        super().__init__(output_field=output_field)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.alias}, {self.column})"
+
+    def as_sql(self, compiler, connection):
+        qn = compiler.quote_name_unless_alias
+        return f"{qn(self.alias)}.{connection.ops.quote_name(self.column)}", []
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(
+            change_map.get(self.alias, self.alias),
+            self.column,
+            output_field=self.output_field,
+        )
+
+    def get_group_by_cols(self):
+        return [self]
+
+
+def filter_by_ranking(queryset: QuerySet, ranking: List[Tuple[str, float]]) -> QuerySet:
+    """
+    Restrict `queryset` to the ranked ids by joining the ranking, annotated
+    with their position (`ranking_position`) and fused score (`similarity`).
+    The ids travel as a single array parameter rather than one CASE arm each.
+    """
+    queryset = queryset.all()
+    alias = queryset.query.join(
+        RankingJoin(
+            [barrier_id for barrier_id, _ in ranking],
+            [round(score, 6) for _, score in ranking],
+            parent_alias=queryset.query.get_initial_alias(),
+        )
+    )
+    return queryset.annotate(
+        ranking_position=RankingColumn(alias, "position", IntegerField()),
+        similarity=RankingColumn(alias, "score", FloatField()),
+    )
@@ -1,10 +1,13 @@
 import datetime
+import functools
 import typing
+from collections import defaultdict
 
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Count, Q
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import Lag, Lead, RowNumber
 from rest_framework import serializers
 
 from api.action_plans.models import ActionPlan, ActionPlanTask
@@ -15,12 +18,14 @@ from api.barriers.models import (
     Barrier,
     BarrierProgressUpdate,
     BarrierTopPrioritySummary,
+    PublicBarrier,
 )
 from api.barriers.serializers.base import BarrierSerializerBase
 from api.barriers.serializers.progress_updates import (
     ProgrammeFundProgressUpdateSerializer,
 )
 from api.collaboration.models import TeamMember
+from api.history.v2.service import IsDistinctFrom
 from api.interactions.models import Interaction, PublicBarrierNote
 from api.interactions.serializers import (
     InteractionSerializer,
@@ -38,6 +43,239 @@ from api.metadata.constants import (
 )
 from api.metadata.utils import get_barrier_tag_from_title
 
+PENDING_TOP_PRIORITY_STATUSES = (
+    TOP_PRIORITY_BARRIER_STATUS.APPROVAL_PENDING,
+    TOP_PRIORITY_BARRIER_STATUS.REMOVAL_PENDING,
+)
+SCOPING_TAG_TITLE = "Scoping (Top 100 priority barrier)"
+# Barrier fields whose history the page columns are derived from
+PAGE_HISTORY_FIELDS = (
+    "status",
+    "priority_level",
+    "tags_cache",
+    "top_priority_status",
+    "estimated_resolution_date",
+)
+
+
+def get_history_change_points(barrier_ids) -> typing.Dict:
+    """
+    The historical records of the barriers where a PAGE_HISTORY_FIELDS field
+    changed, along with the first and last records and the last record of each
+    estimated resolution date. Each record includes the previous values of
+    the fields.
+    """
+
+    def window(expression):
+        return Window(
+            expression, partition_by=[F("id")], order_by=[F("history_date").asc()]
+        )
+
+    previous = {f"previous_{name}": name for name in PAGE_HISTORY_FIELDS}
+    changed = (
+        Q(history_row=1)
+        | Q(next_history_date__isnull=True)
+        | Q(
+            IsDistinctFrom(
+                F("estimated_resolution_date"), F("next_estimated_resolution_date")
+            )
+        )
+    )
+    for alias, name in previous.items():
+        changed |= Q(IsDistinctFrom(F(name), F(alias)))
+
+    rows = (
+        Barrier.history.filter(id__in=barrier_ids)
+        .annotate(
+            history_row=window(RowNumber()),
+            next_history_date=window(Lead("history_date")),
+            next_estimated_resolution_date=window(Lead("estimated_resolution_date")),
+            **{alias: window(Lag(name)) for alias, name in previous.items()},
+        )
+        .filter(changed)
+        .order_by("id", "history_date")
+        .values("id", "history_date", "history_row", *PAGE_HISTORY_FIELDS, *previous)
+    )
+
+    change_points = defaultdict(list)
+    for row in rows:
+        change_points[row["id"]].append(row)
+    return change_points
+
+
+def latest(rows, predicate):
+    for row in reversed(rows):
+        if predicate(row):
+            return row
+
+
+def format_date(value) -> typing.Optional[str]:
+    return value.strftime("%Y-%m-%d") if value else None
+
+
+def get_page_columns(barriers) -> typing.Dict:
+    """
+    The history derived and related columns of DataWorkspaceSerializer for a
+    page of barriers, computed in a constant number of queries.
+
+    Pass them to the serializer as the `page_columns` context.
+    """
+    barrier_ids = [barrier.id for barrier in barriers]
+    change_points = get_history_change_points(barrier_ids)
+    status_lookup = dict(BarrierStatus.choices)
+    scoping_tag_id = get_barrier_tag_from_title(SCOPING_TAG_TITLE)["id"]
+
+    team_counts = dict(
+        TeamMember.objects.filter(barrier_id__in=barrier_ids)
+        .values("barrier_id")
+        .annotate(count=Count("id"))
+        .values_list("barrier_id", "count")
+    )
+    active_action_plans = set(
+        ActionPlan.objects.get_active_action_plans()
+        .filter(barrier_id__in=barrier_ids)
+        .values_list("barrier_id", flat=True)
+    )
+    top_priority_summaries = {
+        summary.barrier_id: summary
+        for summary in BarrierTopPrioritySummary.objects.filter(
+            barrier_id__in=barrier_ids
+        ).select_related("created_by")
+    }
+    public_view_status_dates = {
+        (row["barrier_id"], row["_public_view_status"]): row["history_date"]
+        for row in PublicBarrier.history.filter(
+            barrier_id__in=barrier_ids,
+            _public_view_status__in=[
+                PublicBarrierStatus.APPROVAL_PENDING,
+                PublicBarrierStatus.PUBLISHING_PENDING,
+            ],
+        )
+        .order_by("barrier_id", "_public_view_status", "-history_date", "-history_id")
+        .distinct("barrier_id", "_public_view_status")
+        .values("barrier_id", "_public_view_status", "history_date")
+    }
+
+    columns = {}
+    for barrier in barriers:
+        rows = change_points.get(barrier.id, [])
+        erd = barrier.estimated_resolution_date
+
+        previous_erd = latest(rows, lambda row: row["estimated_resolution_date"] != erd)
+        if previous_erd and not previous_erd["estimated_resolution_date"]:
+            previous_erd = None
+        first_erd = next(
+            (row for row in rows if row["estimated_resolution_date"]), None
+        )
+
+        date_of_priority_level = None
+        if barrier.priority_level != PRIORITY_LEVELS.NONE:
+            date_of_priority_level = latest(
+                rows,
+                lambda row: row["previous_priority_level"] != barrier.priority_level,
+            )
+
+        date_of_top_priority_scoping = None
+        if scoping_tag_id in [tag.id for tag in barrier.tags.all()]:
+            date_of_top_priority_scoping = latest(
+                rows,
+                lambda row: scoping_tag_id not in (row["previous_tags_cache"] or []),
+            )
+
+        top_priority_requested_date = None
+        if barrier.top_priority_status in [
+            *PENDING_TOP_PRIORITY_STATUSES,
+            TOP_PRIORITY_BARRIER_STATUS.APPROVED,
+            TOP_PRIORITY_BARRIER_STATUS.RESOLVED,
+        ]:
+            top_priority_requested_date = latest(
+                rows,
+                lambda row: row["history_row"] == 1
+                or (
+                    row["top_priority_status"] in PENDING_TOP_PRIORITY_STATUSES
+                    and row["previous_top_priority_status"]
+                    not in PENDING_TOP_PRIORITY_STATUSES
+                ),
+            )
+
+        summary = top_priority_summaries.get(barrier.id)
+        summary_user = summary.created_by if summary else None
+
+        columns[barrier.id] = {
+            "status_history": [
+                {
+                    "date": row["history_date"].isoformat(),
+                    "status": {
+                        "id": row["status"],
+                        "name": status_lookup.get(row["status"], "Unknown"),
+                    },
+                }
+                for row in rows
+                if row["history_row"] == 1 or row["status"] != row["previous_status"]
+            ],
+            "team_count": team_counts.get(barrier.id, 0),
+            "action_plan_added": barrier.id in active_action_plans,
+            "estimated_resolution_updated_date": format_date(
+                previous_erd and previous_erd["history_date"]
+            ),
+            "previous_estimated_resolution_date": format_date(
+                previous_erd and previous_erd["estimated_resolution_date"]
+            ),
+            "first_estimated_resolution_date": format_date(
+                first_erd and first_erd["estimated_resolution_date"]
+            ),
+            "date_of_priority_level": format_date(
+                date_of_priority_level and date_of_priority_level["history_date"]
+            ),
+            "date_of_top_priority_scoping": format_date(
+                date_of_top_priority_scoping
+                and date_of_top_priority_scoping["history_date"]
+            ),
+            "top_priority_requested_date": format_date(
+                top_priority_requested_date
+                and top_priority_requested_date["history_date"]
+            ),
+            "top_priority_summary": (
+                summary.top_priority_summary_text if summary else None
+            ),
+            "date_top_priority_rationale_added": format_date(
+                summary and summary.modified_on
+            ),
+            "proposed_top_priority_change_user": (
+                f"{summary_user.first_name} {summary_user.last_name or ''}"
+                if summary_user
+                else None
+            ),
+            "public_barrier_set_to_awaiting_approval_on": format_date(
+                public_view_status_dates.get(
+                    (barrier.id, PublicBarrierStatus.APPROVAL_PENDING)
+                )
+            ),
+            "public_barrier_set_to_awaiting_publication_on": format_date(
+                public_view_status_dates.get(
+                    (barrier.id, PublicBarrierStatus.PUBLISHING_PENDING)
+                )
+            ),
+        }
+    return columns
+
+
+def page_column(method):
+    """
+    Serve a column from the `page_columns` context when the page of barriers
+    was precomputed, and compute it for the barrier alone otherwise.
+    """
+    column = method.__name__[len("get_") :]
+
+    @functools.wraps(method)
+    def get_column(self, obj):
+        page_columns = self.context.get("page_columns")
+        if page_columns is not None:
+            return page_columns[obj.id][column]
+        return method(self, obj)
+
+    return get_column
+
 
 class DataworkspaceActionPlanSerializer(serializers.ModelSerializer):
     strategic_context = serializers.SerializerMethodField()
@@ -422,6 +660,7 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
         except PreliminaryAssessment.DoesNotExist:
             pass
 
+    @page_column
     def get_status_history(self, obj):
         history = Barrier.get_history(
             barrier_id=obj.id, fields=["status"], track_first_item=True
@@ -438,9 +677,11 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
             for item in history
         ]
 
+    @page_column
     def get_team_count(self, obj):
         return TeamMember.objects.filter(barrier=obj).count()
 
+    @page_column
     def get_action_plan_added(self, obj):
         if not obj.action_plan:
             return False
@@ -469,6 +710,7 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
     def get_is_resolved_top_priority(self, obj):
         return obj.top_priority_status == TOP_PRIORITY_BARRIER_STATUS.RESOLVED
 
+    @page_column
     def get_estimated_resolution_updated_date(self, instance):
         try:
             history = (
@@ -485,6 +727,7 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
         else:
             return None
 
+    @page_column
     def get_previous_estimated_resolution_date(self, instance):
         try:
             history = (
@@ -501,6 +744,7 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
         else:
             return None
 
+    @page_column
     def get_date_of_priority_level(self, instance):
         if instance.priority_level == PRIORITY_LEVELS.NONE:
             return
@@ -515,6 +759,7 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
             if history[i + 1]["priority_level"] != instance.priority_level:
                 return history_item["history_date"].strftime("%Y-%m-%d")
 
+    @page_column
     def get_date_of_top_priority_scoping(self, instance):
         priority_tag = get_barrier_tag_from_title("Scoping (Top 100 priority barrier)")
         priority_tag_id = priority_tag["id"]
@@ -532,6 +777,7 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
             if priority_tag_id not in history[i + 1]["tags_cache"]:
                 return history_item["history_date"].strftime("%Y-%m-%d")
 
+    @page_column
     def get_first_estimated_resolution_date(self, instance):
         history = instance.history.filter(
             estimated_resolution_date__isnull=False
@@ -544,6 +790,7 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
 
         return first["estimated_resolution_date"].strftime("%Y-%m-%d")
 
+    @page_column
     def get_date_top_priority_rationale_added(self, instance):
         try:
             top_priority_summary = instance.top_priority_summary.latest("modified_on")
@@ -618,12 +865,14 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
             return instance.latest_progress_update.get_status_display()
         return None
 
+    @page_column
     def get_top_priority_summary(self, instance):
         priority_summary = BarrierTopPrioritySummary.objects.filter(barrier=instance)
         if priority_summary:
             latest_summary = priority_summary.latest("modified_on")
             return latest_summary.top_priority_summary_text
 
+    @page_column
     def get_proposed_top_priority_change_user(self, instance):
         try:
             top_priority_summary = instance.top_priority_summary.latest("modified_on")
@@ -634,6 +883,7 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
         if user:
             return f"{user.first_name} {user.last_name or ''}"
 
+    @page_column
     def get_top_priority_requested_date(self, instance):
         pending_states = [
             TOP_PRIORITY_BARRIER_STATUS.APPROVAL_PENDING,
@@ -791,6 +1041,7 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
         if hasattr(obj, "public_barrier"):
             return obj.public_barrier.approvers_summary
 
+    @page_column
     def get_public_barrier_set_to_awaiting_approval_on(self, obj):
         public_barrier = getattr(obj, "public_barrier")
         if not public_barrier:
@@ -802,6 +1053,7 @@ class DataWorkspaceSerializer(BarrierSerializerBase):
         if first_historical_record:
             return first_historical_record.history_date.strftime("%Y-%m-%d")
 
+    @page_column
     def get_public_barrier_set_to_awaiting_publication_on(self, obj):
         public_barrier = getattr(obj, "public_barrier")
         if not public_barrier:
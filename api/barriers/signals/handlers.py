@@ -16,8 +16,8 @@ from api.barriers.tasks import (
     send_top_priority_notification,
 )
 from api.metadata.constants import TOP_PRIORITY_BARRIER_STATUS
-from api.related_barriers.manager import BARRIER_UPDATE_FIELDS
-from api.related_barriers.tasks import update_related_barrier
+from api.related_barriers.constants import BARRIER_UPDATE_FIELDS
+from api.related_barriers.tasks import enqueue_related_barrier_update
 
 logger = logging.getLogger(__name__)
 
@@ -179,4 +179,4 @@ def related_barrier_update_embeddings(sender, instance, *args, **kwargs):
     )
 
     if changed and not current_barrier_object.draft:
-        update_related_barrier(barrier_id=str(instance.pk))
+        enqueue_related_barrier_update(barrier_id=str(instance.pk))
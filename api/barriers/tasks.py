@@ -81,12 +81,13 @@ def get_barriers_to_update_this_month():
     return barriers_to_update
 
 
-def get_barriers_overseas_region(country_id, trading_bloc):
+def get_barriers_overseas_region(country_id, trading_bloc, country_details=None):
 
     # Get the overseas region of the barrier
     if country_id:
         # Details stored in country metadata, not the barrier itself
-        country_details = get_country(str(country_id))
+        if not country_details:
+            country_details = get_country(str(country_id))
 
         # Special case for empty "overseas_region" - internal barriers for the UK go to the Europe regional lead
         if not country_details["overseas_region"]:
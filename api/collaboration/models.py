@@ -54,7 +54,7 @@ class TeamMember(ArchivableMixin, BarrierRelatedMixin, BaseModel):
         return self._cleansed_username(self.modified_by)
 
     @classmethod
-    def get_history(cls, barrier_id):
+    def get_history(cls, barrier_id, since=None):
 
         qs = (
             cls.history.select_related("user")
@@ -80,4 +80,5 @@ class TeamMember(ArchivableMixin, BarrierRelatedMixin, BaseModel):
             model="team_member",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
@@ -121,6 +121,14 @@ def list_s3_public_data_files(client=None):
 
 
 def serializer_to_csv_bytes(serializer, field_names) -> bytes:
+    return b"".join(stream_csv_bytes(serializer.data, field_names))
+
+
+def stream_csv_bytes(rows, field_names, chunk_size=1000):
+    """
+    CSV of the rows as utf-8 encoded chunks of up to chunk_size rows,
+    the first one starting with the header.
+    """
     output = io.StringIO()
     writer = csv.DictWriter(
         output,
@@ -129,7 +137,90 @@ def serializer_to_csv_bytes(serializer, field_names) -> bytes:
         quoting=csv.QUOTE_MINIMAL,
     )
     writer.writerow(field_names)
-    for row in serializer.data:
+    for count, row in enumerate(rows, 1):
         writer.writerow(_transform_csv_row(row))
-    content = output.getvalue().encode("utf-8")
-    return content
+        if count % chunk_size == 0:
+            yield output.getvalue().encode("utf-8")
+            output.seek(0)
+            output.truncate()
+    yield output.getvalue().encode("utf-8")
+
+
+class S3MultipartUpload(io.RawIOBase):
+    """
+    Writable file uploading to S3 in parts as it is written, so large files
+    never have to be held in memory or on disk.
+
+    Closing the file completes the upload, leaving the context manager with
+    an exception aborts it.
+    """
+
+    # S3 rejects smaller parts, other than the last one
+    MIN_PART_SIZE = 5 * 1024 * 1024
+
+    def __init__(self, client, bucket, key, part_size=MIN_PART_SIZE, **kwargs):
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, self.MIN_PART_SIZE)
+        self.parts = []
+        self.buffer = bytearray()
+        self.size = 0
+        self.upload_id = None
+        self.upload_id = client.create_multipart_upload(
+            Bucket=bucket, Key=key, **kwargs
+        )["UploadId"]
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.buffer += b
+        written = memoryview(b).nbytes
+        self.size += written
+        while len(self.buffer) >= self.part_size:
+            self._upload_part(self.buffer[: self.part_size])
+            del self.buffer[: self.part_size]
+        return written
+
+    def tell(self):
+        return self.size
+
+    def _upload_part(self, body):
+        part_number = len(self.parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=bytes(body),
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def close(self):
+        if not self.closed and self.upload_id is not None:
+            if self.buffer or not self.parts:
+                self._upload_part(self.buffer)
+                self.buffer.clear()
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={"Parts": self.parts},
+            )
+        super().close()
+
+    def abort(self):
+        if not self.closed and self.upload_id is not None:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id
+            )
+        self.buffer.clear()
+        super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
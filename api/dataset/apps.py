@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class DatasetConfig(AppConfig):
     name = "api.dataset"
+
+    def ready(self):
+        from api.history.signals import barrier_history_changed
+
+        from .service import barrier_history_mark_snapshot_changed
+
+        barrier_history_changed.connect(barrier_history_mark_snapshot_changed)
@@ -0,0 +1,201 @@
+"""
+Bulk export of the data workspace datasets.
+
+Each dataset is written as a zstd compressed Parquet file, streamed to S3 in
+parts as its row groups fill up, and a manifest lists the files along with
+their row counts. Values are written as strings, nested ones encoded as JSON,
+so the schema of a file only depends on its columns.
+"""
+
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from api.barriers.serializers import DataWorkspaceSerializer
+from api.core.utils import S3MultipartUpload
+from api.dataset.models import BarrierSnapshot
+from api.dataset.service import (
+    SNAPSHOT_BATCH_SIZE,
+    encode_watermark,
+    get_dataset_barriers,
+    iter_barrier_history,
+    serialize_dataset_barriers,
+)
+from api.documents.utils import get_bucket_name, get_s3_client_for_bucket
+from api.feedback.models import Feedback
+from api.feedback.serializers import FeedbackSerializer
+from api.user.models import UserActvitiyLog
+from api.user.serializers import UserActvitiyLogSerializer
+
+UserModel = get_user_model()
+
+EXPORT_BUCKET_ID = "default"
+EXPORT_KEY_PREFIX = "dataset-exports"
+EXPORT_LATEST_KEY = f"{EXPORT_KEY_PREFIX}/latest.json"
+EXPORT_FORMAT = "parquet"
+EXPORT_COMPRESSION = "zstd"
+EXPORT_ROW_GROUP_SIZE = 10000
+
+HISTORY_COLUMNS = [
+    "barrier_id",
+    "model",
+    "date",
+    "field",
+    "old_value",
+    "new_value",
+    "user_id",
+    "user_name",
+    "watermark",
+]
+USER_COLUMNS = ["id", "email", "first_name", "last_name", "last_login"]
+
+
+def get_barrier_rows() -> Iterator[Dict]:
+    if settings.DATASET_BARRIER_SNAPSHOTS:
+        yield from BarrierSnapshot.objects.order_by("created_on", "pk").values_list(
+            "data", flat=True
+        ).iterator(chunk_size=SNAPSHOT_BATCH_SIZE)
+        return
+
+    barrier_ids = list(get_dataset_barriers().values_list("id", flat=True))
+    for start in range(0, len(barrier_ids), SNAPSHOT_BATCH_SIZE):
+        barriers = list(
+            get_dataset_barriers().filter(
+                id__in=barrier_ids[start : start + SNAPSHOT_BATCH_SIZE]
+            )
+        )
+        yield from serialize_dataset_barriers(barriers)
+
+
+def get_history_rows() -> Iterator[Dict]:
+    for watermark, changes in iter_barrier_history():
+        if not changes:
+            continue
+        # Consumers resume the history stream from the last row's watermark
+        token = encode_watermark(watermark)
+        for h in changes:
+            yield {**h, "watermark": token}
+
+
+def get_serialized_rows(queryset, serializer_class) -> Iterator[Dict]:
+    for instance in queryset.iterator(chunk_size=EXPORT_ROW_GROUP_SIZE):
+        yield serializer_class(instance).data
+
+
+def get_export_datasets() -> Dict[str, Tuple[List[str], Iterator[Dict]]]:
+    """
+    The columns and rows of each exported dataset, keyed by its name.
+    """
+    return {
+        "barriers": (list(DataWorkspaceSerializer().fields), get_barrier_rows()),
+        "history": (HISTORY_COLUMNS, get_history_rows()),
+        "feedback": (
+            list(FeedbackSerializer().fields),
+            get_serialized_rows(
+                Feedback.objects.order_by("created_on", "pk"), FeedbackSerializer
+            ),
+        ),
+        "user_activity": (
+            list(UserActvitiyLogSerializer().fields),
+            get_serialized_rows(
+                UserActvitiyLog.objects.select_related("user").order_by(
+                    "event_time", "pk"
+                ),
+                UserActvitiyLogSerializer,
+            ),
+        ),
+        "users": (
+            USER_COLUMNS,
+            UserModel.objects.values(*USER_COLUMNS)
+            .order_by("id")
+            .iterator(chunk_size=EXPORT_ROW_GROUP_SIZE),
+        ),
+    }
+
+
+def to_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    text = DjangoJSONEncoder().encode(value)
+    # Ids and dates encode as JSON strings, which are written unquoted
+    return json.loads(text) if text.startswith('"') else text
+
+
+def write_parquet(client, bucket: str, key: str, columns: List[str], rows: Iterable):
+    """
+    Stream the rows to S3 as a Parquet file, returning its row count and size.
+    """
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    rows = iter(rows)
+    count = 0
+
+    with S3MultipartUpload(
+        client, bucket, key, ServerSideEncryption=settings.SERVER_SIDE_ENCRYPTION
+    ) as upload:
+        writer = pq.ParquetWriter(upload, schema, compression=EXPORT_COMPRESSION)
+        while batch := list(islice(rows, EXPORT_ROW_GROUP_SIZE)):
+            writer.write_batch(
+                pa.RecordBatch.from_pydict(
+                    {
+                        column: [to_text(row.get(column)) for row in batch]
+                        for column in columns
+                    },
+                    schema=schema,
+                )
+            )
+            count += len(batch)
+        writer.close()
+        size = upload.tell()
+
+    return count, size
+
+
+def export_datasets() -> Dict:
+    """
+    Export every dataset under a new prefix and point the latest manifest at it.
+    """
+    client = get_s3_client_for_bucket(EXPORT_BUCKET_ID)
+    bucket = get_bucket_name(EXPORT_BUCKET_ID)
+    created_on = timezone.now()
+    prefix = f"{EXPORT_KEY_PREFIX}/{created_on.strftime('%Y-%m-%d-%H-%M-%S')}"
+
+    files = []
+    for name, (columns, rows) in get_export_datasets().items():
+        key = f"{prefix}/{name}.{EXPORT_FORMAT}"
+        count, size = write_parquet(client, bucket, key, columns, rows)
+        files.append({"dataset": name, "key": key, "rows": count, "bytes": size})
+
+    manifest = {
+        "created_on": created_on.isoformat(),
+        "format": EXPORT_FORMAT,
+        "compression": EXPORT_COMPRESSION,
+        "files": files,
+    }
+    body = json.dumps(manifest).encode("utf-8")
+    for key in (f"{prefix}/manifest.json", EXPORT_LATEST_KEY):
+        client.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=body,
+            ContentType="application/json",
+            ServerSideEncryption=settings.SERVER_SIDE_ENCRYPTION,
+        )
+    return manifest
+
+
+def get_latest_manifest():
+    client = get_s3_client_for_bucket(EXPORT_BUCKET_ID)
+    try:
+        response = client.get_object(
+            Bucket=get_bucket_name(EXPORT_BUCKET_ID), Key=EXPORT_LATEST_KEY
+        )
+    except client.exceptions.NoSuchKey:
+        return None
+    return json.loads(response["Body"].read())
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.21
+
+import django.db.models.deletion
+import rest_framework.utils.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("barriers", "0177_barrier_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BarrierSnapshot",
+            fields=[
+                (
+                    "barrier",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="dataset_snapshot",
+                        serialize=False,
+                        to="barriers.barrier",
+                    ),
+                ),
+                ("created_on", models.DateTimeField(blank=True, null=True)),
+                (
+                    "data",
+                    models.JSONField(encoder=rest_framework.utils.encoders.JSONEncoder),
+                ),
+                ("refreshed_on", models.DateTimeField()),
+                ("changed_on", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "dataset_barrier_snapshot",
+                "indexes": [
+                    models.Index(
+                        fields=["created_on", "barrier"],
+                        name="barrier_snapshot_cursor",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import models
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.barriers.models import Barrier
+
+
+class BarrierSnapshot(models.Model):
+    """
+    A barrier as serialized for the Data Workspace barrier dataset.
+
+    Snapshots are refreshed by the refresh_barrier_snapshots task when the
+    barrier or its related records change.
+    """
+
+    barrier = models.OneToOneField(
+        Barrier,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="dataset_snapshot",
+    )
+    # The barrier's, to page through the dataset in the same order
+    created_on = models.DateTimeField(null=True, blank=True)
+    data = models.JSONField(encoder=JSONEncoder)
+    refreshed_on = models.DateTimeField()
+    changed_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "dataset_barrier_snapshot"
+        indexes = [
+            models.Index(
+                fields=["created_on", "barrier"],
+                name="barrier_snapshot_cursor",
+            ),
+        ]
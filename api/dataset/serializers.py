@@ -0,0 +1,6 @@
+from rest_framework import serializers
+
+
+class BarrierSnapshotSerializer(serializers.BaseSerializer):
+    def to_representation(self, instance):
+        return instance.data
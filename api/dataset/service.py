@@ -1,7 +1,56 @@
+import datetime
+import json
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Max, Prefetch, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import CursorPagination
 
-from api.barriers.models import Barrier
-from api.history.v2.service import get_history_changes
+from api.barriers.models import (
+    Barrier,
+    BarrierProgressUpdate,
+    EstimatedResolutionDateRequest,
+    ProgrammeFundProgressUpdate,
+    PublicBarrier,
+)
+from api.barriers.serializers import DataWorkspaceSerializer
+from api.barriers.serializers.data_workspace import get_page_columns
+from api.dataset.models import BarrierSnapshot
+from api.history.v2.service import (
+    compile_history_fields,
+    get_history_changes,
+    get_history_changes_sql,
+    get_item_changes,
+)
+from api.interactions.models import Interaction, PublicBarrierNote
+
+HISTORY_STREAM_CHUNK_SIZE = 2000
+# Records committed this long after they were saved are still streamed
+HISTORY_STREAM_OVERLAP = datetime.timedelta(minutes=5)
+WATERMARK_SALT = "dataset.barrier-history-stream"
+
+# The last record streamed, and the ids of the records streamed within
+# HISTORY_STREAM_OVERLAP of it
+Watermark = Tuple[datetime.datetime, int, FrozenSet[int]]
+
+SNAPSHOT_BATCH_SIZE = 200
+# Changes committed this long after they were saved are still picked up
+SNAPSHOT_REFRESH_OVERLAP = datetime.timedelta(minutes=5)
+# Related records that change without a historical record, with the path
+# to their barrier
+SNAPSHOT_RELATED_MODELS = (
+    (Interaction, "barrier_id"),
+    (PublicBarrierNote, "public_barrier__barrier_id"),
+    (BarrierProgressUpdate, "barrier_id"),
+    (ProgrammeFundProgressUpdate, "barrier_id"),
+    (PublicBarrier, "barrier_id"),
+)
 
 
 def get_paginator(ordering):
@@ -61,6 +110,35 @@ FIELDS = [
 ]
 
 
+def get_page_changes_sql(page):
+    """
+    Changes of the records on the page, each diffed in postgres against the
+    record before it even when that one is on the previous page.
+    """
+    if not page:
+        return []
+
+    first = (page[0]["id"], page[0]["history_date"])
+    last = (page[-1]["id"], page[-1]["history_date"])
+    history = get_history_changes_sql(
+        Barrier.history.filter(id__in={row["id"] for row in page}),
+        model="barrier",
+        fields=FIELDS,
+        primary_key="id",
+        ordering=("id", "history_date"),
+    )
+    return [h for h in history if first <= (h["id"], h["date"]) <= last]
+
+
+def format_history_item(h: Dict) -> Dict:
+    h["barrier_id"] = h["id"]
+    h["user_id"] = h["user"]["id"] if h["user"] else None
+    h["user_name"] = h["user"]["name"] if h["user"] else None
+    del h["user"]
+    del h["id"]
+    return h
+
+
 def get_barrier_history(request):
     qs = Barrier.history.all()
 
@@ -72,15 +150,243 @@ def get_barrier_history(request):
     page = paginator.paginate_queryset(qs, request)
     next = paginator.get_next_link()
 
-    history = get_history_changes(
-        page, model="barrier", fields=FIELDS, track_first_item=False, primary_key="id"
+    if settings.HISTORY_DIFF_ENGINE == "sql":
+        history = get_page_changes_sql(page)
+    else:
+        history = get_history_changes(
+            page,
+            model="barrier",
+            fields=FIELDS,
+            track_first_item=False,
+            primary_key="id",
+        )
+
+    return {"results": [format_history_item(h) for h in history], "next": next}
+
+
+def id_ranges(ids: Iterable[int]) -> List[List[int]]:
+    """
+    Sorted ids as [first, last] runs, history ids being mostly consecutive.
+    """
+    ranges = []
+    for history_id in sorted(ids):
+        if ranges and ranges[-1][1] == history_id - 1:
+            ranges[-1][1] = history_id
+        else:
+            ranges.append([history_id, history_id])
+    return ranges
+
+
+def encode_watermark(watermark: Watermark) -> str:
+    history_date, history_id, streamed_ids = watermark
+    return signing.dumps(
+        [history_date.isoformat(), history_id, id_ranges(streamed_ids)],
+        salt=WATERMARK_SALT,
+    )
+
+
+def decode_watermark(token: Optional[str]) -> Optional[Watermark]:
+    if not token:
+        return None
+    try:
+        history_date, history_id, *ranges = signing.loads(token, salt=WATERMARK_SALT)
+        # Watermarks from before the overlap list no ids, and re-stream it
+        streamed_ids = frozenset(
+            history_id
+            for first, last in (ranges[0] if ranges else [])
+            for history_id in range(first, last + 1)
+        )
+    except (signing.BadSignature, TypeError, ValueError):
+        raise ValidationError({"watermark": "Invalid watermark."})
+    return parse_datetime(history_date), history_id, streamed_ids
+
+
+def get_seed_rows(qs, since: datetime.datetime) -> Dict:
+    """
+    The last record before `since` of each barrier with records from then on.
+    """
+    rows = (
+        qs.filter(history_date__lt=since)
+        .filter(id__in=qs.filter(history_date__gte=since).values("id"))
+        .order_by("id", "-history_date", "-history_id")
+        .distinct("id")
+    )
+    return {row["id"]: row for row in rows}
+
+
+def iter_barrier_history(
+    watermark: Optional[Watermark] = None,
+) -> Iterator[Tuple[Watermark, List[Dict]]]:
+    """
+    The barrier historical records after the watermark, in the order they were
+    made, as their watermark and changes.
+
+    Records are read from a server-side cursor and each is diffed against the
+    barrier's previous record.
+
+    history_date is set when a record is saved, not when it is committed, so
+    a record can become visible behind the watermark. Reading resumes
+    HISTORY_STREAM_OVERLAP behind it, and records the watermark lists as
+    streamed are skipped. A record committed later than that is missed.
+    """
+    qs = Barrier.history.values(
+        "id",
+        "history_id",
+        "history_date",
+        "history_user__id",
+        "history_user__username",
+        *FIELDS,
+    )
+
+    previous_rows = {}
+    last, streamed_ids = None, frozenset()
+    if watermark is not None:
+        history_date, history_id, streamed_ids = watermark
+        last = (history_date, history_id)
+        since = history_date - HISTORY_STREAM_OVERLAP
+        previous_rows = get_seed_rows(qs, since)
+        qs = qs.filter(history_date__gte=since)
+
+    plan = compile_history_fields(FIELDS)
+    user_names = {}
+    # (history_date, history_id) of the records streamed within the overlap
+    window = deque()
+
+    for row in qs.order_by("history_date", "history_id").iterator(
+        chunk_size=HISTORY_STREAM_CHUNK_SIZE
+    ):
+        previous_row = previous_rows.get(row["id"])
+        previous_rows[row["id"]] = row
+        key = (row["history_date"], row["history_id"])
+        window.append(key)
+        if last is None or key > last:
+            last = key
+        while window[0][0] < last[0] - HISTORY_STREAM_OVERLAP:
+            window.popleft()
+        if row["history_id"] in streamed_ids:
+            continue
+
+        changes = []
+        if previous_row is not None:
+            changes = [
+                format_history_item(h)
+                for h in get_item_changes(
+                    "barrier", plan, row, previous_row, "id", user_names
+                )
+            ]
+        yield (*last, frozenset(history_id for _, history_id in window)), changes
+
+
+def stream_barrier_history(watermark: Optional[Watermark] = None) -> Iterator[str]:
+    """
+    Barrier history changes as NDJSON lines, in the order they were made.
+
+    Every line carries the watermark of its record and the stream ends with a
+    line holding the watermark to resume from.
+    """
+    for watermark, changes in iter_barrier_history(watermark):
+        if not changes:
+            continue
+        token = encode_watermark(watermark)
+        for h in changes:
+            yield json.dumps({**h, "watermark": token}, cls=DjangoJSONEncoder) + "\n"
+
+    yield json.dumps(
+        {"watermark": encode_watermark(watermark) if watermark else None}
+    ) + "\n"
+
+
+def get_dataset_barriers():
+    return (
+        Barrier.barriers.all()
+        .select_related("priority", "preliminary_assessment")
+        .prefetch_related(
+            "barrier_commodities",
+            "economic_assessments",
+            "organisations",
+            "tags",
+            "top_priority_summary",
+            Prefetch(
+                "estimated_resolution_date_request",
+                queryset=EstimatedResolutionDateRequest.objects.filter(
+                    status="NEEDS_REVIEW"
+                ),
+            ),
+        )
+        .order_by("reported_on")
+    )
+
+
+def serialize_dataset_barriers(barriers: List[Barrier]) -> List[Dict]:
+    return DataWorkspaceSerializer(
+        barriers, many=True, context={"page_columns": get_page_columns(barriers)}
+    ).data
+
+
+def get_stale_snapshot_barrier_ids(since: Optional[datetime.datetime]) -> set:
+    """
+    Barriers without a snapshot, or changed since theirs was refreshed.
+    """
+    refreshed_on = F("dataset_snapshot__refreshed_on")
+    barrier_ids = set(
+        Barrier.barriers.filter(
+            Q(dataset_snapshot__isnull=True)
+            | Q(modified_on__gt=refreshed_on)
+            | Q(dataset_snapshot__changed_on__gt=refreshed_on)
+        ).values_list("id", flat=True)
+    )
+    if since is not None:
+        for model, path in SNAPSHOT_RELATED_MODELS:
+            barrier_ids.update(
+                model._base_manager.filter(
+                    modified_on__gt=since - SNAPSHOT_REFRESH_OVERLAP
+                ).values_list(path, flat=True)
+            )
+    return barrier_ids
+
+
+def refresh_barrier_snapshots(batch_size: int = SNAPSHOT_BATCH_SIZE) -> int:
+    """
+    Serialize the barriers whose snapshot is stale into the snapshot table,
+    and drop the snapshots of barriers no longer in the dataset.
+    """
+    refreshed_on = timezone.now()
+    since = BarrierSnapshot.objects.aggregate(since=Max("refreshed_on"))["since"]
+    barrier_ids = sorted(get_stale_snapshot_barrier_ids(since), key=str)
+
+    for start in range(0, len(barrier_ids), batch_size):
+        barriers = list(
+            get_dataset_barriers().filter(
+                id__in=barrier_ids[start : start + batch_size]
+            )
+        )
+        BarrierSnapshot.objects.bulk_create(
+            [
+                BarrierSnapshot(
+                    barrier=barrier,
+                    created_on=barrier.created_on,
+                    data=data,
+                    refreshed_on=refreshed_on,
+                )
+                for barrier, data in zip(barriers, serialize_dataset_barriers(barriers))
+            ],
+            update_conflicts=True,
+            unique_fields=["barrier"],
+            update_fields=["created_on", "data", "refreshed_on"],
+        )
+
+    BarrierSnapshot.objects.exclude(barrier__in=Barrier.barriers.all()).delete()
+    return len(barrier_ids)
+
+
+def mark_snapshot_changed(barrier_id) -> None:
+    BarrierSnapshot.objects.filter(barrier_id=barrier_id).update(
+        changed_on=timezone.now()
     )
 
-    for h in history:
-        h["barrier_id"] = h["id"]
-        h["user_id"] = h["user"]["id"] if h["user"] else None
-        h["user_name"] = h["user"]["name"] if h["user"] else None
-        del h["user"]
-        del h["id"]
 
-    return {"results": history, "next": next}
+def barrier_history_mark_snapshot_changed(sender, barrier_id, **kwargs) -> None:
+    """
+    barrier_history_changed receiver
+    """
+    mark_snapshot_changed(barrier_id)
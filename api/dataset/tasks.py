@@ -0,0 +1,22 @@
+import logging
+
+from celery import shared_task
+
+from api.dataset import export, service
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_barrier_snapshots():
+    logger.info("Running refresh_barrier_snapshots() task")
+    count = service.refresh_barrier_snapshots()
+    logger.info(f"Refreshed {count} barrier snapshots")
+
+
+@shared_task
+def export_datasets():
+    logger.info("Running export_datasets() task")
+    manifest = export.export_datasets()
+    rows = ", ".join(f"{f['dataset']}: {f['rows']}" for f in manifest["files"])
+    logger.info(f"Exported datasets ({rows})")
@@ -3,6 +3,7 @@ from django.urls import path
 from api.dataset.views import (
     BarrierHistoryStreamView,
     BarrierList,
+    DatasetExportView,
     FeedbackDataWorkspaceListView,
     UserList,
 )
@@ -17,6 +18,7 @@ urlpatterns = [
         BarrierHistoryStreamView.as_view(),
         name="barrier-history-stream",
     ),
+    path("dataset/v1/export", DatasetExportView.as_view(), name="export"),
     path(
         "dataset/v1/feedback",
         FeedbackDataWorkspaceListView.as_view(),
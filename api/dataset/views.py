@@ -1,14 +1,25 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from hawkrest import HawkAuthentication
 from rest_framework import generics
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from api.barriers.models import Barrier, EstimatedResolutionDateRequest
 from api.barriers.serializers import DataWorkspaceSerializer
+from api.barriers.serializers.data_workspace import get_page_columns
+from api.dataset.export import EXPORT_BUCKET_ID, get_latest_manifest
+from api.dataset.models import BarrierSnapshot
 from api.dataset.pagination import MarketAccessDatasetViewCursorPagination
-from api.dataset.service import get_barrier_history
+from api.dataset.serializers import BarrierSnapshotSerializer
+from api.dataset.service import (
+    decode_watermark,
+    get_barrier_history,
+    get_dataset_barriers,
+    stream_barrier_history,
+)
+from api.documents.utils import sign_s3_url
 from api.feedback.models import Feedback
 from api.feedback.serializers import FeedbackSerializer
 from api.user.models import UserActvitiyLog
@@ -23,26 +34,23 @@ class BarrierList(generics.ListAPIView):
 
     pagination_class = MarketAccessDatasetViewCursorPagination
 
-    queryset = (
-        Barrier.barriers.all()
-        .select_related("priority", "preliminary_assessment")
-        .prefetch_related(
-            "barrier_commodities",
-            "economic_assessments",
-            "organisations",
-            "tags",
-            "top_priority_summary",
-            Prefetch(
-                "estimated_resolution_date_request",
-                queryset=EstimatedResolutionDateRequest.objects.filter(
-                    status="NEEDS_REVIEW"
-                ),
-            ),
-        )
-        .order_by("reported_on")
-    )
-
-    serializer_class = DataWorkspaceSerializer
+    def get_queryset(self):
+        if settings.DATASET_BARRIER_SNAPSHOTS:
+            return BarrierSnapshot.objects.all()
+        return get_dataset_barriers()
+
+    def get_serializer_class(self):
+        if settings.DATASET_BARRIER_SNAPSHOTS:
+            return BarrierSnapshotSerializer
+        return DataWorkspaceSerializer
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
+        if not settings.DATASET_BARRIER_SNAPSHOTS:
+            context["page_columns"] = get_page_columns(page)
+        serializer = self.get_serializer(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
 
 
 class BarrierHistoryStreamView(generics.ListAPIView):
@@ -50,9 +58,28 @@ class BarrierHistoryStreamView(generics.ListAPIView):
     permission_classes = (IsAuthenticated,)
 
     def list(self, request, *args, **kwargs):
+        if request.query_params.get("stream"):
+            watermark = decode_watermark(request.query_params.get("watermark"))
+            return StreamingHttpResponse(
+                stream_barrier_history(watermark),
+                content_type="application/x-ndjson",
+            )
         return Response(get_barrier_history(request))
 
 
+class DatasetExportView(generics.GenericAPIView):
+    authentication_classes = (HawkAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, *args, **kwargs):
+        manifest = get_latest_manifest()
+        if manifest is None:
+            raise NotFound("No dataset export has been made yet.")
+        for file in manifest["files"]:
+            file["url"] = sign_s3_url(EXPORT_BUCKET_ID, file["key"])
+        return Response(manifest)
+
+
 class FeedbackDataWorkspaceListView(generics.ListAPIView):
     authentication_classes = (HawkAuthentication,)
     permission_classes = (IsAuthenticated,)
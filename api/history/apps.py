@@ -0,0 +1,20 @@
+from django.apps import AppConfig
+
+
+class HistoryConfig(AppConfig):
+    name = "api.history"
+
+    def ready(self):
+        from django.db.models.signals import post_save
+        from simple_history.signals import post_create_historical_record
+
+        from .signals import barrier_history_changed
+        from .signals.handlers import (
+            barrier_history_rewind_timeline,
+            historical_record_created,
+            historical_record_updated,
+        )
+
+        post_create_historical_record.connect(historical_record_created)
+        post_save.connect(historical_record_updated)
+        barrier_history_changed.connect(barrier_history_rewind_timeline)
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent once a historical record of a barrier, or of one of its related tables,
+# has been committed. Receivers get barrier_id and the record's history_date.
+barrier_history_changed = Signal()
@@ -0,0 +1,45 @@
+from functools import partial
+
+from django.db import transaction
+from simple_history.models import HistoricalChanges
+
+from api.history.signals import barrier_history_changed
+from api.history.v2.timeline import get_barrier_id, rewind_timeline
+
+
+def send_barrier_history_changed(sender, barrier_id, history_date):
+    transaction.on_commit(
+        partial(
+            barrier_history_changed.send,
+            sender=sender,
+            barrier_id=barrier_id,
+            history_date=history_date,
+        )
+    )
+
+
+def historical_record_created(sender, instance, history_instance, **kwargs):
+    """
+    The history of the barrier the record belongs to has changed
+    """
+    barrier_id = get_barrier_id(instance)
+    if barrier_id is not None:
+        send_barrier_history_changed(sender, barrier_id, history_instance.history_date)
+
+
+def historical_record_updated(sender, instance, created, **kwargs):
+    """
+    Historical records are updated in place when their m2m caches change
+    """
+    if created or not isinstance(instance, HistoricalChanges):
+        return
+    barrier_id = get_barrier_id(instance.instance)
+    if barrier_id is not None:
+        send_barrier_history_changed(sender, barrier_id, instance.history_date)
+
+
+def barrier_history_rewind_timeline(sender, barrier_id, history_date, **kwargs):
+    """
+    Rewind the cached full history of the barrier
+    """
+    rewind_timeline(barrier_id, history_date)
@@ -4,7 +4,7 @@ Enrichments to historical data as done by legacy.
 
 from collections import namedtuple
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional
 
 from django.utils import formats
 from pytz import UTC
@@ -22,15 +22,50 @@ from api.metadata.constants import (
     TRADE_CATEGORIES,
     PublicBarrierStatus,
 )
-from api.metadata.utils import (
-    get_country,
-    get_location_text,
-    get_sector,
-    get_trading_bloc,
-)
+from api.metadata.utils import MetadataLookups, get_location_text
 from api.wto.models import WTOCommittee
 
 
+class EnrichmentLookups(NamedTuple):
+    committees: Dict[str, Dict]
+    metadata: MetadataLookups
+
+
+def get_enrichment_lookups(*histories: List[Dict]) -> EnrichmentLookups:
+    """
+    Resolve the WTO committees and metadata referenced across the histories
+    up front, in one query and one cache round trip however long they are.
+    """
+    committee_ids = set()
+    metadata_keys = set()
+    for history in histories:
+        for item in history:
+            values = [item["old_value"], item["new_value"]]
+            if item["field"] in ("committee_raised_in", "committee_notified"):
+                committee_ids.update(str(value) for value in values if value)
+            elif item["field"] in ("country", "commodities"):
+                metadata_keys.update(("dh_country_lookup", "dh_overseas_region_lookup"))
+                if item["field"] == "country" and any(
+                    value and value.get("admin_areas") for value in values
+                ):
+                    metadata_keys.add("dh_admin_area_lookup")
+            elif item["field"] == "main_sector":
+                metadata_keys.add("dh_sector_lookup")
+
+    committees = {}
+    if committee_ids:
+        committees = {
+            str(committee["id"]): {
+                "id": str(committee["id"]),
+                "name": committee["name"],
+            }
+            for committee in WTOCommittee.objects.filter(id__in=committee_ids).values(
+                "id", "name"
+            )
+        }
+    return EnrichmentLookups(committees, MetadataLookups(*sorted(metadata_keys)))
+
+
 def get_matching_history_item(
     history_item: Dict, history: List[Dict]
 ) -> Optional[Dict]:
@@ -41,7 +76,9 @@ def get_matching_history_item(
             return item
 
 
-def enrich_country(history: List[Dict]):
+def enrich_country(history: List[Dict], lookups: Optional[EnrichmentLookups] = None):
+    lookups = lookups or get_enrichment_lookups(history)
+
     for item in history:
         if item["field"] != "country":
             continue
@@ -52,12 +89,14 @@ def enrich_country(history: List[Dict]):
             trading_bloc=item["old_value"]["trading_bloc"],
             caused_by_trading_bloc=item["old_value"]["caused_by_trading_bloc"],
             admin_area_ids=item["old_value"]["admin_areas"],
+            lookups=lookups.metadata,
         )
         item["new_value"] = get_location_text(
             country_id=item["new_value"]["country"],
             trading_bloc=item["new_value"]["trading_bloc"],
             caused_by_trading_bloc=item["new_value"]["caused_by_trading_bloc"],
             admin_area_ids=item["new_value"]["admin_areas"],
+            lookups=lookups.metadata,
         )
 
 
@@ -104,9 +143,13 @@ def enrich_trade_category(history: List[Dict]):
         item["new_value"] = enrich(item["new_value"])
 
 
-def enrich_main_sector(history: List[Dict]):
+def enrich_main_sector(
+    history: List[Dict], lookups: Optional[EnrichmentLookups] = None
+):
+    lookups = lookups or get_enrichment_lookups(history)
+
     def enrich(value):
-        sector = get_sector(value)
+        sector = lookups.metadata.get_sector(value)
         if sector:
             return sector["name"]
 
@@ -202,13 +245,19 @@ def enrich_priority(history: List[Dict]):
         item["new_value"] = enrich(item["new_value"])
 
 
-def enrich_commodities(history: List[Dict]):
+def enrich_commodities(
+    history: List[Dict], lookups: Optional[EnrichmentLookups] = None
+):
+    lookups = lookups or get_enrichment_lookups(history)
+
     def enrich(value):
         for commodity in value or []:
             if commodity.get("country"):
-                commodity["country"] = get_country(commodity["country"].get("id"))
+                commodity["country"] = lookups.metadata.get_country(
+                    commodity["country"].get("id")
+                )
             elif commodity.get("trading_bloc"):
-                commodity["trading_bloc"] = get_trading_bloc(
+                commodity["trading_bloc"] = lookups.metadata.get_trading_bloc(
                     commodity["trading_bloc"].get("code")
                 )
         return value
@@ -221,14 +270,14 @@ def enrich_commodities(history: List[Dict]):
         item["new_value"] = enrich(item["new_value"])
 
 
-def enrich_committee_raised_in(history: List[Dict]):
+def enrich_committee_raised_in(
+    history: List[Dict], lookups: Optional[EnrichmentLookups] = None
+):
+    lookups = lookups or get_enrichment_lookups(history)
+
     def enrich(value):
         if value:
-            committee = WTOCommittee.objects.get(id=value)
-            return {
-                "id": str(committee.id),
-                "name": committee.name,
-            }
+            return dict(lookups.committees[str(value)])
         return value
 
     for item in history:
@@ -251,14 +300,14 @@ def enrich_rating(history: List[Dict]):
         item["new_value"] = enrich(item["new_value"])
 
 
-def enrich_committee_notified(history: List[Dict]):
+def enrich_committee_notified(
+    history: List[Dict], lookups: Optional[EnrichmentLookups] = None
+):
+    lookups = lookups or get_enrichment_lookups(history)
+
     def enrich(value):
         if value:
-            committee = WTOCommittee.objects.get(id=value)
-            return {
-                "id": str(committee.id),
-                "name": committee.name,
-            }
+            return dict(lookups.committees[str(value)])
         return value
 
     for item in history:
@@ -363,13 +412,18 @@ def enrich_scale_history(history: List[Dict]):
         item["new_value"] = enrich(item["new_value"])
 
 
-def enrich_public_barrier_location(history: List[Dict]):
+def enrich_public_barrier_location(
+    history: List[Dict], lookups: Optional[EnrichmentLookups] = None
+):
+    lookups = lookups or get_enrichment_lookups(history)
+
     def enrich(value):
         if value:
             return get_location_text(
                 country_id=value["country"],
                 trading_bloc=value["trading_bloc"],
                 caused_by_trading_bloc=value["caused_by_trading_bloc"],
+                lookups=lookups.metadata,
             )
         return value
 
@@ -33,11 +33,15 @@ List[str, FieldMapping]
     A collection of history fields in 1 item.
 """
 
+import datetime
+import functools
 import operator
 from collections import namedtuple
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
-from django.db.models import QuerySet
+from django.conf import settings
+from django.db.models import BooleanField, F, Func, Max, Q, QuerySet, Window
+from django.db.models.functions import Lag, RowNumber
 
 from api.core.utils import pretty_sso_name
 from api.history.v2.enrichment import (
@@ -69,6 +73,7 @@ from api.history.v2.enrichment import (
     enrich_top_priority_status,
     enrich_trade_category,
     enrich_wto_notified_status,
+    get_enrichment_lookups,
 )
 
 FieldMapping = namedtuple("FieldMapping", ["query_name", "name"])
@@ -103,28 +108,32 @@ def enrich_full_history(
     """
     Enrichment pipeline for full barrier history.
     """
-    enrich_country(barrier_history)
+    lookups = get_enrichment_lookups(
+        barrier_history, wto_history, public_barrier_history or []
+    )
+
+    enrich_country(barrier_history, lookups)
     enrich_preliminary_assessment(preliminary_assessment_history)
     enrich_trade_category(barrier_history)
-    enrich_main_sector(barrier_history)
+    enrich_main_sector(barrier_history, lookups)
     enrich_priority_level(barrier_history)
     enrich_sectors(barrier_history)
     enrich_status(barrier_history)
-    enrich_commodities(barrier_history)
+    enrich_commodities(barrier_history, lookups)
     enrich_rating(economic_assessment_history)
     enrich_top_priority_status(
         barrier_history=barrier_history,
         top_priority_summary_history=top_priority_summary_history,
     )
     enrich_committee_notification_document(wto_history)
-    enrich_committee_notified(wto_history)
-    enrich_committee_raised_in(wto_history)
+    enrich_committee_notified(wto_history, lookups)
+    enrich_committee_raised_in(wto_history, lookups)
     enrich_meeting_minutes(wto_history)
     enrich_wto_notified_status(wto_history)
     enrich_team_member_user(team_member_history)
 
     if public_barrier_history:
-        enrich_public_barrier_location(public_barrier_history)
+        enrich_public_barrier_location(public_barrier_history, lookups)
         enrich_public_barrier_sectors(public_barrier_history)
         enrich_public_barrier_publish_status(public_barrier_history)
         enrich_public_barrier_status(public_barrier_history)
@@ -187,6 +196,7 @@ def get_model_history(  # noqa: C901
     fields: Tuple[Union[str, FieldMapping, List[Union[str, FieldMapping]]], ...],
     track_first_item: bool = False,
     primary_key: Optional[str] = None,
+    since: Optional[datetime.datetime] = None,
 ) -> List[Dict]:
     """
     This function returns the raw historical changes for a django-simple-history table.
@@ -200,10 +210,17 @@ def get_model_history(  # noqa: C901
                         backward compatibility with the legacy history FE.
         track_first_item: Track first item in table (typically for M2M fields)
         primary_key: Separate records by primary key
+        since: Only return the changes made after this date, diffing the first
+               of them against the last record up to it
 
     Returns:
         Returns a list of dictionaries representing the historical changes.
     """
+    if settings.HISTORY_DIFF_ENGINE == "sql":
+        return get_history_changes_sql(
+            qs, model, fields, track_first_item, primary_key, since
+        )
+
     flattened_fields = flatten_fields(fields)
 
     if primary_key and primary_key not in flattened_fields:
@@ -213,141 +230,256 @@ def get_model_history(  # noqa: C901
         *flattened_fields, "history_date", "history_user__id", "history_user__username"
     )
 
-    return get_history_changes(qs, model, fields, track_first_item, primary_key)
+    previous_item = None
+    if since is not None:
+        previous_item = qs.filter(history_date__lte=since).reverse().first()
+        qs = qs.filter(history_date__gt=since)
+
+    return get_history_changes(
+        qs, model, fields, track_first_item, primary_key, previous_item
+    )
+
 
+class HistoryField(NamedTuple):
+    """
+    A field (or group of fields) of a history table, as rendered in its items.
+    """
 
-def get_history_changes(  # noqa: C901
-    qs, model, fields, track_first_item: bool = False, primary_key: Optional[str] = None
+    name: str
+    query_names: Tuple[str, ...]
+    display_names: Tuple[str, ...]
+    grouped: bool
+
+
+def compile_history_fields(
+    fields: Tuple[Union[str, FieldMapping, List[Union[str, FieldMapping]]], ...]
+) -> Tuple[HistoryField, ...]:
+    """
+    The history field plan of `fields`, compiled once per distinct fields.
+    """
+    return _compile_history_fields(
+        tuple(tuple(field) if isinstance(field, list) else field for field in fields)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_history_fields(fields) -> Tuple[HistoryField, ...]:
+    plan = []
+    for field in fields:
+        grouped = not isinstance(field, (str, FieldMapping))
+        mappings = [
+            f if isinstance(f, FieldMapping) else FieldMapping(f, f)
+            for f in (field if grouped else [field])
+        ]
+        plan.append(
+            HistoryField(
+                # The first field of a group is the primary field name
+                name=mappings[0].name.replace("_cache", ""),
+                query_names=tuple(f.query_name for f in mappings),
+                display_names=tuple(f.name for f in mappings),
+                grouped=grouped,
+            )
+        )
+    return tuple(plan)
+
+
+def get_history_changes(
+    qs,
+    model,
+    fields,
+    track_first_item: bool = False,
+    primary_key: Optional[str] = None,
+    previous_item: Optional[Dict] = None,
 ):
     count = qs.count() if isinstance(qs, QuerySet) else len(qs)
 
     history = []
 
-    if count <= 1 and not track_first_item:
+    if count + (previous_item is not None) <= 1 and not track_first_item:
         # No history
         return history
 
-    previous_item = None
+    plan = compile_history_fields(fields)
+    user_names = {}
 
     for item in qs:
-        primary_field = {}
-        if primary_key:
-            primary_field[primary_key] = item[primary_key]
-
         if primary_key and previous_item:
             if previous_item[primary_key] != item[primary_key]:
                 # If a new primary reference is found, treat it as the first item as its the first historical
                 # change for the object with that key
                 previous_item = None
+
         if previous_item is None:
             if track_first_item:
                 # Render first historical item in a table.
-                for field in fields:
-                    change = {"old_value": None, "new_value": {}}
-                    if isinstance(field, list):
-                        if change["old_value"] is None:
-                            change["old_value"] = {}
-                        if change["new_value"] is None:
-                            change["new_value"] = {}
-                        for f in field:
-                            f = f if isinstance(f, FieldMapping) else FieldMapping(f, f)
-                            change["old_value"][f.name] = None
-                            change["new_value"][f.name] = item[f.query_name]
-                    else:
-                        change["old_value"] = None
-                        change["new_value"] = item[field]
-
-                    history.append(
-                        {
-                            "model": model,
-                            "date": item["history_date"],
-                            "field": (
-                                field
-                                if isinstance(field, str)
-                                else (
-                                    field.name
-                                    if isinstance(field, FieldMapping)
-                                    else (
-                                        field[0].name
-                                        if isinstance(field[0], FieldMapping)
-                                        else field[0]
-                                    )
-                                )  # field[0] - First field defined is the primary field name
-                            ).replace("_cache", ""),
-                            "user": (
-                                {
-                                    "id": item["history_user__id"],
-                                    "name": pretty_sso_name(
-                                        item["history_user__username"]
-                                    ),
-                                }
-                                if item["history_user__id"]
-                                else None
-                            ),
-                            **change,
-                            **primary_field,
-                        }
-                    )
-            previous_item = item
-            continue
-
-        for field in fields:
-            change = {}
-            if isinstance(field, list):
-                any_grouped_field_has_change = False
-                old_values, new_values = {}, {}
-                for f in field:
-                    name = f if isinstance(f, str) else f.query_name
-                    if (
-                        not any_grouped_field_has_change
-                        and item[name] != previous_item[name]
-                    ):
-                        any_grouped_field_has_change = True
-
-                    # normalize all fields to FieldMapping
-                    f = f if isinstance(f, FieldMapping) else FieldMapping(f, f)
-                    old_values[f.name] = previous_item[f.query_name]
-                    new_values[f.name] = item[f.query_name]
-
-                if any_grouped_field_has_change:
-                    change["old_value"] = old_values
-                    change["new_value"] = new_values
-
-            elif item[field] != previous_item[field]:
-                change["old_value"] = previous_item[field]
-                change["new_value"] = item[field]
-
-            if change:
-                history.append(
-                    {
-                        "model": model,
-                        "date": item["history_date"],
-                        "field": (
-                            field
-                            if isinstance(field, str)
-                            else (
-                                field.name
-                                if isinstance(field, FieldMapping)
-                                else (
-                                    field[0].name
-                                    if isinstance(field[0], FieldMapping)
-                                    else field[0]
-                                )
-                            )  # field[0] - First field defined is the primary field name
-                        ).replace("_cache", ""),
-                        "user": (
-                            {
-                                "id": item["history_user__id"],
-                                "name": pretty_sso_name(item["history_user__username"]),
-                            }
-                            if item["history_user__id"]
-                            else None
-                        ),
-                        **change,
-                        **primary_field,
-                    }
+                history += get_first_item_changes(
+                    model, plan, item, primary_key, user_names
                 )
+        else:
+            history += get_item_changes(
+                model, plan, item, previous_item, primary_key, user_names
+            )
 
         previous_item = item
 
     return history
+
+
+def get_first_item_changes(
+    model, plan, item, primary_key=None, user_names=None
+) -> List[Dict]:
+    history = []
+    for field in plan:
+        if field.grouped:
+            old_value = dict.fromkeys(field.display_names)
+            new_value = {
+                name: item[query_name]
+                for query_name, name in zip(field.query_names, field.display_names)
+            }
+        else:
+            old_value, new_value = None, item[field.query_names[0]]
+
+        history.append(
+            get_history_item(
+                model, field, item, old_value, new_value, primary_key, user_names
+            )
+        )
+    return history
+
+
+def get_item_changes(
+    model, plan, item, previous_item, primary_key=None, user_names=None
+) -> List[Dict]:
+    history = []
+    for field in plan:
+        if field.grouped:
+            if all(item[name] == previous_item[name] for name in field.query_names):
+                continue
+            old_value, new_value = {}, {}
+            for query_name, name in zip(field.query_names, field.display_names):
+                old_value[name] = previous_item[query_name]
+                new_value[name] = item[query_name]
+        else:
+            query_name = field.query_names[0]
+            if item[query_name] == previous_item[query_name]:
+                continue
+            old_value, new_value = previous_item[query_name], item[query_name]
+
+        history.append(
+            get_history_item(
+                model, field, item, old_value, new_value, primary_key, user_names
+            )
+        )
+    return history
+
+
+def get_history_item(
+    model, field, item, old_value, new_value, primary_key=None, user_names=None
+) -> Dict:
+    history_item = {
+        "model": model,
+        "date": item["history_date"],
+        "field": field.name,
+        "user": None,
+        "old_value": old_value,
+        "new_value": new_value,
+    }
+    if item["history_user__id"]:
+        username = item["history_user__username"]
+        if user_names is None:
+            user_names = {}
+        if username not in user_names:
+            user_names[username] = pretty_sso_name(username)
+        history_item["user"] = {
+            "id": item["history_user__id"],
+            "name": user_names[username],
+        }
+    if primary_key:
+        history_item[primary_key] = item[primary_key]
+    return history_item
+
+
+class IsDistinctFrom(Func):
+    arg_joiner = " IS DISTINCT FROM "
+    template = "(%(expressions)s)"
+    output_field = BooleanField()
+
+
+def get_history_changes_sql(
+    qs: QuerySet,
+    model: str,
+    fields: Tuple[Union[str, FieldMapping, List[Union[str, FieldMapping]]], ...],
+    track_first_item: bool = False,
+    primary_key: Optional[str] = None,
+    since: Optional[datetime.datetime] = None,
+    ordering: Tuple[str, ...] = ("history_date",),
+) -> List[Dict]:
+    """
+    get_model_history with the diffing done by postgres: every record is
+    paired with the one before it in `ordering` by LAG() and only the records
+    with a changed field, or that start a new object, are fetched.
+    """
+    flattened_fields = flatten_fields(fields)
+
+    if primary_key and primary_key not in flattened_fields:
+        flattened_fields.append(primary_key)
+
+    if since is not None:
+        # Keep the last record up to `since` to diff the first change against
+        last_date = qs.filter(history_date__lte=since).aggregate(
+            last_date=Max("history_date")
+        )["last_date"]
+        if last_date is None:
+            qs = qs.filter(history_date__gt=since)
+        else:
+            qs = qs.filter(history_date__gte=last_date)
+
+    order_by = [F(name).asc() for name in ordering]
+    previous = {name: f"previous_{i}" for i, name in enumerate(flattened_fields)}
+
+    changed = Q(history_row=1)
+    for name, alias in previous.items():
+        changed |= Q(IsDistinctFrom(F(name), F(alias)))
+
+    rows = (
+        qs.annotate(
+            history_row=Window(RowNumber(), order_by=order_by),
+            **{
+                alias: Window(Lag(name), order_by=order_by)
+                for name, alias in previous.items()
+            },
+        )
+        .filter(changed)
+        .order_by(*ordering)
+        .values(
+            *flattened_fields,
+            *previous.values(),
+            "history_row",
+            "history_date",
+            "history_user__id",
+            "history_user__username",
+        )
+    )
+
+    plan = compile_history_fields(fields)
+    user_names = {}
+
+    history = []
+    for item in rows:
+        if since is not None and item["history_date"] <= since:
+            continue
+
+        previous_item = {name: item[alias] for name, alias in previous.items()}
+        if item["history_row"] == 1 or (
+            primary_key and previous_item[primary_key] != item[primary_key]
+        ):
+            if track_first_item:
+                history += get_first_item_changes(
+                    model, plan, item, primary_key, user_names
+                )
+        else:
+            history += get_item_changes(
+                model, plan, item, previous_item, primary_key, user_names
+            )
+
+    return history
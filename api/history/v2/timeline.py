@@ -0,0 +1,153 @@
+"""
+Cached full barrier history.
+
+The raw changes of every history table making up a barrier's full history are
+cached along with a high-water mark. A historical record saved for the barrier
+rewinds the mark to its history date, and the next request only diffs the
+records after the mark before running the enrichment pipeline again.
+"""
+
+import copy
+import datetime
+from typing import Callable, Dict, List, Optional
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+
+from api.action_plans.models import ActionPlan, ActionPlanMilestone, ActionPlanTask
+from api.assessment.models import (
+    EconomicAssessment,
+    EconomicImpactAssessment,
+    PreliminaryAssessment,
+    ResolvabilityAssessment,
+    StrategicAssessment,
+)
+from api.barriers.models import (
+    Barrier,
+    BarrierNextStepItem,
+    BarrierProgressUpdate,
+    BarrierTopPrioritySummary,
+    EstimatedResolutionDateRequest,
+    ProgrammeFundProgressUpdate,
+    PublicBarrier,
+)
+from api.collaboration.models import TeamMember
+from api.history.v2.service import enrich_full_history
+from api.wto.models import WTOProfile
+
+TIMELINE_CACHE_KEY = "BARRIER_HISTORY_TIMELINE:{barrier_id}"
+TIMELINE_REWIND_CACHE_KEY = "BARRIER_HISTORY_TIMELINE_REWIND:{barrier_id}"
+TIMELINE_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# Bump when the history items or their enrichment change shape
+TIMELINE_VERSION = 1
+
+# Paths from a history table's instance to its barrier id
+BARRIER_ID_PATHS = (
+    ("barrier_id",),
+    ("economic_assessment", "barrier_id"),
+    ("action_plan", "barrier_id"),
+    ("milestone", "action_plan", "barrier_id"),
+)
+
+HistorySource = Callable[[str, Optional[datetime.datetime]], List[Dict]]
+
+
+def get_history_sources(barrier: Barrier) -> Dict[str, HistorySource]:
+    """
+    The history tables of the full history, keyed by their argument name
+    in enrich_full_history.
+    """
+    sources = {
+        "barrier_history": Barrier.get_history,
+        "preliminary_assessment_history": PreliminaryAssessment.get_history,
+        "programme_fund_history": ProgrammeFundProgressUpdate.get_history,
+        "top_priority_summary_history": BarrierTopPrioritySummary.get_history,
+        "wto_history": WTOProfile.get_history,
+        "team_member_history": TeamMember.get_history,
+        "economic_assessment_history": EconomicAssessment.get_history,
+        "economic_impact_assessment_history": EconomicImpactAssessment.get_history,
+        "resolvability_assessment_history": ResolvabilityAssessment.get_history,
+        "strategic_assessment_history": StrategicAssessment.get_history,
+        "action_plan_history": ActionPlan.get_history,
+        "action_plan_task_history": ActionPlanTask.get_history,
+        "action_plan_milestone_history": ActionPlanMilestone.get_history,
+        "delivery_confidence_history": BarrierProgressUpdate.get_history,
+        "next_step_item_history": BarrierNextStepItem.get_history,
+        "estimated_resolution_date_request_history": (
+            EstimatedResolutionDateRequest.get_history
+        ),
+    }
+    if barrier.has_public_barrier:
+        sources["public_barrier_history"] = PublicBarrier.get_history
+    return sources
+
+
+def get_full_history(barrier: Barrier) -> List[Dict]:
+    """
+    Enriched full history of a barrier, diffing only the historical records
+    saved since it was last computed.
+    """
+    key = TIMELINE_CACHE_KEY.format(barrier_id=barrier.pk)
+    rewind_key = TIMELINE_REWIND_CACHE_KEY.format(barrier_id=barrier.pk)
+
+    timeline = cache.get(key)
+    if timeline is not None and timeline["version"] != TIMELINE_VERSION:
+        timeline = None
+    rewind = cache.get(rewind_key)
+    if timeline is not None and rewind is None:
+        return timeline["history"]
+
+    # Records committed from here on rewind the mark again
+    cache.delete(rewind_key)
+    mark = timezone.now()
+    since = None
+    if timeline is not None:
+        since = min(timeline["mark"], rewind)
+
+    changes = {}
+    for name, get_history in get_history_sources(barrier).items():
+        cached = timeline["changes"].get(name) if timeline else None
+        if cached is None:
+            changes[name] = get_history(barrier.pk)
+        else:
+            changes[name] = [item for item in cached if item["date"] <= since]
+            changes[name] += get_history(barrier.pk, since=since)
+
+    history = enrich_full_history(
+        **{"public_barrier_history": None, **copy.deepcopy(changes)}
+    )
+    cache.set(
+        key,
+        {
+            "version": TIMELINE_VERSION,
+            "mark": mark,
+            "changes": changes,
+            "history": history,
+        },
+        timeout=TIMELINE_CACHE_TIMEOUT,
+    )
+    return history
+
+
+def rewind_timeline(barrier_id: str, history_date: datetime.datetime) -> None:
+    key = TIMELINE_REWIND_CACHE_KEY.format(barrier_id=barrier_id)
+    rewind = cache.get(key)
+    if rewind is None or history_date < rewind:
+        cache.set(key, history_date, timeout=TIMELINE_CACHE_TIMEOUT)
+
+
+def get_barrier_id(instance) -> Optional[str]:
+    """
+    The barrier a history table's instance belongs to, if any.
+    """
+    if isinstance(instance, Barrier):
+        return instance.pk
+    for path in BARRIER_ID_PATHS:
+        value = instance
+        try:
+            for attribute in path:
+                value = getattr(value, attribute)
+        except (AttributeError, ObjectDoesNotExist):
+            continue
+        return value
@@ -79,7 +79,7 @@ def get_os_regions_and_countries():
 def get_country(country_id):
     country_lookup = cache.get("dh_country_lookup")
     if not country_lookup:
-        country_lookup = {country["id"]: country for country in get_countries()}
+        country_lookup = build_country_lookup()
         cache.set("dh_country_lookup", country_lookup, 7200)
     country = country_lookup.get(country_id)
     if country:
@@ -92,6 +92,10 @@ def get_countries():
     return dh_countries
 
 
+def build_country_lookup():
+    return {country["id"]: country for country in get_countries()}
+
+
 def get_country_ids_by_overseas_region(region_id):
     countries = get_countries()
     return [
@@ -105,9 +109,7 @@ def get_country_ids_by_overseas_region(region_id):
 def get_admin_area(admin_area_id):
     admin_area_lookup = cache.get("dh_admin_area_lookup")
     if not admin_area_lookup:
-        admin_area_lookup = {
-            admin_area["id"]: admin_area for admin_area in get_admin_areas()
-        }
+        admin_area_lookup = build_admin_area_lookup()
         cache.set("dh_admin_area_lookup", admin_area_lookup, 7200)
     return admin_area_lookup.get(str(admin_area_id))
 
@@ -116,24 +118,32 @@ def get_admin_areas():
     return import_api_results("administrative-area")
 
 
+def build_admin_area_lookup():
+    return {admin_area["id"]: admin_area for admin_area in get_admin_areas()}
+
+
 def get_overseas_region(overseas_region_id):
     overseas_region_lookup = cache.get("dh_overseas_region_lookup")
     if not overseas_region_lookup:
-        dh_countries = import_api_results("country")
-        overseas_region_lookup = {}
-        for country in dh_countries:
-            if country.get("overseas_region"):
-                overseas_region = country["overseas_region"]
-                overseas_region_lookup[overseas_region["id"]] = overseas_region
-
+        overseas_region_lookup = build_overseas_region_lookup()
         cache.set("dh_overseas_region_lookup", overseas_region_lookup, 7200)
     return overseas_region_lookup.get(str(overseas_region_id))
 
 
+def build_overseas_region_lookup():
+    dh_countries = import_api_results("country")
+    overseas_region_lookup = {}
+    for country in dh_countries:
+        if country.get("overseas_region"):
+            overseas_region = country["overseas_region"]
+            overseas_region_lookup[overseas_region["id"]] = overseas_region
+    return overseas_region_lookup
+
+
 def get_sector(sector_id):
     sector_lookup = cache.get("dh_sector_lookup")
     if not sector_lookup:
-        sector_lookup = {sector["id"]: sector for sector in get_sectors()}
+        sector_lookup = build_sector_lookup()
         cache.set("dh_sector_lookup", sector_lookup, 7200)
     return sector_lookup.get(str(sector_id))
 
@@ -142,6 +152,63 @@ def get_sectors():
     return import_api_results("sector")
 
 
+def build_sector_lookup():
+    return {sector["id"]: sector for sector in get_sectors()}
+
+
+METADATA_LOOKUPS = {
+    "dh_country_lookup": build_country_lookup,
+    "dh_admin_area_lookup": build_admin_area_lookup,
+    "dh_overseas_region_lookup": build_overseas_region_lookup,
+    "dh_sector_lookup": build_sector_lookup,
+}
+
+
+class MetadataLookups:
+    """
+    In-memory country, admin area, overseas region and sector lookups,
+    fetched from the cache in a single round trip.
+
+    The lookups not named are left empty.
+    """
+
+    def __init__(self, *keys):
+        lookups = cache.get_many(keys)
+        missing = {key: METADATA_LOOKUPS[key]() for key in keys if not lookups.get(key)}
+        if missing:
+            cache.set_many(missing, 7200)
+            lookups.update(missing)
+
+        self.countries = lookups.get("dh_country_lookup", {})
+        self.admin_areas = lookups.get("dh_admin_area_lookup", {})
+        self.overseas_regions = lookups.get("dh_overseas_region_lookup", {})
+        self.sectors = lookups.get("dh_sector_lookup", {})
+
+    def get_country(self, country_id):
+        country = self.countries.get(country_id)
+        if country:
+            country = {
+                **country,
+                "trading_bloc": self.get_trading_bloc_by_country_id(country["id"]),
+            }
+        return country
+
+    def get_admin_area(self, admin_area_id):
+        return self.admin_areas.get(str(admin_area_id))
+
+    def get_sector(self, sector_id):
+        return self.sectors.get(str(sector_id))
+
+    def get_overseas_region(self, overseas_region_id):
+        return self.overseas_regions.get(str(overseas_region_id))
+
+    def get_trading_bloc(self, code):
+        return resolve_trading_bloc(code, self.get_overseas_region)
+
+    def get_trading_bloc_by_country_id(self, country_id):
+        return resolve_trading_bloc_by_country_id(country_id, self.get_overseas_region)
+
+
 def get_policy_teams() -> List[Dict]:
     from api.metadata.serializers import PolicyTeamSerializer
 
@@ -183,28 +250,37 @@ def get_reporting_stages():
     )
 
 
-def get_trading_bloc(code):
+def resolve_trading_bloc(code, get_overseas_region):
+    """
+    The trading bloc for `code`, its overseas regions looked up with
+    `get_overseas_region` so the cache backed lookups and MetadataLookups
+    share one shape.
+    """
     trading_bloc = TRADING_BLOCS.get(code)
     if trading_bloc:
         return {
             "code": trading_bloc["code"],
             "name": trading_bloc["name"],
             "short_name": trading_bloc["short_name"],
-            "overseas_regions": get_trading_bloc_overseas_regions(trading_bloc["code"]),
+            "overseas_regions": [
+                get_overseas_region(region_id)
+                for region_id in trading_bloc["overseas_regions"]
+            ],
         }
 
 
-def get_trading_bloc_by_country_id(country_id):
+def resolve_trading_bloc_by_country_id(country_id, get_overseas_region):
     for trading_bloc in TRADING_BLOCS.values():
         if country_id in trading_bloc["country_ids"]:
-            return {
-                "code": trading_bloc["code"],
-                "name": trading_bloc["name"],
-                "short_name": trading_bloc["short_name"],
-                "overseas_regions": get_trading_bloc_overseas_regions(
-                    trading_bloc["code"]
-                ),
-            }
+            return resolve_trading_bloc(trading_bloc["code"], get_overseas_region)
+
+
+def get_trading_bloc(code):
+    return resolve_trading_bloc(code, get_overseas_region)
+
+
+def get_trading_bloc_by_country_id(country_id):
+    return resolve_trading_bloc_by_country_id(country_id, get_overseas_region)
 
 
 def get_trading_bloc_country_ids(trading_bloc_code):
@@ -240,14 +316,18 @@ def get_wto_committee_groups():
 
 
 def get_location_text(
-    country_id, trading_bloc=None, caused_by_trading_bloc=None, admin_area_ids=()
+    country_id,
+    trading_bloc=None,
+    caused_by_trading_bloc=None,
+    admin_area_ids=(),
+    lookups=None,
 ):
     if not country_id:
         if trading_bloc:
             return TRADING_BLOCS.get(trading_bloc, {}).get("name")
         return None
 
-    country = get_country(str(country_id))
+    country = (lookups.get_country if lookups else get_country)(str(country_id))
     if not country:
         return None
     country_name = country["name"]
@@ -259,7 +339,9 @@ def get_location_text(
     if admin_area_ids:
 
         def admin_area_name(admin_area_id):
-            admin_area = get_admin_area(admin_area_id) or {}
+            admin_area = (lookups.get_admin_area if lookups else get_admin_area)(
+                admin_area_id
+            ) or {}
             return admin_area.get("name", "")
 
         admin_areas_string = ", ".join(admin_area_name(_id) for _id in admin_area_ids)
@@ -1,8 +1,54 @@
 from collections import namedtuple
+from typing import List
 
 SIMILARITY_THRESHOLD: float = 0.19
 SIMILAR_BARRIERS_LIMIT: int = 5000
 
+# Barrier fields whose changes trigger re-embedding
+BARRIER_UPDATE_FIELDS: List[str] = ["title", "summary"]
+
+# Vector index tuning: corpora smaller than the training size are searched
+# exhaustively, larger ones are clustered into ~sqrt(N) lists of which
+# VECTOR_INDEX_PROBES are scanned per top-k query. Threshold queries scan every
+# list that could hold a match, so they stay exact.
+VECTOR_INDEX_MIN_TRAINING_SIZE: int = 2000
+VECTOR_INDEX_PROBES: int = 8
+VECTOR_INDEX_KMEANS_ITERATIONS: int = 10
+
+# Embedding store layout: rows are grouped into fixed size blocks of
+# EMBEDDING_STORE_DTYPE vectors ("float16" halves the cache footprint at a
+# small cost in precision). Tombstoned rows are compacted away once they
+# exceed EMBEDDING_STORE_COMPACTION_RATIO of all rows.
+EMBEDDING_STORE_DTYPE: str = "float32"
+EMBEDDING_STORE_BLOCK_SIZE: int = 256
+EMBEDDING_STORE_COMPACTION_RATIO: float = 0.2
+# Readers more than EMBEDDING_STORE_MAX_CHANGES versions behind, or whose
+# change log entries have expired, reload the whole store instead.
+EMBEDDING_STORE_MAX_CHANGES: int = 500
+EMBEDDING_STORE_CHANGE_LOG_TIMEOUT: int = 60 * 60 * 24
+
+# Barrier saves are coalesced for this long before being re-embedded as a batch
+RELATED_BARRIER_UPDATE_WINDOW_SECONDS: int = 5
+
+# Search term embeddings are kept in a per process LRU of this many entries
+# and in the shared cache for QUERY_EMBEDDING_CACHE_TIMEOUT seconds
+QUERY_EMBEDDING_CACHE_SIZE: int = 1024
+QUERY_EMBEDDING_CACHE_TIMEOUT: int = 60 * 60
+
+# The optional embedding worker gathers encode requests arriving within
+# EMBEDDING_WORKER_MAX_WAIT_SECONDS of each other into one forward pass
+EMBEDDING_WORKER_MAX_BATCH_SIZE: int = 64
+EMBEDDING_WORKER_MAX_WAIT_SECONDS: float = 0.005
+EMBEDDING_WORKER_TIMEOUT_SECONDS: float = 5
+
+# Length of the materialised related barrier list of each barrier, which is
+# recomputed in blocks of RELATED_BARRIER_NEIGHBOURS_BLOCK_SIZE barriers
+RELATED_BARRIER_NEIGHBOURS: int = 10
+RELATED_BARRIER_NEIGHBOURS_BLOCK_SIZE: int = 500
+
+# Barriers are streamed from the database and encoded in chunks of this size
+CORPUS_CHUNK_SIZE: int = 500
+
 """
 BarrierEntry is the data type used by the RelatedBarrierManager
 """
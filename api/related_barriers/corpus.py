@@ -0,0 +1,164 @@
+import logging
+from typing import Dict, Iterator, List, Optional
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from api.barriers.models import Barrier
+from api.barriers.tasks import get_barriers_overseas_region
+from api.interactions.models import Interaction
+from api.metadata.utils import get_countries, get_sectors
+from api.related_barriers.constants import CORPUS_CHUNK_SIZE, BarrierEntry
+
+logger = logging.getLogger(__name__)
+
+CORPUS_FIELDS = (
+    "id",
+    "title",
+    "summary",
+    "sectors",
+    "main_sector",
+    "country",
+    "trading_bloc",
+    "companies",
+    "related_organisations",
+    "status_summary",
+    "estimated_resolution_date",
+    "export_description",
+    "notes_text",
+)
+
+
+def compose_corpus(
+    title: str,
+    summary: str,
+    sectors_text: str,
+    country_name: Optional[str],
+    overseas_region_text: str,
+    companies_affected_list: str,
+    other_organisations_affected_list: str,
+    notes_text_list: str,
+    status_summary: str,
+    estimated_resolution_date_text: str,
+    export_description: str,
+) -> str:
+    """
+    The text a barrier is embedded from. Shared by barrier_to_corpus and
+    CorpusBuilder so both produce identical corpora, and identical hashes.
+    """
+    return (
+        f"{title}. {summary}. "
+        f"{sectors_text} {country_name}. "
+        f"{overseas_region_text}. {companies_affected_list} "
+        f"{other_organisations_affected_list} {notes_text_list}. "
+        f"{status_summary}. {estimated_resolution_date_text}. "
+        f"{export_description}."
+    )
+
+
+def notes_subquery() -> Subquery:
+    """
+    All of a barrier's note text joined in a single aggregate, in the order
+    the notes were written.
+    """
+    return Subquery(
+        Interaction.objects.filter(barrier=OuterRef("pk"))
+        .order_by()
+        .values("barrier")
+        .annotate(notes_text=StringAgg("text", delimiter=", ", ordering="created_on"))
+        .values("notes_text")
+    )
+
+
+class CorpusBuilder:
+    """
+    Builds barrier corpora in bulk.
+
+    Sector and country metadata are fetched once into memory, notes are
+    aggregated in the database and barriers are streamed as plain values in
+    chunks, so building the whole corpus holds at most one chunk of rows.
+    """
+
+    def __init__(self, chunk_size: int = CORPUS_CHUNK_SIZE) -> None:
+        self.chunk_size = chunk_size
+        self.sectors: Dict[str, Dict] = {
+            sector["id"]: sector for sector in get_sectors()
+        }
+        self.countries: Dict[str, Dict] = {
+            country["id"]: country for country in get_countries()
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(chunk_size={self.chunk_size})"
+
+    def get_queryset(self) -> QuerySet:
+        return (
+            Barrier.objects.filter(archived=False)
+            .exclude(draft=True)
+            .annotate(notes_text=Coalesce(notes_subquery(), Value("")))
+            .order_by()
+        )
+
+    def iter_batches(
+        self, queryset: Optional[QuerySet] = None
+    ) -> Iterator[List[BarrierEntry]]:
+        """
+        Yield lists of at most `chunk_size` BarrierEntry, ready for batched
+        encoding.
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+        else:
+            queryset = queryset.annotate(
+                notes_text=Coalesce(notes_subquery(), Value(""))
+            )
+
+        batch = []
+        for row in queryset.values(*CORPUS_FIELDS).iterator(chunk_size=self.chunk_size):
+            batch.append(
+                BarrierEntry(id=str(row["id"]), barrier_corpus=self.corpus(row))
+            )
+            if len(batch) >= self.chunk_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def corpus(self, row: Dict) -> str:
+        sectors_list = [
+            self.sectors[str(sector_id)]["name"]
+            for sector_id in row["sectors"] or []
+            if str(sector_id) in self.sectors
+        ]
+        if main_sector := self.sectors.get(str(row["main_sector"])):
+            sectors_list.append(main_sector["name"])
+
+        country = None
+        if row["country"]:
+            country = self.countries.get(str(row["country"]))
+
+        estimated_resolution_date_text = ""
+        if row["estimated_resolution_date"]:
+            date = row["estimated_resolution_date"].strftime("%d-%m-%Y")
+            estimated_resolution_date_text = f"Estimated to be resolved on {date}."
+
+        return compose_corpus(
+            title=row["title"],
+            summary=row["summary"],
+            sectors_text=", ".join(sectors_list),
+            country_name=country["name"] if country else None,
+            overseas_region_text=get_barriers_overseas_region(
+                row["country"], row["trading_bloc"], country_details=country
+            ),
+            companies_affected_list=", ".join(
+                company["name"] for company in row["companies"] or []
+            ),
+            other_organisations_affected_list=", ".join(
+                company["name"] for company in row["related_organisations"] or []
+            ),
+            notes_text_list=row["notes_text"],
+            status_summary=row["status_summary"],
+            estimated_resolution_date_text=estimated_resolution_date_text,
+            export_description=row["export_description"],
+        )
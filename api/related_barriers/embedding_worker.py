@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, NamedTuple, Union
+
+import numpy
+
+from api.related_barriers.constants import (
+    EMBEDDING_WORKER_MAX_BATCH_SIZE,
+    EMBEDDING_WORKER_MAX_WAIT_SECONDS,
+    EMBEDDING_WORKER_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct(">I")
+
+
+class EmbeddingWorkerUnavailable(Exception):
+    pass
+
+
+def send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> bytes:
+    (length,) = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+    return _recv_exactly(sock, length)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed mid frame")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class PendingRequest(NamedTuple):
+    texts: List[str]
+    future: Future
+
+
+class MicroBatcher:
+    """
+    Collects encode requests arriving within `max_wait` seconds of each
+    other, up to `max_batch_size` texts, and runs them through a single call
+    to `encode`, handing each caller back its own rows.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], numpy.ndarray],
+        max_batch_size: int = EMBEDDING_WORKER_MAX_BATCH_SIZE,
+        max_wait: float = EMBEDDING_WORKER_MAX_WAIT_SECONDS,
+    ) -> None:
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[PendingRequest]" = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(max_batch_size={self.max_batch_size}, "
+            f"max_wait={self.max_wait})"
+        )
+
+    def start(self) -> "MicroBatcher":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def submit(self, texts: List[str]) -> Future:
+        future = Future()
+        self._queue.put(PendingRequest(texts=texts, future=future))
+        return future
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self._process(self._collect(first))
+
+    def _collect(self, first: PendingRequest) -> List[PendingRequest]:
+        batch, size = [first], len(first.texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _process(self, batch: List[PendingRequest]) -> None:
+        texts = [text for request in batch for text in request.texts]
+        try:
+            vectors = numpy.asarray(self.encode(texts), dtype=numpy.float32)
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        logger.debug(f"(Related Barriers): encoded {len(batch)} requests together")
+        offset = 0
+        for request in batch:
+            request.future.set_result(vectors[offset : offset + len(request.texts)])
+            offset += len(request.texts)
+
+
+class EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+    """
+    One frame of JSON encoded texts in; a JSON header frame with the shape
+    (or an error) followed by a frame of float32 vectors out.
+    """
+
+    def handle(self) -> None:
+        texts = json.loads(recv_frame(self.request))
+        try:
+            vectors = self.server.batcher.submit(texts).result()
+        except Exception as e:
+            logger.exception("(Related Barriers): embedding worker encode failed")
+            send_frame(self.request, json.dumps({"error": str(e)}).encode())
+            return
+        send_frame(self.request, json.dumps({"shape": vectors.shape}).encode())
+        send_frame(self.request, vectors.tobytes())
+
+
+class EmbeddingWorkerServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, batcher: MicroBatcher) -> None:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.batcher = batcher
+        super().__init__(socket_path, EmbeddingRequestHandler)
+
+
+class EmbeddingWorkerClient:
+    def __init__(
+        self, socket_path: str, timeout: float = EMBEDDING_WORKER_TIMEOUT_SECONDS
+    ) -> None:
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(socket_path={self.socket_path!r})"
+
+    def encode(self, texts: Union[str, List[str]]) -> numpy.ndarray:
+        """
+        Embeddings for `texts`, mirroring SentenceTransformer.encode: a single
+        string gives a single vector.
+        """
+        single = isinstance(texts, str)
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                send_frame(sock, json.dumps([texts] if single else texts).encode())
+                header = json.loads(recv_frame(sock))
+                if "error" in header:
+                    raise EmbeddingWorkerUnavailable(header["error"])
+                vectors = numpy.frombuffer(
+                    recv_frame(sock), dtype=numpy.float32
+                ).reshape(header["shape"])
+        except (OSError, ValueError) as e:
+            raise EmbeddingWorkerUnavailable(str(e)) from e
+        return vectors[0] if single else vectors
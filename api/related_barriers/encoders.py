@@ -0,0 +1,75 @@
+import logging
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Callable, Dict
+
+from django.core.exceptions import ImproperlyConfigured
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+# torch and sentence_transformers take seconds and hundreds of MB to import,
+# so they are only imported by the loaders below, when a model is first needed
+
+logger = logging.getLogger(__name__)
+
+ENCODER_MODEL_NAME = "all-MiniLM-L6-v2"
+# Dynamically quantised export shipped with the model, for AVX2 capable CPUs
+ENCODER_ONNX_FILE_NAME = "onnx/model_quint8_avx2.onnx"
+
+
+def load_torch_encoder() -> "SentenceTransformer":
+    """
+    The full precision PyTorch model.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(ENCODER_MODEL_NAME)
+
+
+def load_torch_int8_encoder() -> "SentenceTransformer":
+    """
+    The PyTorch model with its Linear layers dynamically quantised to int8,
+    which roughly halves the resident size and speeds up CPU inference.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(ENCODER_MODEL_NAME, device="cpu")
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+
+def load_onnx_encoder() -> "SentenceTransformer":
+    """
+    The int8 ONNX export run through ONNX Runtime. Needs optimum[onnxruntime],
+    which is not installed by default.
+    """
+    if find_spec("optimum") is None or find_spec("onnxruntime") is None:
+        raise ImproperlyConfigured(
+            "The onnx related barriers encoder requires optimum[onnxruntime]"
+        )
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(
+        ENCODER_MODEL_NAME,
+        backend="onnx",
+        model_kwargs={"file_name": ENCODER_ONNX_FILE_NAME},
+    )
+
+
+ENCODER_BACKENDS: Dict[str, Callable[[], "SentenceTransformer"]] = {
+    "torch": load_torch_encoder,
+    "torch-int8": load_torch_int8_encoder,
+    "onnx": load_onnx_encoder,
+}
+
+
+def load_encoder(backend: str) -> "SentenceTransformer":
+    if backend not in ENCODER_BACKENDS:
+        raise ImproperlyConfigured(
+            f"Unknown related barriers encoder backend {backend!r}, "
+            f"expected one of {', '.join(ENCODER_BACKENDS)}"
+        )
+    logger.info(f"(Related Barriers): loading {backend} encoder")
+    return ENCODER_BACKENDS[backend]()
@@ -0,0 +1,341 @@
+import io
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy
+
+from api.related_barriers.constants import (
+    VECTOR_INDEX_KMEANS_ITERATIONS,
+    VECTOR_INDEX_MIN_TRAINING_SIZE,
+    VECTOR_INDEX_PROBES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Slack on the per list similarity bounds for float32 rounding
+BOUND_TOLERANCE = 1e-4
+
+
+def normalise(vectors: numpy.ndarray) -> numpy.ndarray:
+    """
+    L2 normalise a vector or matrix of row vectors as float32 so that the
+    inner product of two normalised vectors is their cosine similarity.
+    """
+    vectors = numpy.asarray(vectors, dtype=numpy.float32)
+    norms = numpy.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores: numpy.ndarray, quantity: int) -> numpy.ndarray:
+    """
+    Positions of the `quantity` highest scores, highest first.
+    """
+    if quantity >= len(scores):
+        return numpy.argsort(-scores, kind="stable")
+    partition = numpy.argpartition(-scores, quantity - 1)[:quantity]
+    return partition[numpy.argsort(-scores[partition], kind="stable")]
+
+
+def exact_search(
+    vectors: numpy.ndarray,
+    query: numpy.ndarray,
+    quantity: int,
+    similarity_threshold: Optional[float] = None,
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Brute force top-k over pre-normalised float32 row vectors.
+
+    Only the single row of similarities against `query` is computed, so
+    memory is O(N) rather than the O(N^2) of a full similarity matrix.
+    Returns (positions, scores) highest score first.
+    """
+    scores = vectors @ normalise(query)
+    positions = numpy.arange(len(scores))
+    if similarity_threshold is not None:
+        mask = scores > similarity_threshold
+        positions, scores = positions[mask], scores[mask]
+    order = top_k(scores, quantity)
+    return positions[order], scores[order]
+
+
+class VectorIndex:
+    """
+    In-process IVF-flat (inverted file) nearest neighbour index.
+
+    Vectors are stored normalised so similarity is a dot product. Once the
+    index holds VECTOR_INDEX_MIN_TRAINING_SIZE vectors it is partitioned
+    into ~sqrt(N) clusters with spherical k-means and a top-k query only
+    scans the rows of the `n_probe` closest clusters; smaller corpora are
+    kept in a single list, which makes the search exact.
+
+    Queries with a similarity threshold scan every list whose angular radius
+    around its centroid could reach above the threshold, and queries for more
+    rows than the probed lists hold scan every row, so both are exact.
+
+    Rows can be added and removed incrementally. Removed rows are left as
+    tombstones until compaction, and the clusters are retrained when the
+    corpus outgrows the size they were trained on.
+    """
+
+    def __init__(self, dimension: int, n_probe: int = VECTOR_INDEX_PROBES) -> None:
+        self.dimension = dimension
+        self.n_probe = n_probe
+        self._vectors = numpy.zeros((0, dimension), dtype=numpy.float32)
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._assignments = numpy.zeros(0, dtype=numpy.int32)
+        self._centroids = numpy.zeros((1, dimension), dtype=numpy.float32)
+        self._lists: List[List[int]] = [[]]
+        # Lowest similarity between each list's centroid and its rows
+        self._radii = numpy.ones(1, dtype=numpy.float32)
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, barrier_id: str) -> bool:
+        return barrier_id in self._rows
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(size={len(self)}, "
+            f"lists={len(self._lists)}, n_probe={self.n_probe})"
+        )
+
+    @property
+    def ids(self) -> List[str]:
+        return [i for i in self._ids if i is not None]
+
+    @property
+    def n_lists(self) -> int:
+        return len(self._lists)
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[str],
+        vectors: numpy.ndarray,
+        n_probe: int = VECTOR_INDEX_PROBES,
+    ) -> "VectorIndex":
+        vectors = numpy.asarray(vectors, dtype=numpy.float32)
+        index = cls(dimension=vectors.shape[1], n_probe=n_probe)
+        index._vectors = normalise(vectors)
+        index._ids = [str(i) for i in ids]
+        index._rows = {barrier_id: row for row, barrier_id in enumerate(index._ids)}
+        index.train()
+        return index
+
+    def train(self) -> None:
+        """
+        (Re)cluster the live rows and rebuild the inverted lists.
+        """
+        self._compact()
+        size = len(self._ids)
+        if size < VECTOR_INDEX_MIN_TRAINING_SIZE:
+            self._centroids = numpy.zeros((1, self.dimension), dtype=numpy.float32)
+            self._assignments = numpy.zeros(size, dtype=numpy.int32)
+        else:
+            n_lists = int(numpy.sqrt(size))
+            self._vectors = self._vectors[:size]
+            self._centroids = self._kmeans(self._vectors, n_lists)
+            self._assignments = self._assign(self._vectors)
+        self._lists = [[] for _ in range(len(self._centroids))]
+        for row, list_id in enumerate(self._assignments.tolist()):
+            self._lists[list_id].append(row)
+        self._radii = numpy.ones(len(self._centroids), dtype=numpy.float32)
+        self._widen_radii(self._vectors[:size], self._assignments)
+        self._trained_size = size
+        logger.info(f"(Related Barriers): trained {self!r}")
+
+    def add(self, ids: Iterable[str], vectors: numpy.ndarray) -> None:
+        """
+        Insert or replace vectors for the given ids.
+        """
+        ids = [str(i) for i in ids]
+        vectors = normalise(numpy.atleast_2d(vectors))
+        self.remove(i for i in ids if i in self._rows)
+
+        start = len(self._ids)
+        self._reserve(start + len(vectors))
+        self._vectors[start : start + len(vectors)] = vectors
+        assignments = self._assign(vectors)
+        self._assignments = numpy.concatenate([self._assignments, assignments])
+        self._widen_radii(vectors, assignments)
+        for offset, (barrier_id, list_id) in enumerate(zip(ids, assignments.tolist())):
+            row = start + offset
+            self._ids.append(barrier_id)
+            self._rows[barrier_id] = row
+            self._lists[list_id].append(row)
+
+        if self._needs_training():
+            self.train()
+
+    def remove(self, ids: Iterable[str]) -> None:
+        for barrier_id in ids:
+            row = self._rows.pop(str(barrier_id), None)
+            if row is None:
+                continue
+            self._ids[row] = None
+            self._lists[self._assignments[row]].remove(row)
+
+        if len(self._ids) > 2 * max(len(self._rows), 1):
+            self._compact()
+
+    def get_vector(self, barrier_id: str) -> Optional[numpy.ndarray]:
+        row = self._rows.get(str(barrier_id))
+        if row is None:
+            return None
+        return self._vectors[row]
+
+    def search(
+        self,
+        query: numpy.ndarray,
+        quantity: int,
+        similarity_threshold: Optional[float] = None,
+        exclude: Optional[str] = None,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Return up to `quantity` (ids, scores) most similar to `query`, highest
+        score first, ignoring `exclude` and anything at or below the threshold.
+        """
+        if not self._rows:
+            return numpy.array([], dtype=str), numpy.zeros(0, dtype=numpy.float32)
+
+        query = normalise(query)
+        if similarity_threshold is None:
+            probes = top_k(self._centroids @ query, self.n_probe)
+        else:
+            probes = numpy.flatnonzero(self._bounds(query) > similarity_threshold)
+        rows = numpy.fromiter(
+            (row for list_id in probes for row in self._lists[list_id]),
+            dtype=numpy.int64,
+        )
+        if similarity_threshold is None and len(rows) <= quantity:
+            rows = numpy.fromiter(self._rows.values(), dtype=numpy.int64)
+        if exclude is not None and (excluded := self._rows.get(exclude)) is not None:
+            rows = rows[rows != excluded]
+
+        positions, scores = exact_search(
+            self._vectors[rows], query, quantity, similarity_threshold
+        )
+        return (
+            numpy.array([self._ids[row] for row in rows[positions]], dtype=str),
+            scores,
+        )
+
+    def to_bytes(self) -> bytes:
+        self._compact()
+        buffer = io.BytesIO()
+        numpy.savez(
+            buffer,
+            vectors=self._vectors[: len(self._ids)],
+            ids=numpy.array(self._ids, dtype=str),
+            assignments=self._assignments,
+            centroids=self._centroids,
+            meta=numpy.array([self.n_probe, self._trained_size], dtype=numpy.int64),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes, vectors: Optional[numpy.ndarray] = None
+    ) -> "VectorIndex":
+        """
+        Load a serialised index, optionally over `vectors` already read from it,
+        such as a memory mapped copy. Those are never written to: the first
+        change to the index copies them.
+        """
+        with numpy.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            n_probe, trained_size = arrays["meta"].tolist()
+            index = cls(dimension=arrays["centroids"].shape[1], n_probe=n_probe)
+            index._vectors = arrays["vectors"] if vectors is None else vectors
+            index._ids = arrays["ids"].tolist()
+            index._assignments = arrays["assignments"]
+            index._centroids = arrays["centroids"]
+        index._rows = {barrier_id: row for row, barrier_id in enumerate(index._ids)}
+        index._lists = [[] for _ in range(len(index._centroids))]
+        for row, list_id in enumerate(index._assignments.tolist()):
+            index._lists[list_id].append(row)
+        index._radii = numpy.ones(len(index._centroids), dtype=numpy.float32)
+        index._widen_radii(index._vectors, index._assignments)
+        index._trained_size = trained_size
+        return index
+
+    @staticmethod
+    def vectors_from_bytes(data: bytes) -> numpy.ndarray:
+        with numpy.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            return arrays["vectors"]
+
+    def _needs_training(self) -> bool:
+        size = len(self._rows)
+        if size < VECTOR_INDEX_MIN_TRAINING_SIZE:
+            return False
+        return self._trained_size < VECTOR_INDEX_MIN_TRAINING_SIZE or (
+            size > 4 * self._trained_size
+        )
+
+    def _reserve(self, size: int) -> None:
+        """
+        Grow the vector buffer geometrically so appends are amortised O(1).
+        """
+        if size <= len(self._vectors):
+            return
+        vectors = numpy.zeros(
+            (max(size, 2 * len(self._vectors)), self.dimension), dtype=numpy.float32
+        )
+        vectors[: len(self._ids)] = self._vectors[: len(self._ids)]
+        self._vectors = vectors
+
+    def _widen_radii(self, vectors: numpy.ndarray, assignments: numpy.ndarray) -> None:
+        similarities = numpy.einsum("ij,ij->i", vectors, self._centroids[assignments])
+        numpy.minimum.at(self._radii, assignments, similarities)
+
+    def _bounds(self, query: numpy.ndarray) -> numpy.ndarray:
+        """
+        Upper bound of the similarity between `query` and any row of each
+        list: the angle to the list's centroid less the list's angular radius.
+        """
+        angles = numpy.arccos(numpy.clip(self._centroids @ query, -1, 1))
+        radii = numpy.arccos(numpy.clip(self._radii, -1, 1))
+        return numpy.cos(numpy.clip(angles - radii, 0, None)) + BOUND_TOLERANCE
+
+    def _assign(self, vectors: numpy.ndarray) -> numpy.ndarray:
+        if len(self._centroids) == 1:
+            return numpy.zeros(len(vectors), dtype=numpy.int32)
+        return numpy.argmax(vectors @ self._centroids.T, axis=1).astype(numpy.int32)
+
+    def _compact(self) -> None:
+        """
+        Drop tombstoned rows, keeping the existing clustering.
+        """
+        if len(self._rows) == len(self._ids):
+            return
+        live = numpy.array(
+            [barrier_id is not None for barrier_id in self._ids], dtype=bool
+        )
+        self._vectors = self._vectors[: len(self._ids)][live]
+        self._assignments = self._assignments[live]
+        self._ids = [barrier_id for barrier_id in self._ids if barrier_id is not None]
+        self._rows = {barrier_id: row for row, barrier_id in enumerate(self._ids)}
+        self._lists = [[] for _ in range(len(self._centroids))]
+        for row, list_id in enumerate(self._assignments.tolist()):
+            self._lists[list_id].append(row)
+
+    @staticmethod
+    def _kmeans(vectors: numpy.ndarray, n_lists: int, seed: int = 0) -> numpy.ndarray:
+        """
+        Spherical k-means over a sample of the vectors.
+        """
+        rng = numpy.random.default_rng(seed)
+        sample_size = min(len(vectors), n_lists * 64)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+        for _ in range(VECTOR_INDEX_KMEANS_ITERATIONS):
+            assignments = numpy.argmax(sample @ centroids.T, axis=1)
+            sums = numpy.zeros_like(centroids)
+            numpy.add.at(sums, assignments, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = normalise(sums)
+        return centroids
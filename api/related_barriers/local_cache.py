@@ -0,0 +1,109 @@
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy
+from django.conf import settings
+
+from api.related_barriers.index import VectorIndex
+from api.related_barriers.store import EmbeddingStore
+
+logger = logging.getLogger(__name__)
+
+
+class LocalEmbeddingCache:
+    """
+    Node local copy of the embedding store as memory mapped .npy files.
+
+    The first process on a node to see a new store version writes the
+    matrix to RELATED_BARRIERS_LOCAL_CACHE_DIR; every other worker maps the
+    same file read only, so the OS page cache holds a single copy that all
+    workers read without unpickling or copying. The files are named after
+    the store epoch and version and are only refetched when those change.
+
+    The published vector index, which serves queries, is shared the same way:
+    its vectors are written once per node and every worker's index scans the
+    mapped matrix.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = Path(directory or settings.RELATED_BARRIERS_LOCAL_CACHE_DIR)
+        self._key: Optional[str] = None
+        self._arrays: Optional[Tuple[numpy.ndarray, numpy.ndarray]] = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(directory={str(self.directory)!r})"
+
+    def load(self, store: EmbeddingStore) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        (ids, vectors) for the current store version, vectors memory mapped.
+        """
+        version = store.version
+        if version is None:
+            return store.load()
+
+        key = f"{store.prefix}-{store.epoch}-{version}"
+        if key == self._key:
+            return self._arrays
+
+        ids_path, vectors_path = self._paths(key)
+        if not (ids_path.exists() and vectors_path.exists()):
+            logger.info(f"(Related Barriers): materialising local embeddings {key}")
+            self._write(key, *store.load())
+            self._remove_stale(store.prefix, keep=key)
+
+        self._arrays = (
+            numpy.load(ids_path),
+            numpy.load(vectors_path, mmap_mode="r"),
+        )
+        self._key = key
+        return self._arrays
+
+    def load_index(self, store: EmbeddingStore, published: Dict) -> VectorIndex:
+        """
+        The published index with its vectors memory mapped from a node local file.
+        """
+        key = f"index-{store.prefix}-{published['key']}"
+        path = self.directory / f"{key}-vectors.npy"
+        if not path.exists():
+            logger.info(f"(Related Barriers): materialising local index {key}")
+            self._save(path, VectorIndex.vectors_from_bytes(published["index"]))
+            self._remove_stale(f"index-{store.prefix}", keep=key)
+
+        return VectorIndex.from_bytes(
+            published["index"], vectors=numpy.load(path, mmap_mode="r")
+        )
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return (
+            self.directory / f"{key}-ids.npy",
+            self.directory / f"{key}-vectors.npy",
+        )
+
+    def _write(self, key: str, ids: numpy.ndarray, vectors: numpy.ndarray) -> None:
+        """
+        Write via a process specific temporary file and rename into place, so
+        concurrent workers never map a partially written file.
+        """
+        for path, array in zip(self._paths(key), (ids, vectors)):
+            self._save(path, array)
+
+    def _save(self, path: Path, array: numpy.ndarray) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}")
+        with open(temporary, "wb") as f:
+            numpy.save(f, array)
+        os.replace(temporary, path)
+
+    def _remove_stale(self, prefix: str, keep: str) -> None:
+        """
+        Delete files for older versions. Workers still mapping them keep
+        their view until they move on, as unlinking leaves the mapping intact.
+        """
+        for path in self.directory.glob(f"{prefix}-*.npy"):
+            if not path.name.startswith(f"{keep}-"):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
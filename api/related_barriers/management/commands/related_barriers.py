@@ -4,6 +4,7 @@ import time
 from django.core.management import BaseCommand
 
 from api.related_barriers import manager
+from api.related_barriers.neighbours import sync_neighbours
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,11 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--flush", type=bool, help="Flush cache")
         parser.add_argument("--reindex", type=bool, help="Reindex cache")
+        parser.add_argument(
+            "--full",
+            type=bool,
+            help="Re-encode every barrier when reindexing, not just changed ones",
+        )
         parser.add_argument(
             "--stats", type=bool, help="Get Related Barrier cache stats"
         )
@@ -22,24 +28,25 @@ class Command(BaseCommand):
         flush = options["flush"]
         reindex = options["reindex"]
         stats = options["stats"]
+        full = options["full"]
 
         rb_manager = manager.RelatedBarrierManager()
 
-        barrier_count = len(rb_manager.get_barrier_ids())
+        barrier_count = len(rb_manager.store)
 
         if stats:
             logger.info(f"Barrier Count: {barrier_count}")
 
         if reindex:
             logger.info(f"Reindexing {barrier_count} barriers")
-            data = manager.get_data()
-
-            rb_manager.flush()
-
             s = time.time()
-            rb_manager.set_data(data)
+            reindex_stats = rb_manager.reindex(manager.get_batches(), full=bool(full))
             end = time.time()
-            logger.info("Training time: ", end - s)
+            logger.info(
+                f"Reindexed in {end - s:.2f}s: {reindex_stats['hits']} unchanged, "
+                f"{reindex_stats['misses']} encoded, {reindex_stats['removed']} removed"
+            )
+            sync_neighbours(rb_manager)
             return
 
         if flush:
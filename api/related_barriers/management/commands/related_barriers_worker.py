@@ -0,0 +1,41 @@
+import logging
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from api.related_barriers.embedding_worker import EmbeddingWorkerServer, MicroBatcher
+from api.related_barriers.encoders import load_encoder
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Run the related barriers embedding worker on a Unix socket"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--socket",
+            type=str,
+            default=settings.RELATED_BARRIERS_EMBEDDING_WORKER_SOCKET,
+            help="Unix socket path to listen on",
+        )
+
+    def handle(self, *args, **options):
+        socket_path = options["socket"]
+        if not socket_path:
+            logger.error(
+                "No socket given and RELATED_BARRIERS_EMBEDDING_WORKER_SOCKET is unset"
+            )
+            return
+
+        encoder = load_encoder(settings.RELATED_BARRIERS_ENCODER_BACKEND)
+        batcher = MicroBatcher(
+            lambda texts: encoder.encode(texts, convert_to_tensor=True).numpy()
+        ).start()
+
+        with EmbeddingWorkerServer(socket_path, batcher) as server:
+            logger.info(f"Related barriers embedding worker listening on {socket_path}")
+            try:
+                server.serve_forever()
+            finally:
+                batcher.stop()
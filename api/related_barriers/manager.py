@@ -1,16 +1,34 @@
+import hashlib
 import logging
 import time
 from functools import wraps
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from uuid import uuid4
 
 import numpy
-import torch
+from django.conf import settings
 from django.core.cache import cache
-from sentence_transformers import SentenceTransformer, util
+from django.utils.functional import SimpleLazyObject
 
 from api.barriers.tasks import get_barriers_overseas_region
 from api.metadata.utils import get_sector
-from api.related_barriers.constants import BarrierEntry
+from api.related_barriers.constants import (
+    EMBEDDING_WORKER_MAX_BATCH_SIZE,
+    BarrierEntry,
+)
+from api.related_barriers.corpus import CorpusBuilder, compose_corpus
+from api.related_barriers.embedding_worker import (
+    EmbeddingWorkerClient,
+    EmbeddingWorkerUnavailable,
+)
+from api.related_barriers.encoders import load_encoder
+from api.related_barriers.index import VectorIndex, exact_search, normalise
+from api.related_barriers.local_cache import LocalEmbeddingCache
+from api.related_barriers.query_cache import QueryEmbeddingCache
+from api.related_barriers.store import EmbeddingStore
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger(__name__)
 
@@ -30,14 +48,12 @@ def timing(f):
 
 @timing
 def get_transformer():
-    return SentenceTransformer("all-MiniLM-L6-v2")
+    return load_encoder(settings.RELATED_BARRIERS_ENCODER_BACKEND)
 
 
-BARRIER_UPDATE_FIELDS: List[str] = ["title", "summary"]
-
-
-EMBEDDINGS_CACHE_KEY = "EMBEDDINGS_CACHE_KEY"
-BARRIER_IDS_CACHE_KEY = "BARRIER_IDS_CACHE_KEY"
+VECTOR_INDEX_CACHE_KEY = "VECTOR_INDEX_CACHE_KEY"
+# Version and key of the published index, checked without fetching the index
+VECTOR_INDEX_VERSION_CACHE_KEY = "VECTOR_INDEX_VERSION_CACHE_KEY"
 
 
 class SingletonMeta(type):
@@ -56,154 +72,378 @@ class SingletonMeta(type):
 
 
 class RelatedBarrierManager(metaclass=SingletonMeta):
-    __transformer: Optional[SentenceTransformer] = None
+    __transformer: Optional["SentenceTransformer"] = None
+    __index: Optional[VectorIndex] = None
+    __index_version: Optional[int] = None
+    __index_key: Optional[str] = None
 
     def __str__(self) -> str:
         return "Related Barrier Manager"
 
     def __init__(self) -> None:
         """
-        Only called once in a execution lifecycle
+        Only called once in a execution lifecycle. The transformer is loaded
+        on first use, as many queries are answered from stored embeddings.
         """
-        self.__transformer = get_transformer()
+        self.__transformer = SimpleLazyObject(get_transformer)
+        self.store = EmbeddingStore()
+        self.local_cache = LocalEmbeddingCache()
+        self.query_cache = QueryEmbeddingCache()
+        self.worker: Optional[EmbeddingWorkerClient] = None
+        if socket_path := settings.RELATED_BARRIERS_EMBEDDING_WORKER_SOCKET:
+            self.worker = EmbeddingWorkerClient(socket_path)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}"
 
     @timing
-    def set_data(self, data: List[Dict]) -> None:
+    def set_data(self, batches: Iterable[List[BarrierEntry]]) -> int:
         """
-        Load data into memory.
+        Replace every embedding, encoding and storing one batch of barriers at
+        a time so that only a batch of corpus text is held in memory.
+
+        Returns the number of barriers encoded.
         """
         logger.info("(Related Barriers): set_data")
         self.flush()
-        barrier_ids = [str(d["id"]) for d in data]
-        barrier_data = [d["barrier_corpus"] for d in data]
-        embeddings = self.__transformer.encode(barrier_data, convert_to_tensor=True)
-        self.set_embeddings(embeddings.numpy())
-        self.set_barrier_ids(barrier_ids)
+        barrier_ids, embeddings, version = [], [], None
+        for batch in batches:
+            if not batch:
+                continue
+            vectors = self.encode_barrier_corpora(batch)
+            version = self.store.upsert(
+                [barrier.id for barrier in batch],
+                vectors,
+                hashes=[corpus_hash(barrier.barrier_corpus) for barrier in batch],
+            )
+            barrier_ids.extend(barrier.id for barrier in batch)
+            embeddings.append(vectors)
+
+        if embeddings:
+            self.set_index(
+                VectorIndex.build(barrier_ids, numpy.vstack(embeddings)), version
+            )
+        return len(barrier_ids)
 
-    @staticmethod
-    def flush() -> None:
+    @timing
+    def reindex(
+        self, batches: Iterable[List[BarrierEntry]], full: bool = False
+    ) -> Dict[str, int]:
+        """
+        Bring the embeddings in line with `batches`, only re-encoding barriers
+        whose corpus hash differs from the one stored with their embedding
+        and dropping barriers that are no longer present. Each batch is
+        hashed, encoded and stored before the next one is read.
+
+        Returns hit (unchanged), miss (re-encoded) and removed counts.
+        """
+        if full or not len(self.store):
+            return {"hits": 0, "misses": self.set_data(batches), "removed": 0}
+
+        stored_hashes = self.store.hashes()
+        seen = set()
+        stats = {"hits": 0, "misses": 0, "removed": 0}
+        for batch in batches:
+            changed = [
+                barrier
+                for barrier in batch
+                if stored_hashes.get(barrier.id) != corpus_hash(barrier.barrier_corpus)
+            ]
+            self.update_barriers(changed)
+            seen.update(barrier.id for barrier in batch)
+            stats["hits"] += len(batch) - len(changed)
+            stats["misses"] += len(changed)
+
+        removed = list(stored_hashes.keys() - seen)
+        self.remove_barriers(removed)
+        stats["removed"] = len(removed)
+
+        if (stats["misses"] or removed) and (index := self.get_index()) is not None:
+            # Republish so new processes start from the reindexed state
+            self.set_index(index, self.store.version)
+
+        logger.info(f"(Related Barriers): reindex {stats}")
+        return stats
+
+    def flush(self) -> None:
         logger.info("(Related Barriers): flush cache")
-        cache.delete(EMBEDDINGS_CACHE_KEY)
-        cache.delete(BARRIER_IDS_CACHE_KEY)
+        self.store.clear()
+        cache.delete_many([VECTOR_INDEX_CACHE_KEY, VECTOR_INDEX_VERSION_CACHE_KEY])
+        self.__index = None
+        self.__index_version = None
+        self.__index_key = None
 
-    @staticmethod
-    def set_embeddings(embeddings) -> None:
-        logger.info("(Related Barriers): set_embeddings")
-        cache.set(EMBEDDINGS_CACHE_KEY, embeddings, timeout=None)
+    def load_embeddings(self) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        logger.info("(Related Barriers): load_embeddings")
+        return self.local_cache.load(self.store)
 
-    @staticmethod
-    def set_barrier_ids(barrier_ids) -> None:
-        logger.info("(Related Barriers): barrier_ids")
-        cache.set(BARRIER_IDS_CACHE_KEY, barrier_ids, timeout=None)
+    def get_barrier_ids(self) -> List[str]:
+        logger.info("(Related Barriers): get_barrier_ids")
+        return self.load_embeddings()[0].tolist()
 
-    @staticmethod
-    def get_embeddings() -> numpy.ndarray:
-        logger.info("(Related Barriers): get_embeddings")
-        return cache.get(EMBEDDINGS_CACHE_KEY, [])
+    def set_index(self, index: VectorIndex, version: Optional[int]) -> None:
+        """
+        Publish the vector index, tagged with the store version it reflects,
+        so that other processes can move onto it.
+        """
+        logger.info("(Related Barriers): set_index")
+        published = {"version": version, "key": uuid4().hex}
+        cache.set(VECTOR_INDEX_VERSION_CACHE_KEY, published, timeout=None)
+        published["index"] = index.to_bytes()
+        cache.set(VECTOR_INDEX_CACHE_KEY, published, timeout=None)
+        self._load_index(published)
+
+    def _load_index(self, published: Dict) -> None:
+        """
+        Serve from the published index, its vectors memory mapped from the node
+        local cache so the workers on a node share one copy. Changes applied
+        before the next publish give the worker a private copy until then.
+        """
+        self.__index = self.local_cache.load_index(self.store, published)
+        self.__index_version = published["version"]
+        self.__index_key = published["key"]
 
-    @staticmethod
-    def get_barrier_ids() -> List[str]:
-        logger.info("(Related Barriers): get_barrier_ids")
-        return cache.get(BARRIER_IDS_CACHE_KEY, [])
+    def get_index(self) -> Optional[VectorIndex]:
+        """
+        The process keeps its own copy of the vector index and brings it up
+        to date with the embedding store whenever the store version moves on.
+        """
+        if self.__index is None:
+            if not (published := cache.get(VECTOR_INDEX_CACHE_KEY)):
+                return None
+            logger.info("(Related Barriers): loading index")
+            self._load_index(published)
+
+        version = self.store.version
+        if version is not None and version != self.__index_version:
+            self.sync_index(version)
+        return self.__index
+
+    @timing
+    def sync_index(self, version: int) -> None:
+        pointer = cache.get(VECTOR_INDEX_VERSION_CACHE_KEY)
+        if (
+            pointer
+            and pointer["version"] == version
+            and pointer["key"] != self.__index_key
+            and (published := cache.get(VECTOR_INDEX_CACHE_KEY))
+            and published["key"] == pointer["key"]
+        ):
+            logger.info("(Related Barriers): moving onto the published index")
+            self._load_index(published)
+            return
+
+        changed = None
+        if self.__index_version is not None:
+            changed = self.store.changes_since(self.__index_version, version)
+
+        if changed is None:
+            logger.info("(Related Barriers): rebuilding index from store")
+            self.set_index(VectorIndex.build(*self.load_embeddings()), version)
+            return
+
+        logger.info(f"(Related Barriers): applying {len(changed)} index changes")
+        vectors = self.store.get(changed)
+        self._apply_to_index(version, vectors, removed=changed - vectors.keys())
+
+    def _apply_to_index(
+        self,
+        version: Optional[int],
+        vectors: Dict[str, numpy.ndarray],
+        removed: Iterable[str] = (),
+    ) -> None:
+        """
+        Apply a write to the local index. The index only moves to `version`
+        when it was exactly one version behind, otherwise writes from other
+        processes are still outstanding and are picked up by sync_index.
+        """
+        if self.__index is None:
+            return
+        self.__index.remove(removed)
+        if vectors:
+            self.__index.add(list(vectors), numpy.vstack(list(vectors.values())))
+        if version is not None and self.__index_version in (None, version - 1):
+            self.__index_version = version
 
     @property
-    def model(self) -> SentenceTransformer:
+    def model(self) -> "SentenceTransformer":
         return self.__transformer
 
-    @timing
-    def get_cosine_sim(self) -> numpy.ndarray:
-        logger.info("(Related Barriers): get_cosine_sim")
-        embeddings = self.get_embeddings()
-        return util.cos_sim(embeddings, embeddings)
+    def encode(self, texts: Union[str, List[str]]) -> numpy.ndarray:
+        """
+        Raw embeddings for `texts`, a single vector for a single string.
+
+        Small requests go to the embedding worker when one is configured, so
+        that concurrent searches share a forward pass; large batches are
+        already batched and are encoded in process, as is everything when the
+        worker cannot be reached.
+        """
+        if self.worker is not None and (
+            isinstance(texts, str) or len(texts) <= EMBEDDING_WORKER_MAX_BATCH_SIZE
+        ):
+            try:
+                return self.worker.encode(texts)
+            except EmbeddingWorkerUnavailable as e:
+                logger.warning(
+                    f"(Related Barriers): embedding worker unavailable, "
+                    f"encoding in process: {e}"
+                )
+        return self.model.encode(texts, convert_to_tensor=True).numpy()
 
     @timing
     def encode_barrier_corpus(self, barrier: BarrierEntry) -> numpy.ndarray:
-        return self.model.encode(barrier.barrier_corpus, convert_to_tensor=True).numpy()
+        return normalise(self.encode(barrier.barrier_corpus))
 
     @timing
-    def add_barrier(
-        self, barrier: BarrierEntry, barrier_ids: Optional[List[str]] = None
-    ) -> None:
-        logger.info(f"(Related Barriers): add_barrier {barrier.id}")
-        """barrier_ids: optimisation flag to avoid multiple cache requests"""
-        if barrier_ids is None:
-            barrier_ids = self.get_barrier_ids()
-        embeddings = self.get_embeddings()
+    def encode_barrier_corpora(self, barriers: List[BarrierEntry]) -> numpy.ndarray:
+        """
+        Encode many barriers in a single batched forward pass.
+        """
+        return normalise(self.encode([barrier.barrier_corpus for barrier in barriers]))
 
-        new_embedding = self.encode_barrier_corpus(barrier)
-        new_embeddings = numpy.vstack([embeddings, new_embedding])  # append embedding
-        new_barrier_ids = barrier_ids + [barrier.id]  # append barrier_id
+    def encode_search_term(self, search_term: str) -> numpy.ndarray:
+        """
+        Search term embedding, cached as the same terms are searched and paged.
+        """
+        return self.query_cache.get_or_encode(search_term, self.encode)
 
-        self.set_embeddings(new_embeddings)
-        self.set_barrier_ids(new_barrier_ids)
+    @timing
+    def add_barrier(self, barrier: BarrierEntry) -> None:
+        logger.info(f"(Related Barriers): add_barrier {barrier.id}")
+        vector = self.encode_barrier_corpus(barrier)
+        version = self.store.upsert(
+            [barrier.id], vector, hashes=[corpus_hash(barrier.barrier_corpus)]
+        )
+        self._apply_to_index(version, {barrier.id: vector})
 
     @timing
-    def remove_barrier(self, barrier: BarrierEntry, barrier_ids=None) -> None:
+    def remove_barrier(self, barrier: BarrierEntry) -> None:
         logger.info(f"(Related Barriers): remove_barrier {barrier.id}")
-        embeddings = self.get_embeddings()
-        if not barrier_ids:
-            barrier_ids = self.get_barrier_ids()
-
-        index = None
-        for i in range(len(barrier_ids)):
-            if barrier_ids[i] == barrier.id:
-                index = i
-                break
-
-        if index is not None:
-            # If the barrier exists, delete it from embeddings and barrier ids cache.
-            embeddings = numpy.delete(embeddings, index, axis=0)
-            del barrier_ids[index]
-
-            self.set_embeddings(embeddings)
-            self.set_barrier_ids(barrier_ids)
+        self.remove_barriers([barrier.id])
 
     @timing
     def update_barrier(self, barrier: BarrierEntry) -> None:
         logger.info(f"(Related Barriers): update_barrier {barrier.id}")
-        barrier_ids = self.get_barrier_ids()
-        if barrier.id in barrier_ids:
-            self.remove_barrier(barrier, barrier_ids)
-        self.add_barrier(barrier, barrier_ids)
+        self.add_barrier(barrier)
 
     @timing
-    def get_similar_barriers(
-        self, barrier: BarrierEntry, similarity_threshold: float, quantity: int
-    ) -> List[tuple]:
-        logger.info(f"(Related Barriers): get_similar_barriers {barrier.id}")
-        barrier_ids = self.get_barrier_ids()
+    def update_barriers(self, barriers: List[BarrierEntry]) -> None:
+        """
+        Re-encode a batch of barriers and write them with a single upsert.
+        """
+        logger.info(f"(Related Barriers): update_barriers {len(barriers)}")
+        if not barriers:
+            return
+        barrier_ids = [barrier.id for barrier in barriers]
+        vectors = self.encode_barrier_corpora(barriers)
+        version = self.store.upsert(
+            barrier_ids,
+            vectors,
+            hashes=[corpus_hash(barrier.barrier_corpus) for barrier in barriers],
+        )
+        self._apply_to_index(version, dict(zip(barrier_ids, vectors)))
 
+    @timing
+    def remove_barriers(self, barrier_ids: List[str]) -> None:
+        logger.info(f"(Related Barriers): remove_barriers {len(barrier_ids)}")
         if not barrier_ids:
-            self.set_data(get_data())
+            return
+        version = self.store.delete(barrier_ids)
+        self._apply_to_index(version, {}, removed=barrier_ids)
+
+    def query(
+        self,
+        vector: numpy.ndarray,
+        quantity: int,
+        similarity_threshold: Optional[float] = None,
+        exclude: Optional[str] = None,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Barrier ids and similarity scores for the `quantity` barriers closest
+        to `vector`, highest score first.
 
-        barrier_ids = self.get_barrier_ids()
+        Served from the vector index when one has been published, otherwise by
+        scoring the pre-normalised embeddings against the single query vector.
+        """
+        if (index := self.get_index()) is not None:
+            return index.search(vector, quantity, similarity_threshold, exclude)
+
+        barrier_ids, embeddings = self.load_embeddings()
+        if not len(barrier_ids):
+            return barrier_ids, numpy.zeros(0, dtype=numpy.float32)
+
+        positions, scores = exact_search(
+            embeddings,
+            vector,
+            quantity + (exclude is not None),
+            similarity_threshold,
+        )
+        ids = barrier_ids[positions]
+        keep = ids != exclude
+        return ids[keep][:quantity], scores[keep][:quantity]
 
-        if barrier.id not in barrier_ids:
-            self.add_barrier(barrier, barrier_ids)
+    def get_vector(self, barrier_id: str) -> Optional[numpy.ndarray]:
+        if (index := self.get_index()) is not None:
+            return index.get_vector(barrier_id)
+        return self.store.get([barrier_id]).get(barrier_id)
 
-        barrier_ids = self.get_barrier_ids()
-        cosine_sim = self.get_cosine_sim()
+    @timing
+    def query_barrier(
+        self, barrier: BarrierEntry, similarity_threshold: float, quantity: int
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        (ids, scores) of the barriers most similar to `barrier`, excluding itself.
+        """
+        logger.info(f"(Related Barriers): query_barrier {barrier.id}")
+        if not len(self.store):
+            self.set_data(get_batches())
+
+        if barrier.id not in self.store:
+            self.add_barrier(barrier)
+
+        vector = self.get_vector(barrier.id)
+        if vector is None:
+            return numpy.array([], dtype=str), numpy.zeros(0, dtype=numpy.float32)
+
+        return self.query(
+            vector,
+            quantity=quantity,
+            similarity_threshold=similarity_threshold,
+            exclude=barrier.id,
+        )
+
+    @timing
+    def query_search_term(
+        self, search_term: str, similarity_threshold: float, quantity: int = None
+    ) -> Optional[Tuple[numpy.ndarray, numpy.ndarray]]:
+        """
+        (ids, scores) of the barriers most similar to a search term.
 
-        index = None
-        for i, barrier_id in enumerate(barrier_ids):
-            if barrier_id == barrier.id:
-                index = i
-                break
+        None is returned if no barrier ids are found in the cache,
+        which is a sign that the cache has been flushed.
+        """
+        logger.info("(Related Barriers): query_search_term")
 
-        scores = cosine_sim[index]
-        barrier_scores = dict(zip(barrier_ids, scores))
-        barrier_scores = {
-            k: v
-            for k, v in barrier_scores.items()
-            if v > similarity_threshold and k != barrier.id
-        }
-        results = sorted(barrier_scores.items(), key=lambda x: x[1])[-quantity:]
-        return [(r[0], torch.round(torch.tensor(r[1]), decimals=4)) for r in results]
+        if not len(self.store):
+            self.set_data(get_batches())
+
+        if not (barrier_count := len(self.store)):
+            logger.warning("(Related Barriers): No barrier ids found")
+            return
+
+        return self.query(
+            self.encode_search_term(search_term),
+            quantity=quantity or barrier_count,
+            similarity_threshold=similarity_threshold,
+        )
+
+    def get_similar_barriers(
+        self, barrier: BarrierEntry, similarity_threshold: float, quantity: int
+    ) -> List[tuple]:
+        return self._as_results(
+            *self.query_barrier(barrier, similarity_threshold, quantity)
+        )
 
-    @timing
     def get_similar_barriers_searched(
         self, search_term: str, similarity_threshold: float, quantity: int = None
     ) -> Optional[List[tuple]]:
@@ -219,69 +459,49 @@ class RelatedBarrierManager(metaclass=SingletonMeta):
         The None is returned if no barrier ids are found in the cache.
         which is a sign that the cache has been flushed.
         """
-
-        logger.info("(Related Barriers): get_similar_barriers_searched")
-
-        if not (barrier_ids := self.get_barrier_ids()):
-            self.set_data(get_data())
-            barrier_ids = self.get_barrier_ids() or []
-
-        if not barrier_ids:
-            logger.warning("(Related Barriers): No barrier ids found")
+        if (
+            results := self.query_search_term(
+                search_term, similarity_threshold, quantity
+            )
+        ) is None:
             return
+        return self._as_results(*results)
 
-        embedded_index = "search_term"
-        search_term_embedding = self.model.encode(
-            search_term, convert_to_tensor=True
-        ).numpy()
-        embeddings = self.get_embeddings()
-        new_embeddings = numpy.vstack(
-            [embeddings, search_term_embedding]
-        )  # append embedding
-        new_barrier_ids = barrier_ids + [embedded_index]  # append barrier_id
-
-        cosine_sim = util.cos_sim(new_embeddings, new_embeddings)
-
-        index_search_term_embedding = len(new_embeddings) - 1
-        scores = cosine_sim[index_search_term_embedding]
-        barrier_scores = dict(zip(new_barrier_ids, scores))
-        barrier_scores = {
-            k: v
-            for k, v in barrier_scores.items()
-            if v > similarity_threshold and k != embedded_index
-        }
-        results = sorted(barrier_scores.items(), key=lambda x: x[1])[-quantity:]
-        return [(r[0], torch.round(r[1], decimals=4)) for r in results]
-
-
-def get_data() -> List[Dict]:
-    from api.barriers.models import Barrier
-
-    data_dictionary = []
-    barriers = (
-        Barrier.objects.prefetch_related("interactions_documents")
-        .filter(archived=False)
-        .exclude(draft=True)
-    )
-    for barrier in barriers:
-        data_dictionary.append(
-            {"id": str(barrier.id), "barrier_corpus": barrier_to_corpus(barrier)}
-        )
+    @staticmethod
+    def _as_results(ids: numpy.ndarray, scores: numpy.ndarray) -> List[tuple]:
+        """
+        (barrier_id, score) pairs in ascending order of similarity.
+        """
+        return [
+            (barrier_id, round(score, 4))
+            for barrier_id, score in reversed(list(zip(ids.tolist(), scores.tolist())))
+        ]
 
-    return data_dictionary
+
+def get_batches() -> Iterator[List[BarrierEntry]]:
+    return CorpusBuilder().iter_batches()
 
 
 def get_or_init() -> RelatedBarrierManager:
     manager = RelatedBarrierManager()
 
-    if not manager.get_barrier_ids():
+    if not len(manager.store):
         logger.info("(Related Barriers): Initialising)")
-        data = get_data()
-        manager.set_data(data)
+        manager.set_data(get_batches())
 
     return manager
 
 
+def corpus_hash(barrier_corpus: str) -> str:
+    """
+    Fingerprint of the text a barrier embedding was encoded from and the
+    encoder backend used, so switching backend re-encodes on the next reindex.
+    """
+    return hashlib.sha256(
+        f"{settings.RELATED_BARRIERS_ENCODER_BACKEND}:{barrier_corpus}".encode("utf-8")
+    ).hexdigest()
+
+
 def barrier_to_corpus(barrier) -> str:
     companies_affected_list = ""
     if barrier.companies:
@@ -296,7 +516,10 @@ def barrier_to_corpus(barrier) -> str:
         )
 
     notes_text_list = ", ".join(
-        [note.text for note in barrier.interactions_documents.all()]
+        note.text
+        for note in sorted(
+            barrier.interactions_documents.all(), key=lambda note: note.created_on
+        )
     )
 
     sectors_list = [
@@ -318,11 +541,16 @@ def barrier_to_corpus(barrier) -> str:
         date = barrier.estimated_resolution_date.strftime("%d-%m-%Y")
         estimated_resolution_date_text = f"Estimated to be resolved on {date}."
 
-    return (
-        f"{barrier.title}. {barrier.summary}. "
-        f"{sectors_text} {barrier.country_name}. "
-        f"{overseas_region_text}. {companies_affected_list} "
-        f"{other_organisations_affected_list} {notes_text_list}. "
-        f"{barrier.status_summary}. {estimated_resolution_date_text}. "
-        f"{barrier.export_description}."
+    return compose_corpus(
+        title=barrier.title,
+        summary=barrier.summary,
+        sectors_text=sectors_text,
+        country_name=barrier.country_name,
+        overseas_region_text=overseas_region_text,
+        companies_affected_list=companies_affected_list,
+        other_organisations_affected_list=other_organisations_affected_list,
+        notes_text_list=notes_text_list,
+        status_summary=barrier.status_summary,
+        estimated_resolution_date_text=estimated_resolution_date_text,
+        export_description=barrier.export_description,
     )
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.21 on 2026-10-16 12:00
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("barriers", "0174_estimated_resolution_date_data_migration"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BarrierNeighbours",
+            fields=[
+                (
+                    "barrier",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="related_neighbours",
+                        serialize=False,
+                        to="barriers.barrier",
+                    ),
+                ),
+                (
+                    "related_ids",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.UUIDField(), default=list, size=None
+                    ),
+                ),
+                (
+                    "scores",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.FloatField(), default=list, size=None
+                    ),
+                ),
+                (
+                    "min_score",
+                    models.FloatField(
+                        help_text="Score a barrier must beat to enter the list"
+                    ),
+                ),
+                ("modified_on", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["related_ids"], name="related_bar_related_a5c196_gin"
+                    )
+                ],
+            },
+        ),
+    ]
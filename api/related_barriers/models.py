@@ -0,0 +1,26 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+
+class BarrierNeighbours(models.Model):
+    """
+    Materialised top RELATED_BARRIER_NEIGHBOURS most similar barriers of a
+    barrier, highest score first, kept up to date by sync_neighbours.
+    """
+
+    barrier = models.OneToOneField(
+        "barriers.Barrier",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="related_neighbours",
+    )
+    related_ids = ArrayField(models.UUIDField(), default=list)
+    scores = ArrayField(models.FloatField(), default=list)
+    min_score = models.FloatField(
+        help_text="Score a barrier must beat to enter the list"
+    )
+    modified_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [GinIndex(fields=["related_ids"])]
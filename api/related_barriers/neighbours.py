@@ -0,0 +1,156 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy
+from django.core.cache import cache
+from django_pglocks import advisory_lock
+
+from api.barriers.models import Barrier
+from api.related_barriers.constants import (
+    RELATED_BARRIER_NEIGHBOURS,
+    RELATED_BARRIER_NEIGHBOURS_BLOCK_SIZE,
+    SIMILARITY_THRESHOLD,
+)
+from api.related_barriers.index import top_k
+from api.related_barriers.models import BarrierNeighbours
+
+logger = logging.getLogger(__name__)
+
+NEIGHBOURS_VERSION_CACHE_KEY = "RELATED_BARRIERS_NEIGHBOURS_VERSION"
+NEIGHBOURS_LOCK = "related-barriers-neighbours"
+
+
+def get_neighbours(barrier_id: str) -> Optional[Tuple[List[str], List[float]]]:
+    """
+    Materialised (related ids, scores) of a barrier, None if not computed yet.
+    """
+    row = (
+        BarrierNeighbours.objects.filter(barrier_id=barrier_id)
+        .values_list("related_ids", "scores")
+        .first()
+    )
+    if row is None:
+        return None
+    related_ids, scores = row
+    return [str(related_id) for related_id in related_ids], scores
+
+
+def sync_neighbours(related_barriers) -> None:
+    """
+    Bring the neighbour table up to date with the embedding store, from the
+    store's change log when it covers the gap and by a full rebuild otherwise.
+    """
+    with advisory_lock(NEIGHBOURS_LOCK):
+        version = related_barriers.store.version
+        if version is None:
+            return
+        synced = cache.get(NEIGHBOURS_VERSION_CACHE_KEY)
+        if synced == version:
+            return
+
+        changed = None
+        if synced is not None:
+            changed = related_barriers.store.changes_since(synced, version)
+
+        ids, vectors = related_barriers.load_embeddings()
+        if changed is None:
+            rebuild_neighbours(ids, vectors)
+        else:
+            refresh_neighbours(ids, vectors, changed)
+        cache.set(NEIGHBOURS_VERSION_CACHE_KEY, version, timeout=None)
+
+
+def rebuild_neighbours(ids: numpy.ndarray, vectors: numpy.ndarray) -> None:
+    logger.info(f"(Related Barriers): rebuilding neighbours of {len(ids)} barriers")
+    _write_neighbours(ids, vectors, range(len(ids)))
+    BarrierNeighbours.objects.exclude(barrier_id__in=ids.tolist()).delete()
+
+
+def refresh_neighbours(
+    ids: numpy.ndarray, vectors: numpy.ndarray, changed: Set[str]
+) -> None:
+    """
+    Recompute only the lists a change can affect: those of the changed
+    barriers, those that list a changed barrier, and those a changed
+    vector now scores above the list's admission score for.
+    """
+    positions = {barrier_id: row for row, barrier_id in enumerate(ids.tolist())}
+    live = [barrier_id for barrier_id in changed if barrier_id in positions]
+    removed = [barrier_id for barrier_id in changed if barrier_id not in positions]
+
+    affected = set(live)
+    affected.update(
+        str(barrier_id)
+        for barrier_id in BarrierNeighbours.objects.filter(
+            related_ids__overlap=list(changed)
+        ).values_list("barrier_id", flat=True)
+    )
+
+    if live:
+        best = (vectors @ vectors[[positions[i] for i in live]].T).max(axis=1)
+        min_scores = _min_scores()
+        affected.update(
+            barrier_id
+            for barrier_id, score in zip(ids.tolist(), best.tolist())
+            if score > min_scores.get(barrier_id, SIMILARITY_THRESHOLD)
+        )
+
+    logger.info(
+        f"(Related Barriers): refreshing neighbours of {len(affected)} barriers "
+        f"for {len(changed)} changes"
+    )
+    BarrierNeighbours.objects.filter(barrier_id__in=removed).delete()
+    _write_neighbours(
+        ids,
+        vectors,
+        sorted(positions[i] for i in affected if i in positions),
+    )
+
+
+def _min_scores() -> Dict[str, float]:
+    return {
+        str(barrier_id): min_score
+        for barrier_id, min_score in BarrierNeighbours.objects.values_list(
+            "barrier_id", "min_score"
+        ).iterator()
+    }
+
+
+def _write_neighbours(
+    ids: numpy.ndarray, vectors: numpy.ndarray, rows: Iterable[int]
+) -> None:
+    rows = list(rows)
+    existing = {
+        str(barrier_id)
+        for barrier_id in Barrier.objects.filter(
+            id__in=[ids[row] for row in rows]
+        ).values_list("id", flat=True)
+    }
+    for start in range(0, len(rows), RELATED_BARRIER_NEIGHBOURS_BLOCK_SIZE):
+        block = rows[start : start + RELATED_BARRIER_NEIGHBOURS_BLOCK_SIZE]
+        similarities = vectors[block] @ vectors.T
+        neighbours = []
+        for row, scores in zip(block, similarities):
+            if ids[row] not in existing:
+                continue
+            scores[row] = -numpy.inf
+            order = top_k(scores, RELATED_BARRIER_NEIGHBOURS)
+            order = order[scores[order] > SIMILARITY_THRESHOLD]
+            neighbours.append(
+                BarrierNeighbours(
+                    barrier_id=ids[row],
+                    related_ids=ids[order].tolist(),
+                    scores=[round(score, 4) for score in scores[order].tolist()],
+                    min_score=(
+                        float(scores[order[-1]])
+                        if len(order) == RELATED_BARRIER_NEIGHBOURS
+                        else SIMILARITY_THRESHOLD
+                    ),
+                )
+            )
+        BarrierNeighbours.objects.bulk_create(
+            neighbours,
+            update_conflicts=True,
+            unique_fields=["barrier"],
+            update_fields=["related_ids", "scores", "min_score", "modified_on"],
+        )
@@ -0,0 +1,104 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict
+
+import numpy
+from django.conf import settings
+from django.core.cache import cache
+
+from api.related_barriers.constants import (
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+QUERY_EMBEDDING_CACHE_PREFIX = "RELATED_BARRIERS_QUERY_EMBEDDING"
+
+
+def normalise_search_term(search_term: str) -> str:
+    """
+    The encoder lower cases its input and ignores runs of whitespace,
+    so terms differing only in either map to the same embedding.
+    """
+    return " ".join(search_term.lower().split())
+
+
+class QueryEmbeddingCache:
+    """
+    Search term -> embedding cache in front of the encoder.
+
+    A per process LRU of QUERY_EMBEDDING_CACHE_SIZE entries is backed by the
+    shared Django cache with a TTL of QUERY_EMBEDDING_CACHE_TIMEOUT, so a term
+    encoded by one worker is reused by the others.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = QUERY_EMBEDDING_CACHE_SIZE,
+        timeout: int = QUERY_EMBEDDING_CACHE_TIMEOUT,
+    ) -> None:
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(maxsize={self.maxsize})"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "size": len(self),
+        }
+
+    def get_or_encode(
+        self, search_term: str, encode: Callable[[str], numpy.ndarray]
+    ) -> numpy.ndarray:
+        term = normalise_search_term(search_term)
+
+        with self._lock:
+            if (vector := self._entries.get(term)) is not None:
+                self._entries.move_to_end(term)
+                self.hits += 1
+                return vector
+
+        key = self._key(term)
+        if (data := cache.get(key)) is not None:
+            vector = numpy.frombuffer(data, dtype=numpy.float32)
+            self.shared_hits += 1
+        else:
+            vector = numpy.asarray(encode(term), dtype=numpy.float32)
+            cache.set(key, vector.tobytes(), timeout=self.timeout)
+            self.misses += 1
+
+        vector.setflags(write=False)
+        with self._lock:
+            self._entries[term] = vector
+            self._entries.move_to_end(term)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        logger.info(f"(Related Barriers): query embedding cache {self.stats}")
+        return vector
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self.hits = self.shared_hits = self.misses = 0
+
+    def _key(self, term: str) -> str:
+        digest = hashlib.sha256(term.encode("utf-8")).hexdigest()
+        backend = settings.RELATED_BARRIERS_ENCODER_BACKEND
+        return f"{QUERY_EMBEDDING_CACHE_PREFIX}:{backend}:{digest}"
@@ -0,0 +1,354 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import uuid4
+
+import numpy
+from django.core.cache import cache
+from django_pglocks import advisory_lock
+
+from api.related_barriers.constants import (
+    EMBEDDING_STORE_BLOCK_SIZE,
+    EMBEDDING_STORE_CHANGE_LOG_TIMEOUT,
+    EMBEDDING_STORE_COMPACTION_RATIO,
+    EMBEDDING_STORE_DTYPE,
+    EMBEDDING_STORE_MAX_CHANGES,
+)
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_STORE_PREFIX = "RELATED_BARRIERS_EMBEDDINGS"
+EMBEDDING_STORE_LOCK = "related-barriers-embedding-store"
+
+
+class EmbeddingStore:
+    """
+    Row addressable embedding storage on top of the Django cache.
+
+    Embeddings live in fixed size blocks of EMBEDDING_STORE_BLOCK_SIZE rows,
+    each holding the row ids and the raw EMBEDDING_STORE_DTYPE vector bytes,
+    so writing one barrier only rewrites the block that contains it. Keys:
+
+        <prefix>:meta          rows allocated, tombstones, dimension, epoch
+        <prefix>:version       bumped on every write, cheap staleness check
+        <prefix>:row:<id>      barrier id -> row number
+        <prefix>:block:<n>     {"ids": [...], "vectors": bytes, "hashes": [...]}
+        <prefix>:changes:<v>   ids touched by the write that produced version v
+
+    Each row may carry a content hash of the text it was encoded from, which
+    lets a reindex skip rows whose text has not changed.
+
+    Deleted rows are tombstoned (their id is set to None) and the store is
+    compacted once tombstones exceed EMBEDDING_STORE_COMPACTION_RATIO of
+    the allocated rows.
+    """
+
+    def __init__(self, prefix: str = EMBEDDING_STORE_PREFIX) -> None:
+        self.prefix = prefix
+        self.dtype = numpy.dtype(EMBEDDING_STORE_DTYPE)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(prefix={self.prefix!r})"
+
+    def __len__(self) -> int:
+        meta = self._get_meta()
+        return meta["rows"] - meta["tombstones"]
+
+    def __contains__(self, barrier_id: str) -> bool:
+        return cache.get(self._row_key(barrier_id)) is not None
+
+    @property
+    def version(self) -> Optional[int]:
+        return cache.get(self._key("version"))
+
+    @property
+    def epoch(self) -> Optional[str]:
+        """
+        Random token minted whenever the store starts from empty, so that
+        versions from before a cache wipe are never mistaken for current ones.
+        """
+        return self._get_meta().get("epoch")
+
+    def load(self) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        All live (ids, vectors) as float32, in row order.
+        """
+        meta = self._get_meta()
+        block_count = -(-meta["rows"] // EMBEDDING_STORE_BLOCK_SIZE)
+        blocks = cache.get_many([self._block_key(n) for n in range(block_count)])
+
+        ids, vectors = [], []
+        for n in range(block_count):
+            block = blocks.get(self._block_key(n))
+            if block is None:
+                continue
+            block_ids = block["ids"]
+            block_vectors = self._decode(block["vectors"], meta["dimension"])
+            live = [row for row, barrier_id in enumerate(block_ids) if barrier_id]
+            ids.extend(block_ids[row] for row in live)
+            vectors.append(block_vectors[live])
+
+        if not vectors:
+            return numpy.array([], dtype=str), numpy.zeros(
+                (0, meta["dimension"]), dtype=numpy.float32
+            )
+        return numpy.array(ids, dtype=str), numpy.vstack(vectors).astype(numpy.float32)
+
+    def hashes(self) -> Dict[str, Optional[str]]:
+        """
+        Content hash of every live row, None where none was recorded.
+        """
+        meta = self._get_meta()
+        block_count = -(-meta["rows"] // EMBEDDING_STORE_BLOCK_SIZE)
+        blocks = cache.get_many([self._block_key(n) for n in range(block_count)])
+        hashes = {}
+        for block in blocks.values():
+            block_hashes = block.get("hashes") or [None] * len(block["ids"])
+            for barrier_id, content_hash in zip(block["ids"], block_hashes):
+                if barrier_id:
+                    hashes[barrier_id] = content_hash
+        return hashes
+
+    def get(self, ids: Iterable[str]) -> Dict[str, numpy.ndarray]:
+        """
+        Vectors for the ids that are present in the store.
+        """
+        meta = self._get_meta()
+        rows = self._get_rows(ids)
+        blocks = self._get_blocks(rows.values(), dimension=meta["dimension"])
+        vectors = {}
+        for barrier_id, row in rows.items():
+            block_number, offset = divmod(row, EMBEDDING_STORE_BLOCK_SIZE)
+            block = blocks[block_number]
+            if block["ids"][offset] == barrier_id:
+                vectors[barrier_id] = block["matrix"][offset].astype(numpy.float32)
+        return vectors
+
+    def replace(
+        self,
+        ids: List[str],
+        vectors: numpy.ndarray,
+        hashes: Optional[List[str]] = None,
+    ) -> Optional[int]:
+        """
+        Rewrite the whole store with the given rows.
+        """
+        logger.info(f"(Related Barriers): replacing {len(ids)} embeddings")
+        with advisory_lock(EMBEDDING_STORE_LOCK):
+            return self._replace(ids, vectors, meta=self._get_meta(), hashes=hashes)
+
+    def upsert(
+        self,
+        ids: List[str],
+        vectors: numpy.ndarray,
+        hashes: Optional[List[str]] = None,
+    ) -> Optional[int]:
+        """
+        Insert or overwrite rows, touching only the blocks that hold them.
+        """
+        ids = [str(barrier_id) for barrier_id in ids]
+        vectors = numpy.atleast_2d(vectors)
+        hashes = hashes or [None] * len(ids)
+        with advisory_lock(EMBEDDING_STORE_LOCK):
+            meta = self._get_meta()
+            if not meta["rows"]:
+                meta["dimension"] = vectors.shape[1]
+            rows = self._get_rows(ids)
+            new_rows = {}
+            for barrier_id in ids:
+                if barrier_id not in rows and barrier_id not in new_rows:
+                    new_rows[barrier_id] = meta["rows"]
+                    meta["rows"] += 1
+            rows.update(new_rows)
+
+            blocks = self._get_blocks(rows.values(), dimension=meta["dimension"])
+            for barrier_id, vector, content_hash in zip(ids, vectors, hashes):
+                block_number, offset = divmod(
+                    rows[barrier_id], EMBEDDING_STORE_BLOCK_SIZE
+                )
+                blocks[block_number]["ids"][offset] = barrier_id
+                blocks[block_number]["matrix"][offset] = vector
+                blocks[block_number]["hashes"][offset] = content_hash
+
+            self._set_blocks(blocks)
+            cache.set_many(
+                {self._row_key(i): row for i, row in new_rows.items()}, timeout=None
+            )
+            return self._commit(meta, changed=ids)
+
+    def delete(self, ids: Iterable[str]) -> Optional[int]:
+        """
+        Tombstone rows; compaction reclaims them once enough accumulate.
+        """
+        with advisory_lock(EMBEDDING_STORE_LOCK):
+            meta = self._get_meta()
+            rows = self._get_rows(ids)
+            if not rows:
+                return self.version
+
+            blocks = self._get_blocks(rows.values(), dimension=meta["dimension"])
+            for barrier_id, row in rows.items():
+                block_number, offset = divmod(row, EMBEDDING_STORE_BLOCK_SIZE)
+                blocks[block_number]["ids"][offset] = None
+                blocks[block_number]["matrix"][offset] = 0
+                blocks[block_number]["hashes"][offset] = None
+
+            self._set_blocks(blocks)
+            cache.delete_many([self._row_key(barrier_id) for barrier_id in rows])
+            meta["tombstones"] += len(rows)
+
+            if meta["tombstones"] > EMBEDDING_STORE_COMPACTION_RATIO * meta["rows"]:
+                live_ids, live_vectors = self.load()
+                live_hashes = self.hashes()
+                return self._replace(
+                    list(live_ids),
+                    live_vectors,
+                    meta=meta,
+                    changed=list(rows),
+                    hashes=[live_hashes.get(i) for i in live_ids.tolist()],
+                )
+            return self._commit(meta, changed=list(rows))
+
+    def changes_since(self, version: int, target: int) -> Optional[Set[str]]:
+        """
+        Ids written between `version` and `target`, or None if the change log
+        no longer covers that range and the caller should reload everything.
+        """
+        if not 0 <= target - version <= EMBEDDING_STORE_MAX_CHANGES:
+            return None
+        keys = [self._key(f"changes:{v}") for v in range(version + 1, target + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            return None
+        return {barrier_id for ids in changes.values() for barrier_id in ids}
+
+    def clear(self) -> Optional[int]:
+        """
+        Remove every row. The version keeps counting up so that readers
+        holding an older copy notice the change.
+        """
+        with advisory_lock(EMBEDDING_STORE_LOCK):
+            meta = self._get_meta()
+            block_count = -(-meta["rows"] // EMBEDDING_STORE_BLOCK_SIZE)
+            ids, _ = self.load()
+            cache.delete_many(
+                [self._row_key(barrier_id) for barrier_id in ids]
+                + [self._block_key(n) for n in range(block_count)]
+            )
+            return self._commit(
+                {"rows": 0, "tombstones": 0, "dimension": 0}, changed=None
+            )
+
+    def _replace(
+        self,
+        ids: List[str],
+        vectors: numpy.ndarray,
+        meta: Dict,
+        changed: Optional[List[str]] = None,
+        hashes: Optional[List[str]] = None,
+    ) -> Optional[int]:
+        hashes = hashes or [None] * len(ids)
+        old_ids, _ = self.load()
+        stale_ids = set(old_ids.tolist()) - set(ids)
+        old_block_count = -(-meta["rows"] // EMBEDDING_STORE_BLOCK_SIZE)
+        cache.delete_many([self._row_key(barrier_id) for barrier_id in stale_ids])
+
+        dimension = vectors.shape[1] if len(vectors) else meta["dimension"]
+        blocks = {}
+        for start in range(0, len(ids), EMBEDDING_STORE_BLOCK_SIZE):
+            blocks[start // EMBEDDING_STORE_BLOCK_SIZE] = {
+                "ids": [
+                    str(i) for i in ids[start : start + EMBEDDING_STORE_BLOCK_SIZE]
+                ],
+                "matrix": vectors[start : start + EMBEDDING_STORE_BLOCK_SIZE],
+                "hashes": hashes[start : start + EMBEDDING_STORE_BLOCK_SIZE],
+            }
+        self._set_blocks(blocks)
+        cache.delete_many(
+            [self._block_key(n) for n in range(len(blocks), old_block_count)]
+        )
+        cache.set_many(
+            {self._row_key(barrier_id): row for row, barrier_id in enumerate(ids)},
+            timeout=None,
+        )
+
+        meta.update(rows=len(ids), tombstones=0, dimension=dimension)
+        # Without `changed` the rewrite leaves a gap in the change log,
+        # which makes readers reload the whole store
+        return self._commit(meta, changed=changed)
+
+    def _commit(self, meta: Dict, changed: Optional[List[str]]) -> int:
+        version = (self.version or 0) + 1
+        meta.setdefault("epoch", uuid4().hex)
+        cache.set(self._key("meta"), meta, timeout=None)
+        if changed is not None:
+            cache.set(
+                self._key(f"changes:{version}"),
+                changed,
+                timeout=EMBEDDING_STORE_CHANGE_LOG_TIMEOUT,
+            )
+        cache.set(self._key("version"), version, timeout=None)
+        return version
+
+    def _get_meta(self) -> Dict:
+        return cache.get(self._key("meta")) or {
+            "rows": 0,
+            "tombstones": 0,
+            "dimension": 0,
+        }
+
+    def _get_rows(self, ids: Iterable[str]) -> Dict[str, int]:
+        keys = {self._row_key(barrier_id): str(barrier_id) for barrier_id in ids}
+        return {keys[key]: row for key, row in cache.get_many(list(keys)).items()}
+
+    def _get_blocks(self, rows: Iterable[int], dimension: int) -> Dict[int, Dict]:
+        """
+        Blocks covering `rows`, padded to full size with the vectors decoded
+        into a writable "matrix". Blocks that do not exist yet start empty.
+        """
+        block_numbers = {row // EMBEDDING_STORE_BLOCK_SIZE for row in rows}
+        cached = cache.get_many([self._block_key(n) for n in block_numbers])
+        blocks = {}
+        for n in block_numbers:
+            block = cached.get(self._block_key(n)) or {"ids": [], "vectors": b""}
+            decoded = self._decode(block["vectors"], dimension)
+            matrix = numpy.zeros(
+                (EMBEDDING_STORE_BLOCK_SIZE, dimension), dtype=self.dtype
+            )
+            matrix[: len(decoded)] = decoded
+            hashes = block.get("hashes") or [None] * len(block["ids"])
+            padding = [None] * (EMBEDDING_STORE_BLOCK_SIZE - len(block["ids"]))
+            blocks[n] = {
+                "ids": block["ids"] + padding,
+                "matrix": matrix,
+                "hashes": hashes + padding,
+            }
+        return blocks
+
+    def _set_blocks(self, blocks: Dict[int, Dict]) -> None:
+        cache.set_many(
+            {
+                self._block_key(n): {
+                    "ids": block["ids"],
+                    "vectors": numpy.ascontiguousarray(
+                        block["matrix"], dtype=self.dtype
+                    ).tobytes(),
+                    "hashes": block["hashes"],
+                }
+                for n, block in blocks.items()
+            },
+            timeout=None,
+        )
+
+    def _decode(self, data: bytes, dimension: int) -> numpy.ndarray:
+        if not data:
+            return numpy.zeros((0, dimension), dtype=self.dtype)
+        return numpy.frombuffer(data, dtype=self.dtype).reshape(-1, dimension)
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def _row_key(self, barrier_id: str) -> str:
+        return self._key(f"row:{barrier_id}")
+
+    def _block_key(self, block_number: int) -> str:
+        return self._key(f"block:{block_number}")
@@ -1,27 +1,116 @@
 import logging
+import time
+from typing import Iterable, List
 
 from celery import shared_task
+from django.core.cache import cache
 from django.core.management import call_command
+from django.db import transaction
 
 from api.barriers.models import Barrier
 from api.related_barriers import manager
-from api.related_barriers.constants import BarrierEntry
+from api.related_barriers.constants import RELATED_BARRIER_UPDATE_WINDOW_SECONDS
+from api.related_barriers.corpus import CorpusBuilder
+from api.related_barriers.neighbours import sync_neighbours
 
 logger = logging.getLogger(__name__)
 
+PENDING_UPDATES_CACHE_KEY = "RELATED_BARRIERS_PENDING_UPDATES"
+PENDING_UPDATES_SCHEDULED_CACHE_KEY = "RELATED_BARRIERS_PENDING_UPDATES_SCHEDULED"
+PENDING_UPDATES_WINDOW_TIMEOUT = RELATED_BARRIER_UPDATE_WINDOW_SECONDS * 10
 
-def update_related_barrier(barrier_id: str):
-    logger.info(f"Updating related barrier embeddings for:  {barrier_id}")
+
+def pending_key(name) -> str:
+    return f"{PENDING_UPDATES_CACHE_KEY}:{name}"
+
+
+def enqueue_related_barrier_update(barrier_id: str):
+    """
+    Queue a barrier for re-embedding once the save is committed.
+
+    Each queued id takes the next slot of an atomic counter, and a key per id
+    keeps it from being queued twice while it waits. The first enqueue in a
+    window schedules process_related_barrier_updates to run once the window
+    has passed, so a burst of saves is encoded and written as a single batch.
+    """
+    logger.info(f"Queueing related barrier embeddings update for: {barrier_id}")
+
+    def enqueue():
+        if cache.add(
+            pending_key(f"id:{barrier_id}"), True, PENDING_UPDATES_WINDOW_TIMEOUT
+        ):
+            cache.add(pending_key("slots"), 0, timeout=None)
+            slot = cache.incr(pending_key("slots"))
+            cache.set(pending_key(slot), barrier_id, timeout=None)
+
+        schedule_pending_updates()
+
+    # Only queue once the save is committed so the task reads the new values,
+    # and nothing is queued or scheduled for a save that is rolled back
+    transaction.on_commit(enqueue)
+
+
+def drain_pending_updates() -> List[str]:
+    """
+    Take the queued ids in slot order, stopping at a slot that has been
+    claimed but not written yet. A slot that stays unwritten for a whole
+    window belongs to an enqueue that died, and is skipped.
+    """
+    drained = cache.get(pending_key("drained"), 0)
+    last = cache.get(pending_key("slots"), 0)
+    slots = cache.get_many([pending_key(n) for n in range(drained + 1, last + 1)])
+
+    barrier_ids, drained_keys = [], []
+    for slot in range(drained + 1, last + 1):
+        barrier_id = slots.get(pending_key(slot))
+        if barrier_id is None:
+            gap_seen = cache.get_or_set(pending_key(f"gap:{slot}"), time.time(), None)
+            if time.time() - gap_seen < RELATED_BARRIER_UPDATE_WINDOW_SECONDS:
+                schedule_pending_updates()
+                break
+            cache.delete(pending_key(f"gap:{slot}"))
+        else:
+            barrier_ids.append(barrier_id)
+            drained_keys.append(pending_key(slot))
+        drained = slot
+
+    cache.set(pending_key("drained"), drained, timeout=None)
+    cache.delete_many(
+        drained_keys + [pending_key(f"id:{barrier_id}") for barrier_id in barrier_ids]
+    )
+    # An id queued again after its key expired can hold two slots
+    return list(dict.fromkeys(barrier_ids))
+
+
+def schedule_pending_updates():
+    if cache.add(
+        PENDING_UPDATES_SCHEDULED_CACHE_KEY, True, PENDING_UPDATES_WINDOW_TIMEOUT
+    ):
+        process_related_barrier_updates.apply_async(
+            countdown=RELATED_BARRIER_UPDATE_WINDOW_SECONDS
+        )
+
+
+@shared_task
+def process_related_barrier_updates():
+    """Drain the queue of barriers waiting to be re-embedded"""
+    # Clear the flag first so saves from here on schedule the next run
+    cache.delete(PENDING_UPDATES_SCHEDULED_CACHE_KEY)
+    if barrier_ids := drain_pending_updates():
+        update_related_barriers(barrier_ids)
+
+
+def update_related_barriers(barrier_ids: Iterable[str]):
+    barrier_ids = [str(barrier_id) for barrier_id in barrier_ids]
+    logger.info(f"Updating related barrier embeddings for {len(barrier_ids)} barriers")
     related_barriers = manager.get_or_init()
     try:
-        related_barriers.update_barrier(
-            BarrierEntry(
-                id=barrier_id,
-                barrier_corpus=manager.barrier_to_corpus(
-                    Barrier.objects.get(pk=barrier_id)
-                ),
-            )
-        )
+        builder = CorpusBuilder()
+        for batch in builder.iter_batches(
+            Barrier.objects.filter(id__in=barrier_ids, archived=False, draft=False)
+        ):
+            related_barriers.update_barriers(batch)
+        sync_neighbours(related_barriers)
     except Exception as e:
         # We don't want barrier embedding updates to break worker so just log error
         logger.critical(str(e))
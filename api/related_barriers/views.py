@@ -9,10 +9,12 @@ from rest_framework.response import Response
 from api.barriers.models import Barrier
 from api.related_barriers import manager
 from api.related_barriers.constants import (
+    RELATED_BARRIER_NEIGHBOURS,
     SIMILAR_BARRIERS_LIMIT,
     SIMILARITY_THRESHOLD,
     BarrierEntry,
 )
+from api.related_barriers.neighbours import get_neighbours
 from api.related_barriers.serializers import BarrierRelatedListSerializer, SearchRequest
 
 logger = logging.getLogger(__name__)
@@ -26,23 +28,28 @@ def related_barriers_view(request, pk) -> Response:
     logger.info(f"Getting related barriers for {pk}")
     barrier = get_object_or_404(Barrier, pk=pk)
 
-    related_barriers = manager.get_or_init()
-
-    barrier_scores = related_barriers.get_similar_barriers(
-        barrier=BarrierEntry(
-            id=str(barrier.id),
-            barrier_corpus=manager.barrier_to_corpus(barrier),
-        ),
-        similarity_threshold=SIMILARITY_THRESHOLD,
-        quantity=10,
-    )
-
-    barrier_ids = [b[0] for b in barrier_scores]
-    when_tensor = [When(id=k, then=Value(v.item())) for k, v in barrier_scores]
+    if (neighbours := get_neighbours(str(barrier.id))) is not None:
+        barrier_ids, scores = neighbours
+    else:
+        # Not materialised yet, e.g. a barrier saved since the last sync
+        related_barriers = manager.get_or_init()
+        barrier_ids, scores = related_barriers.query_barrier(
+            barrier=BarrierEntry(
+                id=str(barrier.id),
+                barrier_corpus=manager.barrier_to_corpus(barrier),
+            ),
+            similarity_threshold=SIMILARITY_THRESHOLD,
+            quantity=RELATED_BARRIER_NEIGHBOURS,
+        )
+        barrier_ids, scores = barrier_ids.tolist(), scores.tolist()
+
+    when_scores = [
+        When(id=k, then=Value(round(v, 4))) for k, v in zip(barrier_ids, scores)
+    ]
 
     similar_barriers = (
         Barrier.objects.filter(id__in=barrier_ids)
-        .annotate(similarity=Case(*when_tensor, output_field=FloatField()))
+        .annotate(similarity=Case(*when_scores, output_field=FloatField()))
         .order_by("-similarity")
     )
 
@@ -61,22 +68,24 @@ def related_barriers_search(request) -> Response:
 
     related_barriers = manager.get_or_init()
 
-    barrier_scores = related_barriers.get_similar_barriers_searched(
+    barrier_ids, scores = related_barriers.query_search_term(
         search_term=serializer.data["search_term"],
         similarity_threshold=SIMILARITY_THRESHOLD,
         quantity=SIMILAR_BARRIERS_LIMIT,
-    )
+    ) or ([], [])
 
-    barrier_ids = [b[0] for b in barrier_scores]
+    barrier_ids = list(barrier_ids)
 
     barriers = Barrier.objects.filter(id__in=barrier_ids).annotate(
         barrier_id=Cast("id", output_field=CharField())
     )
     barriers = {b.barrier_id: b for b in barriers}
 
-    for barrier_id, score in barrier_scores:
-        barriers[barrier_id].similarity = score
+    data = []
+    for barrier_id, score in zip(barrier_ids, scores):
+        if barrier := barriers.get(barrier_id):
+            barrier.similarity = round(float(score), 4)
+            data.append(barrier)
 
-    data = [value for key, value in barriers.items()]
     serializer = BarrierRelatedListSerializer(data, many=True)
     return Response(serializer.data)
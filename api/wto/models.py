@@ -97,7 +97,7 @@ class WTOProfile(models.Model):
     history = HistoricalRecords(bases=[WTOProfileHistoricalModel])
 
     @classmethod
-    def get_history(cls, barrier_id):
+    def get_history(cls, barrier_id, since=None):
 
         qs = cls.history.filter(barrier__id=barrier_id)
 
@@ -117,4 +117,5 @@ class WTOProfile(models.Model):
             model="wto_profile",
             fields=fields,
             track_first_item=True,
+            since=since,
         )
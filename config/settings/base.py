@@ -1,6 +1,7 @@
 import os
 import ssl
 import sys
+import tempfile
 from pathlib import Path
 
 import dj_database_url
@@ -110,7 +111,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "oauth2_provider.middleware.OAuth2TokenMiddleware",
-    "hawkrest.middleware.HawkResponseMiddleware",
+    "api.core.middleware.hawk.HawkResponseMiddleware",
     "api.user.middleware.UserActivityLogMiddleware",
     "simple_history.middleware.HistoryRequestMiddleware",
     "django_audit_log_middleware.AuditLogMiddleware",
@@ -217,6 +218,29 @@ if REDIS_BASE_URL:
         CELERY_REDIS_BACKEND_USE_SSL = {"ssl_cert_reqs": ssl.CERT_REQUIRED}
         CELERY_BROKER_USE_SSL = CELERY_REDIS_BACKEND_USE_SSL
 
+# Related barriers
+# Unix socket of the related_barriers_worker process, encoding happens in process when unset
+RELATED_BARRIERS_EMBEDDING_WORKER_SOCKET = env(
+    "RELATED_BARRIERS_EMBEDDING_WORKER_SOCKET", default=None
+)
+# Sentence transformer backend: "torch", "torch-int8" or "onnx" (needs optimum[onnxruntime])
+RELATED_BARRIERS_ENCODER_BACKEND = env(
+    "RELATED_BARRIERS_ENCODER_BACKEND", default="torch"
+)
+# Node local directory for the memory mapped embedding matrix shared by workers
+RELATED_BARRIERS_LOCAL_CACHE_DIR = env(
+    "RELATED_BARRIERS_LOCAL_CACHE_DIR",
+    default=os.path.join(tempfile.gettempdir(), "related_barriers"),
+)
+
+# History
+# How history tables are diffed: "python" row by row, or "sql" with LAG() in postgres
+HISTORY_DIFF_ENGINE = env("HISTORY_DIFF_ENGINE", default="python")
+
+# Data Workspace
+# Serve the barrier dataset from the snapshots kept by refresh_barrier_snapshots
+DATASET_BARRIER_SNAPSHOTS = env.bool("DATASET_BARRIER_SNAPSHOTS", False)
+
 AV_V2_SERVICE_URL = env("AV_V2_SERVICE_URL", default="http://av-service/")
 
 # If we have VCAP_SERVICES then we are running on gov.uk PaaS, let's use the AWS credentials from
@@ -424,6 +448,18 @@ if not DEBUG:
         "schedule": crontab(minute=0, hour=0),
     }
 
+    # Runs every 5 minutes
+    CELERY_BEAT_SCHEDULE["refresh_barrier_snapshots"] = {
+        "task": "api.dataset.tasks.refresh_barrier_snapshots",
+        "schedule": crontab(minute="*/5"),
+    }
+
+    # Runs daily at 2am
+    CELERY_BEAT_SCHEDULE["export_datasets"] = {
+        "task": "api.dataset.tasks.export_datasets",
+        "schedule": crontab(minute=0, hour=2),
+    }
+
     # Runs daily at 6am
     CELERY_BEAT_SCHEDULE["send_notification_emails"] = {
         "task": "api.user.tasks.send_notification_emails",
@@ -0,0 +1,101 @@
+import json
+import time
+import tracemalloc
+
+import pytest
+from mock import patch
+
+from api.barrier_downloads import service
+from api.barrier_downloads.serializers import CsvDownloadSerializer
+from api.barriers.models import Barrier, BarrierProgressUpdate
+from api.metadata.constants import PROGRESS_UPDATE_CHOICES
+from tests.barriers.factories import BarrierFactory
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+BARRIER_COUNT = 10_000
+BATCH_SIZE = 2_000
+CODE_PREFIX = "BENCH-"
+
+
+@pytest.fixture(scope="module")
+def barrier_ids(django_db_setup, django_db_blocker):
+    """
+    Seeded once for the module, outside the per test transactions.
+    """
+    with django_db_blocker.unblock():
+        template = BarrierFactory(code=f"{CODE_PREFIX}TEMPLATE")
+        yield seed_barriers(template)
+        Barrier.objects.filter(code__startswith=CODE_PREFIX).delete()
+
+
+def seed_barriers(template):
+    fields = {
+        field.attname: getattr(template, field.attname)
+        for field in Barrier._meta.concrete_fields
+        if not field.primary_key
+    }
+    for start in range(0, BARRIER_COUNT - 1, BATCH_SIZE):
+        barriers = Barrier.objects.bulk_create(
+            [
+                Barrier(
+                    **{
+                        **fields,
+                        "code": f"{CODE_PREFIX}{n:06d}",
+                        "title": f"Barrier {n}",
+                    }
+                )
+                for n in range(start, min(start + BATCH_SIZE, BARRIER_COUNT - 1))
+            ]
+        )
+        BarrierProgressUpdate.objects.bulk_create(
+            [
+                BarrierProgressUpdate(
+                    barrier=barrier,
+                    status=PROGRESS_UPDATE_CHOICES.ON_TRACK,
+                    update=f"Update of {barrier.title}",
+                    next_steps="Next steps",
+                )
+                for barrier in barriers
+            ]
+        )
+    return [
+        str(barrier_id)
+        for barrier_id in Barrier.objects.filter(
+            code__startswith=CODE_PREFIX
+        ).values_list("id", flat=True)
+    ]
+
+
+def measure(get_rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    digests = [hash(json.dumps(row, sort_keys=True, default=str)) for row in get_rows()]
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return digests, seconds, peak
+
+
+def test_chunked_download_benchmark(barrier_ids, record_property):
+    """
+    Opt in with -m benchmark, the timings and peak memory are recorded as
+    junit xml properties.
+    """
+    with patch.object(service, "CSV_DOWNLOAD_UNNEST_THRESHOLD", BARRIER_COUNT):
+        legacy, legacy_seconds, legacy_peak = measure(
+            lambda: CsvDownloadSerializer(
+                service.get_queryset(barrier_ids), many=True
+            ).data
+        )
+    chunked, chunked_seconds, chunked_peak = measure(
+        lambda: service.get_csv_rows(barrier_ids)
+    )
+
+    record_property("legacy_seconds", round(legacy_seconds, 1))
+    record_property("legacy_peak_mb", round(legacy_peak / 2**20, 1))
+    record_property("chunked_seconds", round(chunked_seconds, 1))
+    record_property("chunked_peak_mb", round(chunked_peak / 2**20, 1))
+    assert len(chunked) == BARRIER_COUNT
+    assert chunked == legacy
+    assert chunked_peak < legacy_peak
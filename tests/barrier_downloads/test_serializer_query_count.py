@@ -4,7 +4,7 @@ import pytest
 from django.utils import timezone
 
 from api.barrier_downloads.serializers import CsvDownloadSerializer
-from api.barrier_downloads.service import get_queryset
+from api.barrier_downloads.service import get_csv_rows, get_queryset
 from api.barriers.models import (
     BarrierCommodity,
     BarrierNextStepItem,
@@ -128,3 +128,15 @@ def test_csv_serializer_query_count(django_assert_num_queries):
     assert s[1]["erd_request_status"] == "None"
     assert s[2]["barrier_owner"] is None
     assert s[2]["erd_request_status"] == "Delete pending"
+
+
+def test_chunked_csv_rows_query_count(django_assert_num_queries):
+    barriers = BarrierFactory.create_batch(5)
+
+    # The ordered ids, then the barriers and their prefetches for each chunk
+    with django_assert_num_queries(1 + 3 * EXPECTED_QUERY_COUNT):
+        rows = list(get_csv_rows([barrier.id for barrier in barriers], chunk_size=2))
+
+    assert [row["id"] for row in rows] == [
+        str(barrier.id) for barrier in barriers[::-1]
+    ]
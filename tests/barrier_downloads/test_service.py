@@ -45,8 +45,47 @@ def test_serializer_to_csv_bytes():
     ).encode("utf-8")
 
 
+def test_stream_csv_bytes_matches_serializer_to_csv_bytes():
+    barriers = BarrierFactory.create_batch(5)
+    field_names = {"id": "id", "code": "code", "title": "Title"}
+    serializer = CsvDownloadSerializer(barriers, many=True)
+
+    chunks = list(
+        api.core.utils.stream_csv_bytes(serializer.data, field_names, chunk_size=2)
+    )
+
+    assert len(chunks) == 3
+    assert b"".join(chunks) == api.core.utils.serializer_to_csv_bytes(
+        serializer, field_names
+    )
+
+
+def test_get_csv_rows_serializes_in_chunks():
+    barriers = BarrierFactory.create_batch(3)
+    barrier_ids = [str(barrier.id) for barrier in barriers]
+
+    assert [
+        [barrier.id for barrier in chunk]
+        for chunk in service.get_barrier_chunks(barrier_ids, chunk_size=2)
+    ] == [[barrier.id for barrier in barriers[::-1][:2]], [barriers[0].id]]
+    assert (
+        list(service.get_csv_rows(barrier_ids, chunk_size=2))
+        == CsvDownloadSerializer(service.get_queryset(barrier_ids), many=True).data
+    )
+
+
+def test_large_id_lists_are_unnested():
+    barriers = BarrierFactory.create_batch(3)
+    barrier_ids = [str(barrier.id) for barrier in barriers[:2]]
+
+    with patch.object(service, "CSV_DOWNLOAD_UNNEST_THRESHOLD", 1):
+        queryset = service.get_queryset(barrier_ids)
+        assert "unnest" in str(queryset.query)
+        assert {str(barrier.id) for barrier in queryset} == set(barrier_ids)
+
+
 @patch("api.barrier_downloads.service.get_s3_client_and_bucket_name")
-@patch("api.barrier_downloads.service.serializer_to_csv_bytes")
+@patch("api.barrier_downloads.service.stream_csv_bytes")
 @patch("api.barrier_downloads.tasks.barrier_download_complete_notification")
 def test_generate_barrier_download_file(mock_notify, mock_csv_bytes, mock_s3, user):
     b1 = BarrierFactory()
@@ -58,17 +97,25 @@ def test_generate_barrier_download_file(mock_notify, mock_csv_bytes, mock_s3, us
         filters={},
         filename="test_file.csv",
     )
-    s3_client, bucket = mock.Mock(), mock.Mock()
-    mock_csv_bytes.return_value = b"test"
+    s3_client, bucket = mock.MagicMock(), mock.Mock()
+    mock_csv_bytes.return_value = iter([b"te", b"st"])
     mock_s3.return_value = s3_client, bucket
 
     service.generate_barrier_download_file(
         barrier_download_id=barrier_download.id, barrier_ids=[str(b1.id), str(b2.id)]
     )
 
-    s3_client.put_object.assert_called_once_with(
-        Bucket=bucket, Body=b"test", Key="test_file.csv"
+    s3_client.create_multipart_upload.assert_called_once_with(
+        Bucket=bucket, Key="test_file.csv"
     )
+    s3_client.upload_part.assert_called_once_with(
+        Bucket=bucket,
+        Key="test_file.csv",
+        UploadId=s3_client.create_multipart_upload.return_value["UploadId"],
+        PartNumber=1,
+        Body=b"test",
+    )
+    s3_client.complete_multipart_upload.assert_called_once()
     mock_notify.delay.assert_called_once_with(
         barrier_download_id=str(barrier_download.id)
     )
@@ -77,8 +124,11 @@ def test_generate_barrier_download_file(mock_notify, mock_csv_bytes, mock_s3, us
     assert barrier_download.status == BarrierDownloadStatus.COMPLETE
 
 
-@patch("api.barrier_downloads.service.serializer_to_csv_bytes", side_effect=Exception())
-def test_generate_barrier_download_file_exception_handled(mock_csv_bytes, user):
+@patch("api.barrier_downloads.service.get_s3_client_and_bucket_name")
+@patch("api.barrier_downloads.service.stream_csv_bytes", side_effect=Exception())
+def test_generate_barrier_download_file_exception_handled(
+    mock_csv_bytes, mock_s3, user
+):
     b1 = BarrierFactory()
     b2 = BarrierFactory()
 
@@ -88,6 +138,8 @@ def test_generate_barrier_download_file_exception_handled(mock_csv_bytes, user):
         filters={},
         filename="test_file.csv",
     )
+    s3_client, bucket = mock.MagicMock(), mock.Mock()
+    mock_s3.return_value = s3_client, bucket
 
     with pytest.raises(Exception) as exc:
         service.generate_barrier_download_file(
@@ -97,6 +149,8 @@ def test_generate_barrier_download_file_exception_handled(mock_csv_bytes, user):
 
     barrier_download.refresh_from_db()
     assert barrier_download.status == BarrierDownloadStatus.FAILED
+    s3_client.abort_multipart_upload.assert_called_once()
+    s3_client.complete_multipart_upload.assert_not_called()
 
 
 def test_barrier_download_complete_notification_not_complete(user):
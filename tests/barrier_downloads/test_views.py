@@ -39,7 +39,7 @@ class TestBarrierDownloadViews(APITestMixin, TestCase):
         assert response.content == b'{"error": "No barriers matching filterset"}'
 
     @patch("api.barrier_downloads.service.get_s3_client_and_bucket_name")
-    @patch("api.barrier_downloads.service.serializer_to_csv_bytes")
+    @patch("api.barrier_downloads.service.stream_csv_bytes")
     @patch("api.barrier_downloads.tasks.barrier_download_complete_notification")
     def test_barrier_download_post_endpoint_success(
         self, mock_notify, mock_csv_bytes, mock_s3
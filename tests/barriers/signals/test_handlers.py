@@ -10,9 +10,11 @@ def test_related_barrier_handler():
     barrier = BarrierFactory()
 
     with mock.patch(
-        "api.barriers.signals.handlers.update_related_barrier"
-    ) as mock_update_related_barrier:
+        "api.barriers.signals.handlers.enqueue_related_barrier_update"
+    ) as mock_enqueue_related_barrier_update:
         barrier.title = "New Title"
         barrier.save()
 
-    mock_update_related_barrier.assert_called_once_with(barrier_id=str(barrier.pk))
+    mock_enqueue_related_barrier_update.assert_called_once_with(
+        barrier_id=str(barrier.pk)
+    )
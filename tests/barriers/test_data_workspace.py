@@ -4,8 +4,10 @@ from datetime import date
 import django.db.models
 import freezegun
 import pytest
+from django.db import connection
 from django.db.models import Prefetch
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
 from api.action_plans.models import ActionPlan
@@ -17,7 +19,10 @@ from api.barriers.models import (
     BarrierTopPrioritySummary,
     EstimatedResolutionDateRequest,
 )
-from api.barriers.serializers.data_workspace import DataWorkspaceSerializer
+from api.barriers.serializers.data_workspace import (
+    DataWorkspaceSerializer,
+    get_page_columns,
+)
 from api.core.test_utils import APITestMixin, create_test_user
 from api.metadata.constants import (
     ECONOMIC_ASSESSMENT_IMPACT_MIDPOINTS,
@@ -852,6 +857,59 @@ class TestDataWarehouseExport(TestCase):
         assert data["first_estimated_resolution_date"] == ts2.strftime("%Y-%m-%d")
 
 
+class TestDataWorkspacePageColumns(TestCase):
+    def create_barriers(self, count):
+        priority_tag = BarrierTag.objects.get(
+            title="Scoping (Top 100 priority barrier)"
+        )
+        barriers = BarrierFactory.create_batch(count, estimated_resolution_date=None)
+        for i, barrier in enumerate(barriers):
+            barrier.estimated_resolution_date = date(2030, 1, 1 + i)
+            barrier.priority_level = PRIORITY_LEVELS.WATCHLIST
+            barrier.top_priority_status = TOP_PRIORITY_BARRIER_STATUS.APPROVAL_PENDING
+            barrier.save()
+            barrier.tags.add(priority_tag)
+            barrier.status = BarrierStatus.RESOLVED_IN_PART
+            barrier.top_priority_status = TOP_PRIORITY_BARRIER_STATUS.APPROVED
+            barrier.save()
+            if i % 2:
+                barrier.estimated_resolution_date = date(2031, 1, 1 + i)
+                barrier.title = "Updated"
+                barrier.save()
+            barrier.public_barrier._public_view_status = (
+                PublicBarrierStatus.APPROVAL_PENDING
+            )
+            barrier.public_barrier.save()
+        return list(
+            Barrier.objects.filter(id__in=[barrier.id for barrier in barriers])
+            .prefetch_related("tags")
+            .order_by("created_on")
+        )
+
+    def test_page_columns_match_barrier_columns(self):
+        barriers = self.create_barriers(4)
+
+        page_columns = get_page_columns(barriers)
+        for barrier in barriers:
+            assert (
+                DataWorkspaceSerializer(
+                    barrier, context={"page_columns": page_columns}
+                ).data
+                == DataWorkspaceSerializer(barrier).data
+            )
+
+    def test_page_columns_query_count_does_not_grow_with_page(self):
+        small_page = self.create_barriers(2)
+        large_page = self.create_barriers(6)
+
+        with CaptureQueriesContext(connection) as small_page_queries:
+            get_page_columns(small_page)
+        with CaptureQueriesContext(connection) as large_page_queries:
+            get_page_columns(large_page)
+
+        assert len(large_page_queries) == len(small_page_queries)
+
+
 class TestBarrierDataWarehouseDeliveryConfidenceSerializer(APITestMixin, APITestCase):
     def setUp(self):
         super().setUp()
@@ -0,0 +1,163 @@
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from django.core.management import call_command
+from rest_framework.reverse import reverse
+
+from api.barriers.models import Barrier
+from api.barriers.search import (
+    filter_by_ranking,
+    flatten_company_names,
+    lexical_ranking,
+    reciprocal_rank_fusion,
+)
+from api.core.test_utils import APITestMixin
+from tests.barriers.factories import BarrierFactory
+
+
+def test_reciprocal_rank_fusion_prefers_ids_in_both_rankings():
+    ranking = reciprocal_rank_fusion([["a", "b"], ["c", "b"]], k=1)
+
+    assert [item for item, _ in ranking] == ["b", "a", "c"]
+    assert ranking[0][1] == pytest.approx(1 / 3 + 1 / 3)
+
+
+def test_flatten_company_names():
+    assert (
+        flatten_company_names(
+            [{"id": "1", "name": "ACME Ltd"}, {"id": "2"}],
+            None,
+            [{"name": "Department For Trade"}],
+        )
+        == "acme ltd\ndepartment for trade"
+    )
+
+
+@pytest.mark.django_db
+def test_save_maintains_search_columns():
+    barrier = BarrierFactory(
+        summary="Tariffs on steel", companies=[{"id": "1", "name": "Steel Co"}]
+    )
+    barrier.refresh_from_db()
+
+    assert barrier.company_names == "steel co"
+    assert barrier.search_vector
+
+    barrier.companies = [{"id": "2", "name": "Iron Co"}]
+    barrier.save(update_fields=["companies"])
+    barrier.refresh_from_db()
+
+    assert barrier.company_names == "iron co"
+
+
+@pytest.mark.django_db
+def test_save_only_updates_search_vector_for_searched_fields():
+    barrier = BarrierFactory(title="Steel tariffs")
+    Barrier.objects.filter(pk=barrier.pk).update(search_vector=None)
+
+    barrier.archived = True
+    barrier.save(update_fields=["archived"])
+    assert Barrier.objects.get(pk=barrier.pk).search_vector is None
+
+    barrier.companies = [{"id": "1", "name": "Steel Co"}]
+    barrier.save(update_fields=["companies"])
+    assert Barrier.objects.get(pk=barrier.pk).search_vector
+
+
+@pytest.mark.django_db
+def test_lexical_ranking_orders_by_text_rank():
+    weak = BarrierFactory(summary="steel and many other words about trade")
+    strong = BarrierFactory(summary="steel steel steel")
+    BarrierFactory(summary="nothing relevant", title="unrelated")
+
+    assert lexical_ranking(Barrier.objects.all(), "steel", 10) == [
+        str(strong.id),
+        str(weak.id),
+    ]
+
+
+@pytest.mark.django_db
+def test_lexical_ranking_weights_title_above_export_description():
+    described = BarrierFactory(export_description="Steel exports")
+    titled = BarrierFactory(title="Steel")
+
+    assert lexical_ranking(Barrier.objects.all(), "steel", 10) == [
+        str(titled.id),
+        str(described.id),
+    ]
+
+
+@pytest.mark.django_db
+def test_update_barrier_search_vectors_backfills():
+    barrier = BarrierFactory(
+        title="Steel", related_organisations=[{"name": "Port Authority"}]
+    )
+    Barrier.objects.update(search_vector=None, company_names="")
+
+    call_command("update_barrier_search_vectors", batch_size=1)
+
+    assert lexical_ranking(Barrier.objects.all(), "authority", 10) == [str(barrier.id)]
+    assert Barrier.objects.get(id=barrier.id).company_names == "port authority"
+
+
+@pytest.mark.django_db
+def test_filter_by_ranking_keeps_order_and_queryset_filters():
+    first, second, archived = BarrierFactory.create_batch(3)
+    archived.archived = True
+    archived.save()
+
+    ranking = [(str(archived.id), 0.3), (str(second.id), 0.2), (str(first.id), 0.1)]
+    qs = filter_by_ranking(Barrier.objects.filter(archived=False), ranking)
+
+    assert [
+        (str(barrier.id), barrier.ranking_position, barrier.similarity)
+        for barrier in qs.order_by("ranking_position")
+    ] == [(str(second.id), 2, 0.2), (str(first.id), 3, 0.1)]
+    assert qs.count() == 2
+
+
+def test_filter_by_ranking_joins_the_ranking_once():
+    ranking = [(str(uuid4()), 0.2), (str(uuid4()), 0.1)]
+    qs = filter_by_ranking(Barrier.objects.all(), ranking).order_by("ranking_position")
+
+    sql, params = qs.query.sql_with_params()
+
+    assert sql.count("unnest(") == 1
+    assert params == ([barrier_id for barrier_id, _ in ranking], [0.2, 0.1])
+
+
+class TestDashboardSearch(APITestMixin):
+    @patch("api.related_barriers.manager.get_or_init")
+    def test_fuses_lexical_and_related_barrier_matches(self, get_or_init):
+        lexical_only = BarrierFactory(title="Steel quota")
+        both = BarrierFactory(title="Steel tariff")
+        semantic_only = BarrierFactory(title="Metal import duties")
+        BarrierFactory(title="Fish")
+        get_or_init.return_value.query_search_term.return_value = (
+            [str(both.id), str(semantic_only.id)],
+            [0.9, 0.8],
+        )
+
+        response = self.api_client.get(
+            f'{reverse("list-barriers")}?search_term_text=steel&ordering=relevance'
+        )
+
+        assert response.status_code == 200
+        ids = [barrier["id"] for barrier in response.data["results"]]
+        assert set(ids) == {str(lexical_only.id), str(both.id), str(semantic_only.id)}
+        assert ids[0] == str(both.id)
+
+    def test_text_search_orders_by_rank_for_relevance(self):
+        described = BarrierFactory(export_description="Steel exports")
+        titled = BarrierFactory(title="Steel")
+
+        response = self.api_client.get(
+            f'{reverse("list-barriers")}?search=steel&ordering=relevance'
+        )
+
+        assert response.status_code == 200
+        assert [barrier["id"] for barrier in response.data["results"]] == [
+            str(titled.id),
+            str(described.id),
+        ]
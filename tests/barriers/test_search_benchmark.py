@@ -0,0 +1,93 @@
+import time
+
+import pytest
+from django.contrib.postgres.search import SearchVector
+from django.db import connection
+from django.db.models import Q
+
+from api.barriers.models import Barrier
+from api.barriers.search import (
+    BARRIER_SEARCH_VECTOR,
+    flatten_company_names,
+    lexical_search,
+)
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+BARRIER_COUNT = 50_000
+BATCH_SIZE = 5_000
+CODE_PREFIX = "BENCH-"
+WORDS = ["steel", "tariff", "quota", "licence", "dairy", "customs", "timber"]
+
+
+def legacy_text_search(queryset, value):
+    """text_search as it was before the stored and trigram indexed columns"""
+    company_query = Q()
+    for i in range(20):
+        company_query |= Q(**{f"companies__{i}__name__icontains": value})
+        company_query |= Q(**{f"related_organisations__{i}__name__icontains": value})
+
+    return queryset.annotate(
+        search=SearchVector("summary", "export_description"),
+    ).filter(
+        Q(code__icontains=value)
+        | Q(search=value)
+        | Q(title__icontains=value)
+        | Q(public_barrier__id__iexact=value.lstrip("PID-").upper())
+        | company_query
+    )
+
+
+@pytest.fixture(scope="module")
+def seeded_barriers(django_db_setup, django_db_blocker):
+    """
+    Seeded once for the module, outside the per test transactions.
+    """
+    with django_db_blocker.unblock():
+        seed_barriers()
+        yield
+        Barrier.objects.filter(code__startswith=CODE_PREFIX).delete()
+
+
+def seed_barriers():
+    for start in range(0, BARRIER_COUNT, BATCH_SIZE):
+        barriers = []
+        for n in range(start, start + BATCH_SIZE):
+            companies = [{"id": str(n), "name": f"Company {n} Ltd"}]
+            barriers.append(
+                Barrier(
+                    code=f"{CODE_PREFIX}{n:06d}",
+                    title=f"{WORDS[n % len(WORDS)]} barrier {n}",
+                    summary=f"Summary of {WORDS[(n * 3) % len(WORDS)]} issue {n}",
+                    companies=companies,
+                    company_names=flatten_company_names(companies),
+                )
+            )
+        Barrier.objects.bulk_create(barriers)
+    Barrier.objects.update(search_vector=BARRIER_SEARCH_VECTOR)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE barriers_barrier")
+
+
+def timed(queryset, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = set(queryset.values_list("id", flat=True))
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+@pytest.mark.parametrize("value", ["company 4242", "BENCH-01234", "dairy barrier 49"])
+def test_text_search_benchmark(seeded_barriers, record_property, value):
+    """
+    Opt in with -m benchmark, the timings are recorded as junit xml properties.
+    """
+    legacy, legacy_seconds = timed(legacy_text_search(Barrier.objects.all(), value))
+    indexed, indexed_seconds = timed(lexical_search(Barrier.objects.all(), value))
+
+    record_property("matches", len(indexed))
+    record_property("legacy_ms", round(legacy_seconds * 1000, 1))
+    record_property("indexed_ms", round(indexed_seconds * 1000, 1))
+    assert indexed == legacy
+    assert "_trgm" in lexical_search(Barrier.objects.all(), value).explain()
@@ -0,0 +1,138 @@
+import io
+import json
+
+import boto3
+import pyarrow.parquet as pq
+import pytest
+from django.contrib.auth import get_user_model
+from moto import mock_s3
+from rest_framework.reverse import reverse
+
+from api.core.test_utils import APITestMixin
+from api.core.utils import S3MultipartUpload
+from api.dataset.export import EXPORT_LATEST_KEY, export_datasets
+from api.feedback.models import Feedback
+from api.metadata.constants import (
+    FEEDBACK_FORM_ATTEMPTED_ACTION_ANSWERS,
+    FEEDBACK_FORM_SATISFACTION_ANSWERS,
+    USER_ACTIVITY_EVENT_TYPES,
+)
+from api.user.models import UserActvitiyLog
+from tests.barriers.factories import BarrierFactory
+
+UserModel = get_user_model()
+
+BUCKET = "dataset-exports-test"
+REGION = "eu-west-2"
+
+
+@pytest.fixture
+def s3(settings):
+    settings.S3_BUCKETS = {
+        "default": {
+            "bucket_name": BUCKET,
+            "aws_access_key_id": "testing",
+            "aws_secret_access_key": "testing",
+            "aws_region": REGION,
+        }
+    }
+    with mock_s3():
+        client = boto3.client(
+            "s3",
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing",
+            region_name=REGION,
+        )
+        client.create_bucket(
+            Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": REGION}
+        )
+        yield client
+
+
+def read_object(client, key):
+    return client.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+
+
+class TestS3MultipartUpload:
+    def test_file_is_uploaded_in_parts(self, s3):
+        content = bytes(range(256)) * (11 * 1024 * 1024 // 256)
+
+        with S3MultipartUpload(s3, BUCKET, "parts.bin") as upload:
+            for start in range(0, len(content), 1024 * 1024):
+                upload.write(content[start : start + 1024 * 1024])
+            assert upload.tell() == len(content)
+
+        assert len(upload.parts) == 3
+        assert read_object(s3, "parts.bin") == content
+
+    def test_upload_is_aborted_on_error(self, s3):
+        with pytest.raises(ValueError):
+            with S3MultipartUpload(s3, BUCKET, "aborted.bin") as upload:
+                upload.write(b"partial")
+                raise ValueError()
+
+        assert "Contents" not in s3.list_objects_v2(Bucket=BUCKET)
+        assert not s3.list_multipart_uploads(Bucket=BUCKET).get("Uploads")
+
+
+class TestDatasetExport(APITestMixin):
+    def test_datasets_are_exported_as_parquet(self, s3):
+        barriers = BarrierFactory.create_batch(2)
+        barriers[0].title = "Retitled"
+        barriers[0].save()
+        Feedback.objects.create(
+            satisfaction=FEEDBACK_FORM_SATISFACTION_ANSWERS.VERY_SATISFIED,
+            attempted_actions=[FEEDBACK_FORM_ATTEMPTED_ACTION_ANSWERS.PROGRESS_UPDATE],
+            feedback_text="Export me",
+        )
+        UserActvitiyLog.objects.create(
+            user=self.user,
+            event_type=USER_ACTIVITY_EVENT_TYPES.BARRIER_CSV_DOWNLOAD,
+            event_description="User has exported a CSV of barriers",
+        )
+
+        manifest = export_datasets()
+
+        assert json.loads(read_object(s3, EXPORT_LATEST_KEY)) == manifest
+        files = {file["dataset"]: file for file in manifest["files"]}
+        assert {
+            name: file["rows"] for name, file in files.items() if name != "history"
+        } == {
+            "barriers": 2,
+            "feedback": 1,
+            "user_activity": UserActvitiyLog.objects.count(),
+            "users": UserModel.objects.count(),
+        }
+
+        tables = {}
+        for name, file in files.items():
+            content = read_object(s3, file["key"])
+            assert len(content) == file["bytes"]
+            tables[name] = pq.read_table(io.BytesIO(content))
+            assert tables[name].num_rows == file["rows"]
+
+        assert set(tables["barriers"].column("id").to_pylist()) == {
+            str(barrier.id) for barrier in barriers
+        }
+        assert files["history"]["rows"] > 0
+        assert {
+            "field": "title",
+            "barrier_id": str(barriers[0].id),
+            "new_value": "Retitled",
+        }.items() <= tables["history"].to_pylist()[-1].items()
+        assert json.loads(
+            tables["feedback"].column("attempted_actions").to_pylist()[0]
+        ) == [FEEDBACK_FORM_ATTEMPTED_ACTION_ANSWERS.PROGRESS_UPDATE]
+
+    def test_export_view_signs_the_latest_manifest(self, s3):
+        url = reverse("dataset:export")
+        assert self.api_client.get(url).status_code == 404
+
+        manifest = export_datasets()
+
+        response = self.api_client.get(url)
+        assert response.status_code == 200
+        assert response.data["created_on"] == manifest["created_on"]
+        for file in response.data["files"]:
+            assert file["key"] in file["url"]
+            assert "X-Amz-Signature" in file["url"]
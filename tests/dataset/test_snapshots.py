@@ -0,0 +1,97 @@
+import datetime
+
+import freezegun
+import mock
+import pytest
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from api.core.test_utils import APITestMixin
+from api.dataset.models import BarrierSnapshot
+from api.dataset.service import refresh_barrier_snapshots
+from tests.barriers.factories import BarrierFactory, ReportFactory
+from tests.interactions.factories import InteractionFactory
+
+freezegun.configure(extend_ignore_list=["transformers"])
+
+START = timezone.now() + datetime.timedelta(days=1)
+
+
+def at(minutes):
+    return freezegun.freeze_time(START + datetime.timedelta(minutes=minutes))
+
+
+@pytest.fixture(autouse=True)
+def run_on_commit():
+    # Tests run inside a transaction that never commits
+    with mock.patch(
+        "api.history.signals.handlers.transaction.on_commit",
+        side_effect=lambda callback: callback(),
+    ):
+        yield
+
+
+class TestBarrierSnapshots(APITestMixin):
+    def get_dataset(self, settings, snapshots):
+        settings.DATASET_BARRIER_SNAPSHOTS = snapshots
+        response = self.api_client.get(reverse("dataset:barrier-list"))
+        assert response.status_code == 200
+        return response.json()["results"]
+
+    def test_dataset_is_served_from_snapshots(self, settings):
+        with at(0):
+            BarrierFactory.create_batch(3)
+            ReportFactory()
+            assert refresh_barrier_snapshots() == 3
+
+        assert BarrierSnapshot.objects.count() == 3
+        assert self.get_dataset(settings, snapshots=True) == self.get_dataset(
+            settings, snapshots=False
+        )
+
+    def test_only_changed_barriers_are_refreshed(self):
+        with at(0):
+            changed, unchanged = BarrierFactory.create_batch(2)
+            refresh_barrier_snapshots()
+        with at(10):
+            # Records saved within the overlap of the last refresh are picked again
+            refresh_barrier_snapshots()
+        with at(20):
+            assert refresh_barrier_snapshots() == 0
+
+            changed.title = "Changed"
+            changed.save()
+        with at(30):
+            assert refresh_barrier_snapshots() == 1
+
+        assert changed.dataset_snapshot.data["title"] == "Changed"
+        assert unchanged.dataset_snapshot.refreshed_on == START + datetime.timedelta(
+            minutes=10
+        )
+
+    def test_related_changes_refresh_the_barrier(self):
+        with at(0):
+            barrier = BarrierFactory()
+            refresh_barrier_snapshots()
+        with at(10):
+            refresh_barrier_snapshots()
+        with at(20):
+            InteractionFactory(barrier=barrier, text="New note")
+        with at(30):
+            assert refresh_barrier_snapshots() == 1
+
+        barrier.dataset_snapshot.refresh_from_db()
+        assert barrier.dataset_snapshot.refreshed_on == START + datetime.timedelta(
+            minutes=30
+        )
+
+    def test_barriers_leaving_the_dataset_are_dropped(self):
+        with at(0):
+            barrier = BarrierFactory()
+            refresh_barrier_snapshots()
+
+            barrier.draft = True
+            barrier.save()
+            refresh_barrier_snapshots()
+
+        assert not BarrierSnapshot.objects.exists()
@@ -1,4 +1,5 @@
-from datetime import datetime
+import json
+from datetime import datetime, timedelta
 from logging import getLogger
 
 import freezegun
@@ -16,6 +17,7 @@ from api.barriers.models import (
 )
 from api.collaboration.models import TeamMember
 from api.core.test_utils import APITestMixin, create_test_user
+from api.dataset.service import HISTORY_STREAM_OVERLAP
 from api.feedback.models import Feedback
 from api.interactions.models import Interaction, PublicBarrierNote
 from api.metadata.constants import (
@@ -51,6 +53,91 @@ class TestBarrierHistoryStreamDataset(APITestMixin):
         assert "new_value" in response.data["results"][0]
         assert "old_value" in response.data["results"][0]
 
+    def stream(self, **params):
+        url = reverse("dataset:barrier-history-stream")
+        response = self.api_client.get(url, {"stream": "true", **params})
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_stream_barrier_history(self):
+        first, second = BarrierFactory.create_batch(2)
+        for barrier in (first, second, first):
+            barrier.title = f"{barrier.title} updated"
+            barrier.save()
+
+        *changes, end = self.stream()
+        titles = [c for c in changes if c["field"] == "title"]
+
+        assert [c["barrier_id"] for c in titles] == [
+            str(first.id),
+            str(second.id),
+            str(first.id),
+        ]
+        assert titles[2]["old_value"] == titles[0]["new_value"]
+        assert end["watermark"] == changes[-1]["watermark"]
+
+    def test_stream_resumes_from_watermark(self):
+        barrier = BarrierFactory()
+        barrier.title = "First"
+        barrier.save()
+        *_, end = self.stream()
+
+        barrier.title = "Second"
+        barrier.save()
+        *changes, resumed_end = self.stream(watermark=end["watermark"])
+
+        assert [(c["old_value"], c["new_value"]) for c in changes] == [
+            ("First", "Second")
+        ]
+        assert self.stream(watermark=resumed_end["watermark"]) == [resumed_end]
+
+    def backdate_latest_record(self, barrier, delta):
+        """
+        A record saved before the watermark's record but committed after it
+        was streamed.
+        """
+        records = barrier.history.order_by("history_date", "history_id")
+        *_, watermark_record, late = records
+        records.filter(history_id=late.history_id).update(
+            history_date=watermark_record.history_date - delta
+        )
+
+    def test_stream_picks_up_records_committed_behind_the_watermark(self):
+        barrier = BarrierFactory()
+        barrier.title = "First"
+        barrier.save()
+        *_, end = self.stream()
+
+        barrier.title = "Late"
+        barrier.save()
+        self.backdate_latest_record(barrier, timedelta(microseconds=1))
+        *changes, resumed_end = self.stream(watermark=end["watermark"])
+
+        assert [c["new_value"] for c in changes if c["field"] == "title"] == ["Late"]
+        assert self.stream(watermark=resumed_end["watermark"]) == [resumed_end]
+
+    def test_stream_misses_records_committed_after_the_overlap(self):
+        barrier = BarrierFactory()
+        barrier.title = "First"
+        barrier.save()
+        *_, end = self.stream()
+
+        barrier.title = "Late"
+        barrier.save()
+        self.backdate_latest_record(
+            barrier, HISTORY_STREAM_OVERLAP + timedelta(minutes=1)
+        )
+
+        assert self.stream(watermark=end["watermark"]) == [end]
+
+    def test_stream_rejects_invalid_watermark(self):
+        url = reverse("dataset:barrier-history-stream")
+        response = self.api_client.get(url, {"stream": "true", "watermark": "nope"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
 
 class TestBarriersDataset(APITestMixin):
     def test_no_reports(self):
@@ -5,11 +5,14 @@ TODO: Once approved, remove the fields from legacy history
 """
 from uuid import UUID
 
+import mock
 import pytest
+from django.core.cache import cache
 
 from api.barriers.models import Barrier, BarrierTopPrioritySummary
 from api.collaboration.models import TeamMember
 from api.history.v2.enrichment import (
+    enrich_committee_raised_in,
     enrich_country,
     enrich_main_sector,
     enrich_priority_level,
@@ -19,6 +22,8 @@ from api.history.v2.enrichment import (
     enrich_trade_category,
 )
 from api.metadata.constants import TOP_PRIORITY_BARRIER_STATUS
+from api.wto.models import WTOProfile
+from tests.barriers.factories import WTOCommitteeFactory, WTOProfileFactory
 
 pytestmark = [pytest.mark.django_db]
 
@@ -340,3 +345,42 @@ def test_team_members_enrichment(barrier, user):
             "user": None,
         }
     ]
+
+
+def test_country_enrichment_makes_one_cache_round_trip(barrier):
+    for country in (
+        "82756b9a-5d95-e211-a939-e4115bead28a",
+        "985f66a0-5d95-e211-a939-e4115bead28a",
+    ) * 10:
+        barrier.country = country
+        barrier.save()
+
+    v2_history = Barrier.get_history(barrier_id=barrier.id, enrich=False)
+
+    with mock.patch.object(cache, "get") as get, mock.patch.object(
+        cache, "get_many", wraps=cache.get_many
+    ) as get_many:
+        enrich_country(v2_history)
+
+    assert get_many.call_count == 1
+    assert get.call_count == 0
+    assert [item["new_value"] for item in v2_history[-2:]] == ["France", "Angola"]
+
+
+def test_committee_enrichment_makes_one_query(barrier, django_assert_num_queries):
+    profile = WTOProfileFactory(barrier=barrier)
+    committees = WTOCommitteeFactory.create_batch(10)
+    for committee in committees:
+        profile.committee_raised_in = committee
+        profile.save()
+
+    v2_history = WTOProfile.get_history(barrier_id=barrier.id)
+
+    with django_assert_num_queries(1):
+        enrich_committee_raised_in(v2_history)
+
+    assert [
+        item["new_value"]
+        for item in v2_history
+        if item["field"] == "committee_raised_in"
+    ] == [{"id": str(committee.id), "name": committee.name} for committee in committees]
@@ -0,0 +1,83 @@
+import pytest
+
+from api.barriers.models import Barrier, EstimatedResolutionDateRequest
+from api.history.v2.service import get_history_changes_sql, get_model_history
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def edited_barrier(barrier, user):
+    for title in ("First", "Second"):
+        barrier.title = title
+        barrier.save()
+    barrier.summary = "New summary"
+    barrier.save()
+    barrier.archive(user=user, reason="DUPLICATE", explanation="Already exists")
+    return barrier
+
+
+def both_engines(settings, get_history):
+    settings.HISTORY_DIFF_ENGINE = "python"
+    python = get_history()
+    settings.HISTORY_DIFF_ENGINE = "sql"
+    return python, get_history()
+
+
+def test_barrier_history_matches(settings, edited_barrier):
+    python, sql = both_engines(
+        settings, lambda: Barrier.get_history(barrier_id=edited_barrier.id)
+    )
+
+    assert python
+    assert sql == python
+
+
+def test_first_items_match(settings, edited_barrier):
+    python, sql = both_engines(
+        settings,
+        lambda: Barrier.get_history(
+            barrier_id=edited_barrier.id, fields=["title"], track_first_item=True
+        ),
+    )
+
+    assert sql == python
+
+
+def test_since_matches(settings, edited_barrier):
+    since = Barrier.get_history(barrier_id=edited_barrier.id)[0]["date"]
+
+    python, sql = both_engines(
+        settings,
+        lambda: Barrier.get_history(barrier_id=edited_barrier.id, since=since),
+    )
+
+    assert sql == python
+
+
+def test_primary_key_resets_matches(settings, barrier, user):
+    for date in ("2030-01-01", "2031-01-01"):
+        request = EstimatedResolutionDateRequest.objects.create(
+            barrier=barrier,
+            created_by=user,
+            estimated_resolution_date=date,
+            status="NEEDS_REVIEW",
+        )
+        request.reason = "Delayed"
+        request.save()
+
+    python, sql = both_engines(
+        settings,
+        lambda: EstimatedResolutionDateRequest.get_history(barrier_id=barrier.id),
+    )
+
+    assert sql == python
+
+
+def test_sql_engine_only_fetches_changed_records(edited_barrier):
+    qs = Barrier.history.filter(id=edited_barrier.id)
+
+    history = get_history_changes_sql(qs, model="barrier", fields=["title"])
+
+    assert [item["new_value"] for item in history] == ["First", "Second"]
+    assert history == get_model_history(qs, model="barrier", fields=["title"])
@@ -0,0 +1,168 @@
+import datetime
+import time
+
+import pytest
+
+from api.barriers.models import Barrier
+from api.history.v2.service import (
+    FieldMapping,
+    _compile_history_fields,
+    compile_history_fields,
+    flatten_fields,
+    get_history_changes,
+    get_model_history,
+)
+
+ROW_COUNT = 5_000
+FIELDS = [
+    "title",
+    "status",
+    FieldMapping("priority__code", "priority"),
+    ["status_date", "status_summary"],
+    "tags_cache",
+]
+
+
+def history_rows(count):
+    start = datetime.datetime(2020, 1, 1)
+    return [
+        {
+            "history_date": start + datetime.timedelta(minutes=n),
+            "history_user__id": n % 3 or None,
+            "history_user__username": f"user.{n % 3}@example.com",
+            "title": f"Title {n // 2}",
+            "status": n % 5,
+            "priority__code": "HIGH" if n % 7 else "LOW",
+            "status_date": start + datetime.timedelta(days=n // 10),
+            "status_summary": "Summary",
+            "tags_cache": [n // 100],
+        }
+        for n in range(count)
+    ]
+
+
+def test_compile_history_fields():
+    assert compile_history_fields(FIELDS) == (
+        ("title", ("title",), ("title",), False),
+        ("status", ("status",), ("status",), False),
+        ("priority", ("priority__code",), ("priority",), False),
+        (
+            "status_date",
+            ("status_date", "status_summary"),
+            ("status_date", "status_summary"),
+            True,
+        ),
+        ("tags", ("tags_cache",), ("tags_cache",), False),
+    )
+
+
+def test_history_field_plan_is_compiled_once():
+    _compile_history_fields.cache_clear()
+
+    for _ in range(3):
+        get_history_changes(history_rows(10), model="barrier", fields=FIELDS)
+
+    assert _compile_history_fields.cache_info().misses == 1
+
+
+def test_history_field_plan_diffs_long_history():
+    rows = history_rows(ROW_COUNT)
+
+    history = get_history_changes(rows, model="barrier", fields=FIELDS)
+
+    changed = {field: 0 for field in ("title", "status", "priority", "status_date")}
+    for previous, item in zip(rows, rows[1:]):
+        changed["title"] += item["title"] != previous["title"]
+        changed["status"] += item["status"] != previous["status"]
+        changed["priority"] += item["priority__code"] != previous["priority__code"]
+        changed["status_date"] += item["status_date"] != previous["status_date"]
+    assert {
+        field: sum(1 for item in history if item["field"] == field) for field in changed
+    } == changed
+    assert sum(1 for item in history if item["field"] == "tags") == ROW_COUNT // 100 - 1
+    status_dates = [item for item in history if item["field"] == "status_date"]
+    assert status_dates[0]["new_value"] == {
+        "status_date": rows[10]["status_date"],
+        "status_summary": "Summary",
+    }
+    assert {item["user"]["name"] for item in history if item["user"]} == {
+        "User 1",
+        "User 2",
+    }
+
+
+def timed(get_history, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        history = get_history()
+        timings.append(time.perf_counter() - start)
+    return history, min(timings)
+
+
+@pytest.fixture
+def long_history_barrier(barrier, user):
+    """
+    The barrier with ROW_COUNT more historical records appended to its history.
+    """
+    HistoricalBarrier = Barrier.history.model
+    last = Barrier.history.filter(id=barrier.id).latest("history_date")
+    fields = {
+        field.attname: getattr(last, field.attname)
+        for field in HistoricalBarrier._meta.concrete_fields
+        if not field.primary_key
+    }
+    records = []
+    for n, row in enumerate(history_rows(ROW_COUNT), start=1):
+        changes = {
+            "history_type": "~",
+            "history_date": last.history_date + datetime.timedelta(minutes=n),
+            "history_user_id": user.id if row["history_user__id"] else None,
+            "title": row["title"],
+            "status": row["status"],
+            "status_date": row["status_date"],
+            "status_summary": row["status_summary"],
+            "tags_cache": row["tags_cache"],
+        }
+        records.append(HistoricalBarrier(**{**fields, **changes}))
+    HistoricalBarrier.objects.bulk_create(records)
+    return barrier
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_history_engines_benchmark(settings, long_history_barrier, record_property):
+    """
+    Times the compiled plan's diff loop over already fetched rows, and the
+    python and sql engines end to end. Opt in with -m benchmark, the timings
+    are recorded as junit xml properties.
+    """
+    qs = Barrier.history.filter(id=long_history_barrier.id)
+    rows = list(
+        qs.order_by("history_date").values(
+            *flatten_fields(FIELDS),
+            "history_date",
+            "history_user__id",
+            "history_user__username",
+        )
+    )
+
+    plan, plan_seconds = timed(
+        lambda: get_history_changes(rows, model="barrier", fields=FIELDS)
+    )
+    settings.HISTORY_DIFF_ENGINE = "python"
+    python, python_seconds = timed(
+        lambda: get_model_history(qs, model="barrier", fields=FIELDS)
+    )
+    settings.HISTORY_DIFF_ENGINE = "sql"
+    sql, sql_seconds = timed(
+        lambda: get_model_history(qs, model="barrier", fields=FIELDS)
+    )
+
+    record_property("rows", len(rows))
+    record_property("changes", len(plan))
+    record_property("plan_ms", round(plan_seconds * 1000, 1))
+    record_property("python_ms", round(python_seconds * 1000, 1))
+    record_property("sql_ms", round(sql_seconds * 1000, 1))
+    assert len(rows) > ROW_COUNT
+    assert sql == python == plan
@@ -0,0 +1,68 @@
+import mock
+import pytest
+from django.core.cache import cache
+
+from api.barriers.models import Barrier
+from api.history.v2 import timeline
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def timeline_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    # Tests run inside a transaction that never commits
+    with mock.patch(
+        "api.history.signals.handlers.transaction.on_commit",
+        side_effect=lambda callback: callback(),
+    ):
+        yield
+    cache.clear()
+
+
+def retitle(barrier, *titles):
+    for title in titles:
+        barrier.title = title
+        barrier.save()
+
+
+def test_since_only_returns_later_changes(barrier):
+    retitle(barrier, "First", "Second", "Third")
+    history = Barrier.get_history(barrier_id=barrier.id, fields=["title"])
+    since = history[0]["date"]
+
+    assert (
+        Barrier.get_history(barrier_id=barrier.id, fields=["title"], since=since)
+        == history[1:]
+    )
+
+
+def test_unchanged_history_is_served_from_cache(barrier, django_assert_num_queries):
+    retitle(barrier, "First")
+    history = timeline.get_full_history(barrier)
+
+    with django_assert_num_queries(0):
+        assert timeline.get_full_history(barrier) == history
+
+
+def test_new_records_are_appended(barrier):
+    retitle(barrier, "First")
+    timeline.get_full_history(barrier)
+
+    retitle(barrier, "Second")
+    with mock.patch.object(
+        Barrier, "get_history", wraps=Barrier.get_history
+    ) as get_history:
+        history = timeline.get_full_history(barrier)
+
+    assert get_history.call_args.kwargs["since"] is not None
+    assert [item["new_value"] for item in history if item["field"] == "title"] == [
+        "First",
+        "Second",
+    ]
+
+    cache.clear()
+    assert timeline.get_full_history(barrier) == history
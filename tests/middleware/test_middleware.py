@@ -1,9 +1,12 @@
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
+from django.http import StreamingHttpResponse
 from django.test import TestCase
+from hawkrest import middleware as hawkrest_middleware
 from sentry_sdk import set_user
 from sentry_sdk.hub import Hub
 
+from api.core.middleware.hawk import HawkResponseMiddleware
 from api.core.middleware.sentry import SentryUserContextMiddleware
 
 
@@ -36,3 +39,22 @@ class TestUserSentryContextMiddleware(TestCase):
         assert Hub.current.scope._user is None
         self.middleware(self.request)
         assert Hub.current.scope._user is None
+
+
+@patch.object(hawkrest_middleware.HawkResponseMiddleware, "process_response")
+class TestHawkResponseMiddleware(TestCase):
+    def process_response(self, view_name):
+        request = Mock()
+        request.resolver_match.view_name = view_name
+        response = StreamingHttpResponse(iter([b"line\n"]))
+        return HawkResponseMiddleware(Mock()).process_response(request, response)
+
+    def test_history_stream_is_not_signed(self, mock_process_response):
+        self.process_response("dataset:barrier-history-stream")
+
+        mock_process_response.assert_not_called()
+
+    def test_other_streamed_responses_are_signed(self, mock_process_response):
+        self.process_response("barriers-export")
+
+        mock_process_response.assert_called_once()
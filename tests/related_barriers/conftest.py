@@ -1,6 +1,13 @@
+from typing import List, Tuple
+
 import pytest
+from django.db.models import signals
+from factory.django import mute_signals
 
+from api.barriers.models import Barrier
+from api.related_barriers.constants import BarrierEntry
 from api.related_barriers.manager import RelatedBarrierManager
+from tests.barriers.factories import BarrierFactory
 
 
 @pytest.fixture
@@ -17,6 +24,85 @@ def transformer(manager):
     return manager.model
 
 
+@pytest.fixture
+def TEST_CASE_1() -> Tuple[List[BarrierEntry], List[Barrier]]:
+    with mute_signals(signals.pre_save):
+        b1 = BarrierFactory(title="The weather is lovely today", summary="")
+        b2 = BarrierFactory(title="It's so sunny outside!", summary="")
+        b3 = BarrierFactory(title="He drove to the stadium.", summary="")
+
+    data = (
+        Barrier.objects.filter(archived=False)
+        .exclude(draft=True)
+        .values("id", "title", "summary")
+    )
+
+    return [
+        BarrierEntry(id=str(d["id"]), barrier_corpus=f"{d['title']} . {d['summary']}")
+        for d in data
+    ], [b1, b2, b3]
+
+
+@pytest.fixture
+def TEST_CASE_2() -> Tuple[List[BarrierEntry], List[Barrier]]:
+    corpus = [
+        "A man is eating food.",
+        "A man is eating a piece of bread.",
+        "The girl is carrying a baby.",
+        "A man is riding a horse.",
+        "A woman is playing violin.",
+        "Two men pushed carts through the woods.",
+        "A man is riding a white horse on an enclosed ground.",
+        "A monkey is playing drums.",
+        "A cheetah is running behind its prey.",
+    ]
+    with mute_signals(signals.pre_save):
+        barriers = [BarrierFactory(title=title) for title in corpus]
+
+    data = (
+        Barrier.objects.filter(archived=False).exclude(draft=True).values("id", "title")
+    )
+
+    return [
+        BarrierEntry(id=str(d["id"]), barrier_corpus=f"{d['title']}") for d in data
+    ], barriers
+
+
+@pytest.fixture
+def TEST_CASE_3() -> Tuple[List[BarrierEntry], List[Barrier]]:
+    barriers = [
+        BarrierFactory(
+            title="Translating Trademark for Whisky Products in Quebec",
+            summary=(
+                "Bill 96, published by the Quebec Government years ago, changed "
+                "general regulation regarding French language translations. They "
+                "ask business to translate everything into French, including trademarks "
+                "which causes particular difficulties. SWA are waiting for a regulation "
+                "on the implementation of this as there is a lack of clarity where in "
+                "the draft regulation they stated that trademarks are exempted but if it "
+                "includes a general term or description of the product, this should be translated.",
+            ),
+        ),
+        BarrierFactory(
+            title="Offshore wind: local content; skills & workforce engagement",
+            summary=(
+                "Taiwan requested local content for offshore wind project but Taiwanese "
+                "firms currently lack capabilities and experience, which combined with "
+                "weak domestic competition, has in many cases resulted in inflated costs "
+                "and unnecessary project delays. In 2021, Taiwan Energy Administration "
+                "allowed some additional flexibility as developers only needed to source "
+                "60% of items locally, compared to 100% previously. This removes the "
+                "absolute market access barrier but still not enough.",
+            ),
+        ),
+    ]
+
+    return [
+        BarrierEntry(id=str(b.id), barrier_corpus=f"{b.title} . {b.summary}")
+        for b in barriers
+    ], barriers
+
+
 @pytest.fixture
 def stop_words():
     return {
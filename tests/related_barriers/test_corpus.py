@@ -0,0 +1,69 @@
+import datetime
+
+import pytest
+
+from api.barriers.models import Barrier
+from api.related_barriers.corpus import CorpusBuilder
+from api.related_barriers.manager import barrier_to_corpus
+from tests.barriers.factories import BarrierFactory, ReportFactory
+from tests.interactions.factories import InteractionFactory
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def barriers():
+    barriers = [
+        BarrierFactory(
+            title=f"Barrier {i}",
+            companies=[{"id": "1", "name": "Company A"}],
+            related_organisations=[{"id": "2", "name": "Organisation B"}],
+            estimated_resolution_date=datetime.date(2030, 1, 1),
+        )
+        for i in range(3)
+    ]
+    InteractionFactory(barrier=barriers[0], text="first note")
+    InteractionFactory(barrier=barriers[0], text="second note")
+    InteractionFactory(barrier=barriers[1], text="archived note", archived=True)
+    return barriers
+
+
+def test_corpus_matches_barrier_to_corpus(barriers):
+    ReportFactory()
+    BarrierFactory(archived=True)
+
+    entries = [entry for batch in CorpusBuilder().iter_batches() for entry in batch]
+
+    expected = {
+        str(barrier.id): barrier_to_corpus(Barrier.objects.get(pk=barrier.pk))
+        for barrier in barriers
+    }
+    assert {entry.id: entry.barrier_corpus for entry in entries} == expected
+    assert "first note, second note" in expected[str(barriers[0].id)]
+    assert "archived note" not in expected[str(barriers[1].id)]
+
+
+def test_batches_are_bounded_by_chunk_size(barriers):
+    batches = list(CorpusBuilder(chunk_size=2).iter_batches())
+
+    assert [len(batch) for batch in batches] == [2, 1]
+
+
+def test_custom_queryset(barriers):
+    builder = CorpusBuilder()
+
+    batches = list(
+        builder.iter_batches(Barrier.objects.filter(id=barriers[2].id, draft=False))
+    )
+
+    assert [[entry.id for entry in batch] for batch in batches] == [
+        [str(barriers[2].id)]
+    ]
+
+
+def test_query_count_does_not_grow_with_barriers(barriers, django_assert_num_queries):
+    builder = CorpusBuilder()
+
+    # A single query streams the barriers with their aggregated notes
+    with django_assert_num_queries(1):
+        list(builder.iter_batches())
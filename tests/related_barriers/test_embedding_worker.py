@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+
+import mock
+import numpy
+import pytest
+
+from api.related_barriers.embedding_worker import (
+    EmbeddingWorkerClient,
+    EmbeddingWorkerServer,
+    EmbeddingWorkerUnavailable,
+    MicroBatcher,
+)
+
+
+def fake_encode(texts):
+    return numpy.array([[len(text), 1.0] for text in texts], dtype=numpy.float32)
+
+
+@pytest.fixture
+def batcher():
+    batcher = MicroBatcher(mock.Mock(side_effect=fake_encode), max_wait=0.2).start()
+    yield batcher
+    batcher.stop()
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 characters
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        yield os.path.join(directory, "worker.sock")
+
+
+@pytest.fixture
+def server(socket_path, batcher):
+    server = EmbeddingWorkerServer(socket_path, batcher)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_concurrent_requests_share_one_encode(batcher):
+    futures = [batcher.submit(["a" * i]) for i in range(1, 4)]
+
+    results = [future.result(timeout=5) for future in futures]
+
+    batcher.encode.assert_called_once_with(["a", "aa", "aaa"])
+    assert [result.tolist() for result in results] == [
+        [[1.0, 1.0]],
+        [[2.0, 1.0]],
+        [[3.0, 1.0]],
+    ]
+
+
+def test_batches_are_capped(batcher):
+    batcher.max_batch_size = 2
+
+    futures = [batcher.submit([text]) for text in ["a", "b", "c"]]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert batcher.encode.call_count == 2
+
+
+def test_encode_errors_reach_every_caller(batcher):
+    batcher.encode.side_effect = RuntimeError("out of memory")
+
+    future = batcher.submit(["a"])
+
+    with pytest.raises(RuntimeError):
+        future.result(timeout=5)
+
+
+def test_client_round_trip(server, socket_path):
+    client = EmbeddingWorkerClient(socket_path)
+
+    numpy.testing.assert_array_equal(client.encode(["ab", "c"]), [[2, 1], [1, 1]])
+    numpy.testing.assert_array_equal(client.encode("abc"), [3, 1])
+
+
+def test_client_without_worker(socket_path):
+    with pytest.raises(EmbeddingWorkerUnavailable):
+        EmbeddingWorkerClient(socket_path).encode("abc")
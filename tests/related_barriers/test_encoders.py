@@ -0,0 +1,117 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import mock
+import numpy
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from api.related_barriers.encoders import ENCODER_BACKENDS, load_encoder
+from api.related_barriers.index import normalise
+
+pytestmark = [pytest.mark.django_db]
+
+BENCHMARK_SCRIPT = """
+import json, resource, sys, time
+
+from api.related_barriers.encoders import load_encoder
+
+sentences = json.loads(sys.stdin.read())
+start = time.perf_counter()
+encoder = load_encoder(sys.argv[1])
+load_seconds = time.perf_counter() - start
+
+encoder.encode(sentences[:1])
+start = time.perf_counter()
+for _ in range(5):
+    for sentence in sentences:
+        encoder.encode(sentence)
+encode_ms = (time.perf_counter() - start) * 1000 / (5 * len(sentences))
+
+print(json.dumps({
+    "load_seconds": load_seconds,
+    "encode_ms": encode_ms,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def available_backends():
+    backends = ["torch", "torch-int8"]
+    try:
+        import onnxruntime  # noqa: F401
+        import optimum  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        backends.append("onnx")
+    return backends
+
+
+@pytest.fixture(scope="module")
+def reference_encoder():
+    return load_encoder("torch")
+
+
+@pytest.fixture(scope="module", params=["torch-int8", "onnx"])
+def candidate_encoder(request):
+    if request.param not in available_backends():
+        pytest.skip(f"{request.param} encoder dependencies are not installed")
+    return load_encoder(request.param)
+
+
+def test_unknown_backend():
+    with pytest.raises(ImproperlyConfigured):
+        load_encoder("tensorflow")
+
+
+def test_onnx_backend_requires_onnxruntime():
+    with mock.patch("api.related_barriers.encoders.find_spec", return_value=None):
+        with pytest.raises(ImproperlyConfigured):
+            ENCODER_BACKENDS["onnx"]()
+
+
+@pytest.mark.parametrize("case", ["TEST_CASE_1", "TEST_CASE_2", "TEST_CASE_3"])
+def test_encoder_parity(request, case, reference_encoder, candidate_encoder):
+    training_data, _ = request.getfixturevalue(case)
+    corpus = [d.barrier_corpus for d in training_data]
+
+    reference = normalise(reference_encoder.encode(corpus))
+    candidate = normalise(candidate_encoder.encode(corpus))
+
+    # Each embedding stays close to its full precision counterpart, and the
+    # pairwise similarities that rank related barriers barely move
+    assert (numpy.sum(reference * candidate, axis=1) > 0.98).all()
+    numpy.testing.assert_allclose(
+        candidate @ candidate.T, reference @ reference.T, atol=0.05
+    )
+
+
+@pytest.mark.benchmark
+def test_encoder_benchmark(TEST_CASE_3, record_property):
+    """
+    Each backend runs in a fresh interpreter so load time and peak RSS are
+    not shared. Opt in with -m benchmark, the results are recorded as junit
+    xml properties.
+    """
+    training_data, _ = TEST_CASE_3
+    sentences = json.dumps([d.barrier_corpus for d in training_data])
+
+    results = {}
+    for backend in available_backends():
+        output = subprocess.run(
+            [sys.executable, "-c", BENCHMARK_SCRIPT, backend],
+            input=sentences,
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parents[2],
+        )
+        results[backend] = json.loads(output.stdout.splitlines()[-1])
+
+    for backend, result in results.items():
+        record_property(backend, result)
+
+    assert all(result["encode_ms"] > 0 for result in results.values())
@@ -0,0 +1,153 @@
+import numpy
+import pytest
+
+from api.related_barriers import index as index_module
+from api.related_barriers.index import VectorIndex, exact_search, normalise, top_k
+
+
+@pytest.fixture
+def vectors():
+    rng = numpy.random.default_rng(42)
+    return rng.normal(size=(300, 16)).astype(numpy.float32)
+
+
+@pytest.fixture
+def ids(vectors):
+    return [f"barrier-{i}" for i in range(len(vectors))]
+
+
+def brute_force(vectors, query, quantity):
+    scores = normalise(vectors) @ normalise(query)
+    order = numpy.argsort(-scores)[:quantity]
+    return order, scores[order]
+
+
+def test_top_k_returns_highest_first():
+    scores = numpy.array([0.1, 0.9, 0.5, 0.7], dtype=numpy.float32)
+
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0]
+
+
+def test_exact_search_matches_full_similarity_matrix(vectors):
+    normalised = normalise(vectors)
+    positions, scores = exact_search(normalised, vectors[5], quantity=10)
+
+    full_matrix = normalised @ normalised.T
+
+    assert positions.tolist() == numpy.argsort(-full_matrix[5])[:10].tolist()
+    numpy.testing.assert_allclose(scores, full_matrix[5][positions], rtol=1e-5)
+
+
+def test_exact_search_threshold(vectors):
+    positions, scores = exact_search(
+        normalise(vectors), vectors[5], quantity=300, similarity_threshold=0.3
+    )
+
+    assert len(positions) < len(vectors)
+    assert (scores > 0.3).all()
+
+
+def test_search_is_exact_below_training_size(ids, vectors):
+    index = VectorIndex.build(ids, vectors)
+
+    result_ids, scores = index.search(vectors[0], quantity=5)
+    expected_rows, expected_scores = brute_force(vectors, vectors[0], 5)
+
+    assert index.n_lists == 1
+    assert result_ids.tolist() == [ids[row] for row in expected_rows]
+    numpy.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+
+def test_search_threshold_and_exclude(ids, vectors):
+    index = VectorIndex.build(ids, vectors)
+
+    result_ids, scores = index.search(
+        vectors[0], quantity=300, similarity_threshold=0.2, exclude=ids[0]
+    )
+
+    assert ids[0] not in result_ids
+    assert all(score > 0.2 for score in scores)
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_add_and_remove(ids, vectors):
+    index = VectorIndex.build(ids[:-1], vectors[:-1])
+
+    index.add([ids[-1]], vectors[-1])
+    assert ids[-1] in index
+    assert index.search(vectors[-1], quantity=1)[0].tolist() == [ids[-1]]
+
+    index.remove([ids[-1]])
+    assert ids[-1] not in index
+    assert ids[-1] not in index.search(vectors[-1], quantity=300)[0]
+    assert len(index) == len(ids) - 1
+
+
+def test_add_replaces_existing_vector(ids, vectors):
+    index = VectorIndex.build(ids, vectors)
+
+    index.add([ids[0]], vectors[1])
+
+    assert len(index) == len(ids)
+    numpy.testing.assert_allclose(
+        index.get_vector(ids[0]), normalise(vectors[1]), rtol=1e-5
+    )
+
+
+def test_clustered_search_recall(monkeypatch, ids, vectors):
+    monkeypatch.setattr(index_module, "VECTOR_INDEX_MIN_TRAINING_SIZE", 100)
+    index = VectorIndex.build(ids, vectors, n_probe=8)
+
+    assert index.n_lists == int(numpy.sqrt(len(ids)))
+
+    hits = 0
+    for query in vectors[:20]:
+        result_ids, _ = index.search(query, quantity=10)
+        expected_rows, _ = brute_force(vectors, query, 10)
+        hits += len(set(result_ids) & {ids[row] for row in expected_rows})
+
+    assert hits / 200 > 0.8
+
+
+def test_serialisation_round_trip(monkeypatch, ids, vectors):
+    monkeypatch.setattr(index_module, "VECTOR_INDEX_MIN_TRAINING_SIZE", 100)
+    index = VectorIndex.build(ids, vectors)
+    index.remove([ids[3]])
+
+    restored = VectorIndex.from_bytes(index.to_bytes())
+
+    assert len(restored) == len(index)
+    assert ids[3] not in restored
+    assert (
+        restored.search(vectors[7], quantity=5)[0].tolist()
+        == index.search(vectors[7], quantity=5)[0].tolist()
+    )
+
+
+def test_clustered_threshold_search_is_exact(monkeypatch, ids, vectors):
+    monkeypatch.setattr(index_module, "VECTOR_INDEX_MIN_TRAINING_SIZE", 100)
+    index = VectorIndex.build(ids, vectors, n_probe=1)
+    index.add(["barrier-new"], vectors[0] + vectors[1])
+
+    all_vectors = numpy.vstack([vectors, vectors[0] + vectors[1]])
+    all_ids = ids + ["barrier-new"]
+    for query in vectors[:20]:
+        result_ids, scores = index.search(
+            query, quantity=len(all_ids), similarity_threshold=0.2
+        )
+        expected_rows, expected_scores = brute_force(all_vectors, query, len(all_ids))
+        expected = expected_scores > 0.2
+
+        assert set(result_ids) == {all_ids[row] for row in expected_rows[expected]}
+        numpy.testing.assert_allclose(scores, expected_scores[expected], rtol=1e-5)
+
+
+def test_clustered_search_beyond_probed_lists_is_exact(monkeypatch, ids, vectors):
+    monkeypatch.setattr(index_module, "VECTOR_INDEX_MIN_TRAINING_SIZE", 100)
+    index = VectorIndex.build(ids, vectors, n_probe=1)
+
+    result_ids, _ = index.search(vectors[0], quantity=100)
+    expected_rows, _ = brute_force(vectors, vectors[0], 100)
+
+    assert set(result_ids) == {ids[row] for row in expected_rows}
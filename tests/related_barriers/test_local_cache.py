@@ -0,0 +1,96 @@
+import mock
+import numpy
+import pytest
+
+from api.related_barriers.index import VectorIndex
+from api.related_barriers.local_cache import LocalEmbeddingCache
+from api.related_barriers.store import EmbeddingStore
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def store(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    embedding_store = EmbeddingStore(prefix="TEST_LOCAL_EMBEDDINGS")
+    embedding_store.replace(["a", "b"], numpy.array([[1.0, 0.0], [0.0, 1.0]]))
+    yield embedding_store
+    embedding_store.clear()
+
+
+def test_load_materialises_memory_mapped_file(store, tmp_path):
+    local_cache = LocalEmbeddingCache(directory=tmp_path)
+
+    ids, vectors = local_cache.load(store)
+
+    assert ids.tolist() == ["a", "b"]
+    assert isinstance(vectors, numpy.memmap)
+    numpy.testing.assert_array_equal(vectors, [[1.0, 0.0], [0.0, 1.0]])
+    assert len(list(tmp_path.glob("*.npy"))) == 2
+
+
+def test_workers_share_the_materialised_file(store, tmp_path):
+    LocalEmbeddingCache(directory=tmp_path).load(store)
+
+    other_worker = LocalEmbeddingCache(directory=tmp_path)
+    with mock.patch.object(store, "load") as mock_load:
+        ids, _ = other_worker.load(store)
+
+    mock_load.assert_not_called()
+    assert ids.tolist() == ["a", "b"]
+
+
+def test_same_version_is_not_refetched(store, tmp_path):
+    local_cache = LocalEmbeddingCache(directory=tmp_path)
+    first = local_cache.load(store)
+
+    with mock.patch("api.related_barriers.local_cache.numpy.load") as mock_load:
+        second = local_cache.load(store)
+
+    mock_load.assert_not_called()
+    assert first is second
+
+
+def test_new_version_is_refetched_and_old_files_removed(store, tmp_path):
+    local_cache = LocalEmbeddingCache(directory=tmp_path)
+    local_cache.load(store)
+
+    store.upsert(["c"], numpy.array([1.0, 1.0]))
+    ids, vectors = local_cache.load(store)
+
+    assert ids.tolist() == ["a", "b", "c"]
+    assert len(vectors) == 3
+    assert len(list(tmp_path.glob("*.npy"))) == 2
+
+
+def test_workers_share_the_published_index_vectors(store, tmp_path):
+    index = VectorIndex.build(*store.load())
+    published = {"version": store.version, "key": "one", "index": index.to_bytes()}
+
+    first = LocalEmbeddingCache(directory=tmp_path).load_index(store, published)
+    with mock.patch.object(VectorIndex, "vectors_from_bytes") as mock_vectors:
+        second = LocalEmbeddingCache(directory=tmp_path).load_index(store, published)
+
+    mock_vectors.assert_not_called()
+    assert isinstance(second._vectors, numpy.memmap)
+    assert second.search(numpy.array([0.0, 1.0]), quantity=1)[0].tolist() == ["b"]
+
+    # Changes copy the vectors rather than writing to the shared file
+    first.add(["c"], numpy.array([1.0, 1.0]))
+    assert not isinstance(first._vectors, numpy.memmap)
+    assert len(second) == 2
+
+
+def test_new_published_index_replaces_old_files(store, tmp_path):
+    local_cache = LocalEmbeddingCache(directory=tmp_path)
+    index = VectorIndex.build(*store.load())
+    for key in ("one", "two"):
+        local_cache.load_index(
+            store, {"version": store.version, "key": key, "index": index.to_bytes()}
+        )
+
+    assert [path.name for path in tmp_path.glob("index-*.npy")] == [
+        f"index-{store.prefix}-two-vectors.npy"
+    ]
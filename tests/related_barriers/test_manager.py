@@ -1,132 +1,304 @@
+from uuid import uuid4
+
 import mock
+import numpy
 import pytest
+from django.core.cache import cache
 from django.db.models import CharField
 from django.db.models import Value as V
 from django.db.models.functions import Concat
-from mock.mock import call
 
 from api.barriers.models import Barrier
 from api.related_barriers.constants import BarrierEntry
-from api.related_barriers.manager import RelatedBarrierManager
+from api.related_barriers.embedding_worker import EmbeddingWorkerUnavailable
+from api.related_barriers.index import VectorIndex, normalise
+from api.related_barriers.manager import (
+    VECTOR_INDEX_CACHE_KEY,
+    VECTOR_INDEX_VERSION_CACHE_KEY,
+    RelatedBarrierManager,
+    corpus_hash,
+)
 from tests.barriers.factories import BarrierFactory
 
 pytestmark = [pytest.mark.django_db]
 
 
 @pytest.fixture
-def related_barrier_manager_context():
-    # BarrierFactory(title='title 1')
-    BarrierFactory(title="title 2")
-    data = (
-        Barrier.objects.filter(archived=False)
+def related_barrier_manager_context(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    with mock.patch(
+        "api.related_barriers.manager.get_transformer"
+    ) as mock_get_transformer:
+        manager = RelatedBarrierManager()
+        manager.flush()
+        yield manager, mock_get_transformer
+        manager.flush()
+
+
+def seed(manager, barrier_ids, vectors, with_index=True):
+    vectors = normalise(numpy.array(vectors))
+    version = manager.store.replace(barrier_ids, vectors)
+    if with_index:
+        manager.set_index(VectorIndex.build(barrier_ids, vectors), version)
+
+
+def test_set_data_writes_store_and_index(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
+    barrier = BarrierFactory(title="title 2")
+    data = [
+        BarrierEntry(id=str(d["id"]), barrier_corpus=d["barrier_corpus"])
+        for d in Barrier.objects.filter(archived=False)
         .exclude(draft=True)
         .annotate(
             barrier_corpus=Concat("title", V(". "), "summary", output_field=CharField())
         )
         .values("id", "barrier_corpus")
-    )
-    with mock.patch("api.related_barriers.manager.cache") as mock_cache:
-        with mock.patch(
-            "api.related_barriers.manager.get_transformer"
-        ) as mock_get_transformer:
-            manager = RelatedBarrierManager()
-            manager.set_data(data)
-            yield manager, mock_cache, mock_get_transformer
+    ]
 
+    with mock.patch.object(
+        manager, "_RelatedBarrierManager__transformer"
+    ) as transformer:
+        transformer.encode.return_value.numpy.return_value = numpy.ones((len(data), 3))
+        assert manager.set_data([data]) == 1
 
-def test_manager_calls_cache_get(related_barrier_manager_context):
-    manager, cache, transformer = related_barrier_manager_context
-    mock_values = ["hello", "world"]
-    cache.get.side_effect = mock_values
+    assert manager.get_barrier_ids() == [str(barrier.id)]
+    assert str(barrier.id) in manager.store
+    assert manager.get_index().ids == [str(barrier.id)]
 
-    assert manager.get_barrier_ids() == mock_values[0]
-    assert manager.get_embeddings() == mock_values[1]
 
+def test_get_similar_barriers(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
 
-def test_manager_calls_cache_set(related_barrier_manager_context):
-    manager, cache, transformer = related_barrier_manager_context
-    barrier_ids = [1]
-    embeddings = ["2"]
+    # Unit vectors whose pairwise cosine similarities are a.b=0.1, a.c=0.3
+    seed(
+        manager,
+        ["a", "b", "c"],
+        [
+            [1.0, 0.0, 0.0],
+            [0.1, numpy.sqrt(1 - 0.1**2), 0.0],
+            [0.3, 0.0, numpy.sqrt(1 - 0.3**2)],
+        ],
+    )
+    barrier = BarrierEntry(id="a", barrier_corpus="test")
 
-    manager.set_barrier_ids(barrier_ids)
-    manager.set_embeddings(embeddings)
+    response = manager.get_similar_barriers(
+        barrier=barrier, similarity_threshold=0.15, quantity=3
+    )
 
-    cache.set.assert_has_calls(
-        [
-            call("BARRIER_IDS_CACHE_KEY", barrier_ids, timeout=None),
-            call("EMBEDDINGS_CACHE_KEY", embeddings, timeout=None),
-        ]
+    assert response == [("c", 0.3)]
+
+    response = manager.get_similar_barriers(
+        barrier=barrier, similarity_threshold=0.09, quantity=3
     )
 
+    assert response == [("b", 0.1), ("c", 0.3)]
 
-def test_get_similar_barriers(related_barrier_manager_context):
-    manager, cache, transformer = related_barrier_manager_context
+    response = manager.get_similar_barriers(
+        barrier=barrier, similarity_threshold=0.09, quantity=1
+    )
 
-    barrier_ids = ["a", "b", "c"]
-    cache.get.return_value = barrier_ids
+    assert response == [("c", 0.3)]
 
-    with mock.patch.object(manager, "get_cosine_sim") as mock_get_cosine_sim:
-        mock_get_cosine_sim.return_value = [
-            [1, 0.1, 0.3],
-            [0.1, 1, 0.3],
-            [0.3, 0.3, 1],
-        ]
-        barrier = BarrierEntry(id="a", barrier_corpus="test")
 
-        response = manager.get_similar_barriers(
-            barrier=barrier, similarity_threshold=0.15, quantity=3
-        )
+def test_add_barrier(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
+    seed(manager, ["b", "c"], [[0.0, 1.0], [1.0, 1.0]])
+    version = manager.store.version
 
-        assert response == [("c", 0.3)]
+    barrier = BarrierEntry(id="a", barrier_corpus="test")
+    with mock.patch.object(
+        manager, "encode_barrier_corpus", return_value=numpy.array([1.0, 0.0])
+    ):
+        manager.add_barrier(barrier)
 
-        response = manager.get_similar_barriers(
-            barrier=barrier, similarity_threshold=0.09, quantity=3
-        )
+    assert manager.store.version == version + 1
+    assert "a" in manager.store
+    assert manager.get_barrier_ids() == ["b", "c", "a"]
+    assert manager.query(numpy.array([1.0, 0.0]), quantity=1)[0].tolist() == ["a"]
 
-        assert response == [("b", 0.1), ("c", 0.3)]
 
-        response = manager.get_similar_barriers(
-            barrier=barrier, similarity_threshold=0.09, quantity=1
-        )
+def test_update_barrier_overwrites_row(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
+    seed(manager, ["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
 
-        assert response == [("c", 0.3)]
+    with mock.patch.object(
+        manager, "encode_barrier_corpus", return_value=numpy.array([0.0, 1.0])
+    ):
+        manager.update_barrier(BarrierEntry(id="a", barrier_corpus="test"))
 
+    assert len(manager.store) == 2
+    numpy.testing.assert_allclose(manager.store.get(["a"])["a"], [0.0, 1.0])
 
-def test_add_barrier(related_barrier_manager_context):
-    manager, cache, get_transformer = related_barrier_manager_context
-    transformer = mock.Mock()
-    get_transformer.return_value = transformer
 
-    barrier = BarrierEntry(id="a", barrier_corpus="test")
+def test_remove_barrier(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
+    seed(manager, ["a", "b", "c"], [[0.1, 0.3], [0.01, 0.71], [0.31, 0.11]])
 
-    with mock.patch.object(
-        manager, "encode_barrier_corpus"
-    ) as mock_encode_barrier_corpus:
-        barrier_ids = ["b", "c"]
-        embeddings = [[1], [2]]
-        new_embeddings = [3]
-        mock_encode_barrier_corpus.return_value = new_embeddings
-        cache.get.side_effect = [barrier_ids, embeddings, new_embeddings]
+    manager.remove_barrier(barrier=BarrierEntry(id="b", barrier_corpus="test"))
 
-        manager.add_barrier(barrier)
+    assert "b" not in manager.store
+    assert manager.get_barrier_ids() == ["a", "c"]
+    assert "b" not in manager.query(numpy.array([0.0, 1.0]), quantity=3)[0]
 
-        assert cache.set.call_count == 4
 
+def test_index_picks_up_writes_from_other_processes(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
+    seed(manager, ["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+
+    # Another worker writes straight to the shared store
+    manager.store.upsert(["c"], normalise(numpy.array([1.0, 1.0])))
+    manager.store.delete(["a"])
+
+    assert sorted(manager.get_index().ids) == ["b", "c"]
 
-def test_remove_barrier(related_barrier_manager_context):
-    manager, cache, transformer = related_barrier_manager_context
 
-    barrier_ids = ["a", "b", "c"]
-    cache.get.return_value = barrier_ids
+def test_query_without_index_scores_single_row(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
+    seed(manager, ["a", "b", "c"], [[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]], False)
 
-    with mock.patch.object(manager, "get_embeddings") as mock_get_embeddings:
-        mock_get_embeddings.return_value = [
-            [0.1, 0.3],
-            [0.01, 0.71],
-            [0.31, 0.11],
+    assert manager.get_index() is None
+
+    ids, scores = manager.query(numpy.array([2.0, 0.0]), quantity=2, exclude="a")
+
+    assert ids.tolist() == ["b", "c"]
+    numpy.testing.assert_allclose(scores, [0.6, 0.0], atol=1e-6)
+
+
+def test_update_barriers_encodes_and_writes_once(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
+    seed(manager, ["a"], [[1.0, 0.0]])
+
+    with mock.patch.object(
+        manager,
+        "encode_barrier_corpora",
+        return_value=normalise(numpy.array([[0.0, 1.0], [1.0, 1.0]])),
+    ) as mock_encode, mock.patch.object(
+        manager.store, "upsert", wraps=manager.store.upsert
+    ) as mock_upsert:
+        manager.update_barriers(
+            [
+                BarrierEntry(id="a", barrier_corpus="first"),
+                BarrierEntry(id="b", barrier_corpus="second"),
+            ]
+        )
+
+    mock_encode.assert_called_once()
+    mock_upsert.assert_called_once()
+    assert manager.get_barrier_ids() == ["a", "b"]
+    assert manager.query(numpy.array([0.0, 1.0]), quantity=1)[0].tolist() == ["a"]
+
+
+def test_reindex_only_encodes_changed_barriers(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
+    version = manager.store.replace(
+        ["a", "b", "c"],
+        normalise(numpy.array([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])),
+        hashes=[corpus_hash("a text"), corpus_hash("b text"), corpus_hash("c text")],
+    )
+    manager.set_index(VectorIndex.build(*manager.store.load()), version)
+    data = [
+        [
+            BarrierEntry(id="a", barrier_corpus="a text"),
+            BarrierEntry(id="b", barrier_corpus="b text, edited"),
+        ],
+        [BarrierEntry(id="d", barrier_corpus="d text")],
+    ]
+
+    with mock.patch.object(
+        manager,
+        "encode_barrier_corpora",
+        side_effect=lambda barriers: normalise(
+            numpy.array([[0.0, 1.0], [1.0, 0.0]])[: len(barriers)]
+        ),
+    ) as mock_encode:
+        stats = manager.reindex(iter(data))
+
+    assert stats == {"hits": 1, "misses": 2, "removed": 1}
+    # Each batch is encoded and stored before the next one is read
+    assert [[b.id for b in call.args[0]] for call in mock_encode.call_args_list] == [
+        ["b"],
+        ["d"],
+    ]
+    assert sorted(manager.get_barrier_ids()) == ["a", "b", "d"]
+    assert manager.store.hashes()["b"] == corpus_hash("b text, edited")
+    assert sorted(manager.get_index().ids) == ["a", "b", "d"]
+
+    with mock.patch.object(manager, "encode_barrier_corpora") as mock_encode:
+        stats = manager.reindex(data)
+
+    mock_encode.assert_not_called()
+    assert stats == {"hits": 3, "misses": 0, "removed": 0}
+
+
+def test_full_reindex_encodes_everything(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
+    seed(manager, ["a"], [[1.0, 0.0]])
+    data = [
+        [
+            BarrierEntry(id="a", barrier_corpus="a"),
+            BarrierEntry(id="b", barrier_corpus="b"),
         ]
-        barrier = BarrierEntry(id="b", barrier_corpus="test")
+    ]
+
+    with mock.patch.object(manager, "set_data", return_value=2) as mock_set_data:
+        stats = manager.reindex(data, full=True)
+
+    mock_set_data.assert_called_once_with(data)
+    assert stats == {"hits": 0, "misses": 2, "removed": 0}
+
+
+def test_query_search_term_encodes_repeated_terms_once(
+    related_barrier_manager_context,
+):
+    manager, _ = related_barrier_manager_context
+    seed(manager, ["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    manager.query_cache.clear()
+
+    with mock.patch.object(manager, "_RelatedBarrierManager__transformer") as model:
+        model.encode.return_value.numpy.return_value = numpy.array([1.0, 0.0])
+        for _ in range(3):
+            ids, _ = manager.query_search_term("Steel", similarity_threshold=0.5)
+
+    model.encode.assert_called_once()
+    assert ids.tolist() == ["a"]
+    assert manager.query_cache.stats["hits"] == 2
+
+
+def test_encode_uses_worker_and_falls_back(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
+    worker = mock.Mock()
+    worker.encode.return_value = numpy.array([1.0, 0.0])
+
+    with mock.patch.object(manager, "worker", worker), mock.patch.object(
+        manager, "_RelatedBarrierManager__transformer"
+    ) as model:
+        model.encode.return_value.numpy.return_value = numpy.array([0.0, 1.0])
+
+        numpy.testing.assert_array_equal(manager.encode("steel"), [1.0, 0.0])
+        model.encode.assert_not_called()
+
+        worker.encode.side_effect = EmbeddingWorkerUnavailable("gone")
+        numpy.testing.assert_array_equal(manager.encode("steel"), [0.0, 1.0])
+        model.encode.assert_called_once()
+
+
+def test_index_moves_onto_the_published_index(related_barrier_manager_context):
+    manager, _ = related_barrier_manager_context
+    seed(manager, ["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    assert isinstance(manager.get_index()._vectors, numpy.memmap)
+
+    # Another process writes and publishes an index for the new version
+    vectors = normalise(numpy.array([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]))
+    version = manager.store.upsert(["c"], vectors[2:])
+    published = {"version": version, "key": uuid4().hex}
+    cache.set(VECTOR_INDEX_VERSION_CACHE_KEY, published)
+    index = VectorIndex.build(["a", "b", "c"], vectors)
+    cache.set(VECTOR_INDEX_CACHE_KEY, {**published, "index": index.to_bytes()})
 
-        manager.remove_barrier(barrier=barrier)
+    with mock.patch.object(manager.store, "changes_since") as mock_changes:
+        assert manager.get_index().ids == ["a", "b", "c"]
 
-        assert cache.set.call_count == 4
+    mock_changes.assert_not_called()
+    assert isinstance(manager.get_index()._vectors, numpy.memmap)
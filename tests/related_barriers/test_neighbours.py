@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import numpy
+import pytest
+from django.core.cache import cache
+from django.db.models import signals
+from django.urls import reverse
+from factory.django import mute_signals
+
+from api.core.test_utils import APITestMixin
+from api.related_barriers import neighbours as neighbours_module
+from api.related_barriers.index import normalise
+from api.related_barriers.models import BarrierNeighbours
+from api.related_barriers.neighbours import (
+    NEIGHBOURS_VERSION_CACHE_KEY,
+    get_neighbours,
+    rebuild_neighbours,
+    refresh_neighbours,
+    sync_neighbours,
+)
+from api.related_barriers.store import EmbeddingStore
+from tests.barriers.factories import BarrierFactory
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def small_lists(monkeypatch, settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    monkeypatch.setattr(neighbours_module, "RELATED_BARRIER_NEIGHBOURS", 2)
+    monkeypatch.setattr(neighbours_module, "RELATED_BARRIER_NEIGHBOURS_BLOCK_SIZE", 2)
+    cache.delete(NEIGHBOURS_VERSION_CACHE_KEY)
+
+
+@pytest.fixture
+def ids():
+    with mute_signals(signals.pre_save):
+        return numpy.array([str(BarrierFactory().id) for _ in range(5)])
+
+
+@pytest.fixture
+def vectors():
+    angles = numpy.radians([0, 10, 30, 80, 90])
+    return normalise(numpy.stack([numpy.cos(angles), numpy.sin(angles)], axis=1))
+
+
+def test_rebuild_lists_closest_barriers(ids, vectors):
+    rebuild_neighbours(ids, vectors)
+
+    related_ids, scores = get_neighbours(ids[0])
+    assert related_ids == [ids[1], ids[2]]
+    assert scores == sorted(scores, reverse=True)
+    assert BarrierNeighbours.objects.count() == 5
+    assert BarrierNeighbours.objects.get(barrier_id=ids[0]).min_score == scores[-1]
+
+
+def test_refresh_matches_rebuild_and_skips_unaffected(ids, vectors):
+    rebuild_neighbours(ids, vectors)
+    modified_on = dict(BarrierNeighbours.objects.values_list("barrier", "modified_on"))
+
+    # Barrier 4 moves from 90 to 85 degrees, which only affects barrier 3's list
+    vectors = vectors.copy()
+    vectors[4] = normalise(numpy.array([numpy.cos(1.48), numpy.sin(1.48)]))
+    refresh_neighbours(ids, vectors, {ids[4]})
+    refreshed = {b: get_neighbours(b) for b in ids}
+    refreshed_on = dict(BarrierNeighbours.objects.values_list("barrier", "modified_on"))
+
+    rebuild_neighbours(ids, vectors)
+    assert refreshed == {b: get_neighbours(b) for b in ids}
+    assert {str(b) for b in modified_on if modified_on[b] != refreshed_on[b]} == {
+        ids[3],
+        ids[4],
+    }
+
+
+def test_refresh_drops_removed_barriers(ids, vectors):
+    rebuild_neighbours(ids, vectors)
+
+    refresh_neighbours(ids[1:], vectors[1:], {ids[0]})
+
+    assert get_neighbours(ids[0]) is None
+    assert all(ids[0] not in get_neighbours(b)[0] for b in ids[1:])
+
+
+def test_sync_follows_store_changes(ids, vectors):
+    store = EmbeddingStore(prefix="TEST_NEIGHBOURS")
+    related_barriers = SimpleNamespace(store=store, load_embeddings=store.load)
+    store.replace(ids.tolist(), vectors)
+
+    sync_neighbours(related_barriers)
+    assert get_neighbours(ids[0])[0] == [ids[1], ids[2]]
+
+    store.delete([ids[1]])
+    sync_neighbours(related_barriers)
+    assert get_neighbours(ids[0])[0] == [ids[2]]
+    store.clear()
+
+
+class TestRelatedBarriersView(APITestMixin):
+    def test_reads_materialised_list(self, ids, vectors):
+        rebuild_neighbours(ids, vectors)
+
+        response = self.api_client.get(
+            reverse("related-barriers", kwargs={"pk": ids[0]})
+        )
+
+        assert response.status_code == 200
+        assert [barrier["id"] for barrier in response.data] == [ids[1], ids[2]]
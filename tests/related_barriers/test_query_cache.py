@@ -0,0 +1,56 @@
+import mock
+import numpy
+import pytest
+from django.core.cache import cache
+
+from api.related_barriers.query_cache import QueryEmbeddingCache, normalise_search_term
+
+
+@pytest.fixture
+def query_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    query_cache = QueryEmbeddingCache(maxsize=2)
+    yield query_cache
+    query_cache.clear()
+    cache.clear()
+
+
+@pytest.fixture
+def encode():
+    return mock.Mock(side_effect=lambda term: numpy.full(3, len(term), dtype=float))
+
+
+def test_normalise_search_term():
+    assert normalise_search_term("  Steel   TARIFFS\n") == "steel tariffs"
+
+
+def test_repeated_terms_encode_once(query_cache, encode):
+    first = query_cache.get_or_encode("steel tariffs", encode)
+    second = query_cache.get_or_encode(" Steel  Tariffs ", encode)
+
+    encode.assert_called_once_with("steel tariffs")
+    numpy.testing.assert_array_equal(first, second)
+    assert first.dtype == numpy.float32
+    assert query_cache.stats == {"hits": 1, "shared_hits": 0, "misses": 1, "size": 1}
+
+
+def test_least_recently_used_is_evicted(query_cache, encode):
+    query_cache.get_or_encode("a", encode)
+    query_cache.get_or_encode("b", encode)
+    query_cache.get_or_encode("a", encode)
+    query_cache.get_or_encode("c", encode)
+
+    assert list(query_cache._entries) == ["a", "c"]
+
+
+def test_shared_tier_serves_other_processes(query_cache, encode):
+    query_cache.get_or_encode("steel", encode)
+
+    other_process = QueryEmbeddingCache()
+    vector = other_process.get_or_encode("steel", encode)
+
+    encode.assert_called_once()
+    numpy.testing.assert_array_equal(vector, [5, 5, 5])
+    assert other_process.stats["shared_hits"] == 1
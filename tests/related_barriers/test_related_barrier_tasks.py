@@ -0,0 +1,113 @@
+import time
+
+import mock
+import pytest
+from django.db import transaction
+
+from api.core.test_utils import synchronous_transaction_on_commit
+from api.related_barriers import tasks
+from tests.barriers.factories import BarrierFactory, ReportFactory
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    yield
+    tasks.cache.clear()
+
+
+@mock.patch(
+    "api.related_barriers.tasks.transaction.on_commit",
+    synchronous_transaction_on_commit,
+)
+@mock.patch("api.related_barriers.tasks.process_related_barrier_updates")
+def test_enqueue_coalesces_ids_and_schedules_once(mock_process):
+    tasks.enqueue_related_barrier_update("a")
+    tasks.enqueue_related_barrier_update("b")
+    tasks.enqueue_related_barrier_update("a")
+
+    mock_process.apply_async.assert_called_once_with(
+        countdown=tasks.RELATED_BARRIER_UPDATE_WINDOW_SECONDS
+    )
+    assert tasks.drain_pending_updates() == ["a", "b"]
+    assert tasks.drain_pending_updates() == []
+
+
+@mock.patch("api.related_barriers.tasks.process_related_barrier_updates")
+def test_rolled_back_save_queues_nothing(mock_process):
+    with pytest.raises(ValueError):
+        with transaction.atomic():
+            tasks.enqueue_related_barrier_update("a")
+            raise ValueError()
+
+    mock_process.apply_async.assert_not_called()
+    assert tasks.cache.get(tasks.PENDING_UPDATES_SCHEDULED_CACHE_KEY) is None
+    assert tasks.drain_pending_updates() == []
+
+
+@mock.patch(
+    "api.related_barriers.tasks.transaction.on_commit",
+    synchronous_transaction_on_commit,
+)
+@mock.patch("api.related_barriers.tasks.update_related_barriers")
+@mock.patch("api.related_barriers.tasks.process_related_barrier_updates.apply_async")
+def test_process_drains_queue_in_one_batch(_, mock_update_related_barriers):
+    tasks.enqueue_related_barrier_update("a")
+    tasks.enqueue_related_barrier_update("b")
+
+    tasks.process_related_barrier_updates()
+
+    mock_update_related_barriers.assert_called_once_with(["a", "b"])
+    assert tasks.cache.get(tasks.PENDING_UPDATES_SCHEDULED_CACHE_KEY) is None
+    assert tasks.drain_pending_updates() == []
+
+
+@mock.patch("api.related_barriers.tasks.schedule_pending_updates")
+def test_drain_waits_for_unwritten_slot(mock_schedule):
+    tasks.cache.set(tasks.pending_key("slots"), 3)
+    tasks.cache.set(tasks.pending_key(1), "a")
+    tasks.cache.set(tasks.pending_key(3), "c")
+
+    assert tasks.drain_pending_updates() == ["a"]
+    mock_schedule.assert_called_once()
+
+    tasks.cache.set(tasks.pending_key(2), "b")
+    assert tasks.drain_pending_updates() == ["b", "c"]
+
+
+@mock.patch("api.related_barriers.tasks.schedule_pending_updates")
+def test_drain_skips_slot_left_unwritten_for_a_window(_):
+    tasks.cache.set(tasks.pending_key("slots"), 2)
+    tasks.cache.set(tasks.pending_key(2), "b")
+    tasks.cache.set(
+        tasks.pending_key("gap:1"),
+        time.time() - tasks.RELATED_BARRIER_UPDATE_WINDOW_SECONDS,
+    )
+
+    assert tasks.drain_pending_updates() == ["b"]
+
+
+@mock.patch("api.related_barriers.tasks.update_related_barriers")
+def test_process_with_empty_queue(mock_update_related_barriers):
+    tasks.process_related_barrier_updates()
+
+    mock_update_related_barriers.assert_not_called()
+
+
+@mock.patch("api.related_barriers.tasks.sync_neighbours")
+@mock.patch("api.related_barriers.tasks.manager.get_or_init")
+def test_update_related_barriers_encodes_batch(mock_get_or_init, mock_sync_neighbours):
+    barriers = [BarrierFactory(title="one"), BarrierFactory(title="two")]
+    draft = ReportFactory()
+    archived = BarrierFactory(title="three", archived=True)
+
+    tasks.update_related_barriers([b.id for b in barriers] + [draft.id, archived.id])
+
+    mock_get_or_init.return_value.update_barriers.assert_called_once()
+    (entries,) = mock_get_or_init.return_value.update_barriers.call_args.args
+    assert {entry.id for entry in entries} == {str(b.id) for b in barriers}
+    mock_sync_neighbours.assert_called_once_with(mock_get_or_init.return_value)
@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+STARTUP_SCRIPT = """
+import json, resource, sys, time
+
+import django
+
+start = time.perf_counter()
+django.setup()
+import config.urls  # noqa: F401
+import api.related_barriers.tasks  # noqa: F401
+if sys.argv[1:] == ["eager"]:
+    # What every process paid at startup before the manager was made lazy
+    import api.related_barriers.manager  # noqa: F401
+    import sentence_transformers  # noqa: F401
+    import torch  # noqa: F401
+setup_seconds = time.perf_counter() - start
+
+print(json.dumps({
+    "setup_seconds": setup_seconds,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded": [
+        name for name in ("torch", "sentence_transformers") if name in sys.modules
+    ],
+}))
+"""
+
+
+def run_startup(*args):
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parents[2],
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "config.settings.test"},
+    )
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+def test_startup_does_not_import_ml_stack():
+    """
+    django.setup(), the URL conf and the related barrier tasks must not pull
+    in torch.
+    """
+    assert run_startup()["loaded"] == []
+
+
+@pytest.mark.benchmark
+def test_startup_benchmark(record_property):
+    """
+    Each startup runs in a fresh interpreter, once with the lazy manager and
+    once importing the ML stack as it used to. Opt in with -m benchmark, the
+    results are recorded as junit xml properties.
+    """
+    lazy = run_startup()
+    eager = run_startup("eager")
+
+    for name, result in (("lazy", lazy), ("eager", eager)):
+        record_property(f"{name}_setup_seconds", round(result["setup_seconds"], 2))
+        record_property(f"{name}_max_rss_mb", round(result["max_rss_mb"]))
+
+    assert lazy["loaded"] == []
+    assert sorted(eager["loaded"]) == ["sentence_transformers", "torch"]
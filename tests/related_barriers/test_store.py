@@ -0,0 +1,130 @@
+import numpy
+import pytest
+
+from api.related_barriers import store as store_module
+from api.related_barriers.store import EmbeddingStore
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def store(settings, monkeypatch):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    monkeypatch.setattr(store_module, "EMBEDDING_STORE_BLOCK_SIZE", 4)
+    embedding_store = EmbeddingStore(prefix="TEST_EMBEDDINGS")
+    yield embedding_store
+    embedding_store.clear()
+
+
+@pytest.fixture
+def vectors():
+    return numpy.arange(30, dtype=numpy.float32).reshape(10, 3)
+
+
+@pytest.fixture
+def ids():
+    return [f"barrier-{i}" for i in range(10)]
+
+
+def test_replace_and_load(store, ids, vectors):
+    version = store.replace(ids, vectors)
+
+    loaded_ids, loaded_vectors = store.load()
+
+    assert store.version == version
+    assert len(store) == 10
+    assert loaded_ids.tolist() == ids
+    numpy.testing.assert_array_equal(loaded_vectors, vectors)
+
+
+def test_upsert_appends_and_overwrites(store, ids, vectors):
+    store.replace(ids, vectors)
+    version = store.version
+
+    store.upsert(["barrier-3", "new"], numpy.ones((2, 3)))
+
+    assert store.version == version + 1
+    assert len(store) == 11
+    assert "new" in store
+    numpy.testing.assert_array_equal(store.get(["barrier-3"])["barrier-3"], [1, 1, 1])
+    assert store.load()[0].tolist() == ids + ["new"]
+
+
+def test_upsert_into_empty_store(store):
+    store.upsert(["a"], numpy.array([1.0, 2.0]))
+
+    assert store.load()[0].tolist() == ["a"]
+    numpy.testing.assert_array_equal(store.get(["a"])["a"], [1.0, 2.0])
+
+
+def test_hashes_follow_rows(store, ids, vectors, monkeypatch):
+    monkeypatch.setattr(store_module, "EMBEDDING_STORE_COMPACTION_RATIO", 0.1)
+    store.replace(ids, vectors, hashes=[f"hash-{i}" for i in range(10)])
+
+    store.upsert(["barrier-3", "new"], numpy.ones((2, 3)), hashes=["changed", "n"])
+    store.delete(["barrier-0", "barrier-5"])
+
+    hashes = store.hashes()
+    assert "barrier-0" not in hashes
+    assert hashes["barrier-3"] == "changed"
+    assert hashes["barrier-9"] == "hash-9"
+    assert hashes["new"] == "n"
+
+
+def test_delete_tombstones_rows(store, ids, vectors):
+    store.replace(ids, vectors)
+
+    store.delete(["barrier-1"])
+
+    assert "barrier-1" not in store
+    assert len(store) == 9
+    assert "barrier-1" not in store.load()[0].tolist()
+    assert store.get(["barrier-1"]) == {}
+
+
+def test_delete_compacts_after_threshold(store, ids, vectors, monkeypatch):
+    monkeypatch.setattr(store_module, "EMBEDDING_STORE_COMPACTION_RATIO", 0.1)
+    store.replace(ids, vectors)
+
+    store.delete(["barrier-0", "barrier-5"])
+
+    assert store._get_meta()["tombstones"] == 0
+    assert store._get_meta()["rows"] == 8
+    assert store.load()[0].tolist() == [
+        i for i in ids if i not in {"barrier-0", "barrier-5"}
+    ]
+    numpy.testing.assert_array_equal(store.get(["barrier-9"])["barrier-9"], vectors[9])
+
+
+def test_changes_since(store, ids, vectors):
+    base = store.replace(ids, vectors)
+    store.upsert(["barrier-2"], numpy.ones(3))
+    latest = store.delete(["barrier-4"])
+
+    assert store.changes_since(base, latest) == {"barrier-2", "barrier-4"}
+    assert store.changes_since(latest, latest) == set()
+
+
+def test_changes_since_reports_gaps(store, ids, vectors):
+    base = store.replace(ids, vectors)
+    latest = store.replace(ids[:5], vectors[:5])
+
+    assert store.changes_since(base, latest) is None
+    assert store.changes_since(latest, base) is None
+
+
+def test_float16_layout(settings, monkeypatch, ids, vectors):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    monkeypatch.setattr(store_module, "EMBEDDING_STORE_DTYPE", "float16")
+    store = EmbeddingStore(prefix="TEST_EMBEDDINGS_FP16")
+
+    store.replace(ids, vectors)
+
+    loaded_ids, loaded_vectors = store.load()
+    assert loaded_vectors.dtype == numpy.float32
+    numpy.testing.assert_allclose(loaded_vectors, vectors, rtol=1e-3)
+    store.clear()